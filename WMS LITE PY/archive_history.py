@@ -0,0 +1,28 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from database.history_archive import HistoryArchiver
+
+def main():
+    parser = argparse.ArgumentParser(description="Move process history older than the retention horizon into monthly archive files")
+    parser.add_argument('--retention-days', type=int, help="Override WMS_HISTORY_RETENTION_DAYS")
+    parser.add_argument('--archive-dir', help="Override WMS_HISTORY_ARCHIVE_DIR")
+    parser.add_argument('--batch-size', type=int, default=500, help="Rows moved per transaction")
+    parser.add_argument('--max-batches', type=int, help="Stop after this many batches")
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_database()
+
+    archiver = HistoryArchiver(retention_days=args.retention_days, archive_dir=args.archive_dir, batch_size=args.batch_size)
+    if archiver.retention_days <= 0:
+        print("History retention is disabled")
+        return 0
+    print(f"Archiving process history older than {archiver.cutoff()} into {archiver.archive_dir}...")
+    moved = archiver.run(max_batches=args.max_batches)
+    print(f"Archived {moved} records")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,56 @@
+import argparse
+import json
+import sys
+from scanning import DetectionPipeline, decode_frame
+from scanning.benchmark import decode_qr_opencv, format_report, recorded_cases, run_benchmark, synthetic_cases
+
+DECODERS = {
+    'frame': lambda: decode_frame,
+    'pipeline': DetectionPipeline,
+    'opencv-qr': lambda: decode_qr_opencv
+}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark barcode decoding on synthetic and recorded frames")
+    parser.add_argument('--synthetic', type=int, default=200, help="Number of synthetic frames (0 to skip)")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic frames")
+    parser.add_argument('--frames', action='append', default=[], metavar='PATH',
+                        help="Image, video or directory of recorded frames (repeatable)")
+    parser.add_argument('--decoder', choices=list(DECODERS), default='pipeline', help="Decode function to measure")
+    parser.add_argument('--json', action='store_true', help="Print the full result as JSON")
+    parser.add_argument('--min-decode-rate', type=float, help="Exit with status 1 if the decode rate is lower")
+    parser.add_argument('--max-false-reads', type=int, help="Exit with status 1 if there are more false reads")
+    args = parser.parse_args()
+
+    cases = list(synthetic_cases(args.synthetic, args.seed)) if args.synthetic else []
+    for path in args.frames:
+        cases.extend(recorded_cases(path))
+    if not cases:
+        parser.error("No frames to benchmark")
+
+    decode_fn = DECODERS[args.decoder]()
+    result = run_benchmark(cases, decode_fn)
+    if args.json:
+        if hasattr(decode_fn, 'metrics'):
+            result['decoder_metrics'] = decode_fn.metrics()
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_report(result))
+        if hasattr(decode_fn, 'metrics'):
+            stages = decode_fn.metrics()['stages']
+            print('\nPipeline stages: ' + ', '.join(
+                f"{stage} {values['hits']}/{values['runs']} hits, {values['avg_ms']:.1f} ms"
+                for stage, values in stages.items() if values['runs']
+            ))
+
+    failed = False
+    if args.min_decode_rate is not None and (result['decode_rate'] or 0) < args.min_decode_rate:
+        print(f"Decode rate {result['decode_rate'] or 0:.1%} is below {args.min_decode_rate:.1%}", file=sys.stderr)
+        failed = True
+    if args.max_false_reads is not None and result['false_reads'] > args.max_false_reads:
+        print(f"{result['false_reads']} false reads exceed {args.max_false_reads}", file=sys.stderr)
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database, InventoryDB
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge duplicate inventory rows of the same product and location into one row per slot")
+    parser.add_argument('--dry-run', action='store_true', help="Only list the duplicated slots")
+    args = parser.parse_args()
+
+    load_dotenv()
+    # Creates the schema of a new database; on an unmigrated one 0006 merges the slots and adds the unique key
+    init_database()
+
+    if args.dry_run:
+        duplicates = InventoryDB.find_duplicate_slots()
+    else:
+        duplicates = InventoryDB.merge_duplicate_slots()
+    for slot in duplicates:
+        print(f"Product {slot['product_id']} at location {slot['location_id']}: {slot['rows']} rows, {slot['quantity']} units")
+    if not duplicates:
+        print("No duplicate inventory rows")
+    elif not args.dry_run:
+        merged = sum(slot['rows'] - 1 for slot in duplicates)
+        print(f"Merged {merged} rows into {len(duplicates)} slots")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,29 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from database.stock_ledger import LedgerCompactor
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot stock balances and delete ledger movements older than the retention horizon")
+    parser.add_argument('--retention-days', type=int, help="Override WMS_LEDGER_RETENTION_DAYS")
+    parser.add_argument('--batch-size', type=int, default=5000, help="Movements deleted per transaction")
+    parser.add_argument('--max-batches', type=int, help="Stop after this many batches")
+    parser.add_argument('--snapshot-only', action='store_true', help="Take a snapshot without compacting")
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_database()
+
+    compactor = LedgerCompactor(retention_days=args.retention_days, batch_size=args.batch_size)
+    if args.snapshot_only or compactor.retention_days <= 0:
+        snapshot_id = compactor.take_snapshot()
+        print(f"Took snapshot {snapshot_id}" if snapshot_id else "No movements since the last snapshot")
+        return 0
+    print(f"Compacting stock movements covered by snapshots older than {compactor.cutoff()}...")
+    deleted = compactor.run(max_batches=args.max_batches)
+    print(f"Deleted {deleted} movements")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
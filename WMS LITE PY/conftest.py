@@ -0,0 +1 @@
+# Project root conftest: lets tests import the `database` and `scanning` packages
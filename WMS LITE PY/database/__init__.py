@@ -1,21 +1,41 @@
 from .db_utils import (
+    ConnectionProfile,
     DatabaseConnectionPool,
-    get_db_connection,
+    ReadOnlyConnectionPool,
+    get_db_read_connection,
+    DatabaseWriter,
+    submit_write,
+    execute_write,
+    AuditLogger,
+    reference_cache,
+    product_lookup_cache,
     init_database,
     ProductDB,
     ProcessHistoryDB,
     InventoryDB,
     LocationDB,
-    OrderDB
+    OrderDB,
+    StockMovementDB,
+    DashboardDB
 )
 
 __all__ = [
+    'ConnectionProfile',
     'DatabaseConnectionPool',
-    'get_db_connection',
+    'ReadOnlyConnectionPool',
+    'get_db_read_connection',
+    'DatabaseWriter',
+    'submit_write',
+    'execute_write',
+    'AuditLogger',
+    'reference_cache',
+    'product_lookup_cache',
     'init_database',
     'ProductDB',
     'ProcessHistoryDB',
     'InventoryDB',
     'LocationDB',
-    'OrderDB'
+    'OrderDB',
+    'StockMovementDB',
+    'DashboardDB'
 ]
\ No newline at end of file
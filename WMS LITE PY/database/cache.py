@@ -0,0 +1,132 @@
+"""Process-wide caches for reference data read on every Streamlit rerun.
+
+ReferenceCache keeps whole datasets (products, categories, locations) in
+memory next to a version counter per dataset. Write methods bump the counter
+of the datasets they touch, and the next read reloads. Writes made by other
+processes are detected through PRAGMA data_version.
+
+LookupCache is a bounded LRU with TTL for single-key lookups (barcode scans)
+whose entries are tied to the version of a ReferenceCache dataset.
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable, Hashable, Optional
+
+class ReferenceCache:
+    def __init__(self, data_version_probe: Optional[Callable[[], Optional[int]]] = None, max_age: float = 300):
+        """
+        Args:
+            data_version_probe: returns PRAGMA data_version read on the connection this
+                process writes through, so it only changes when another process commits
+                (None when it cannot be read right now)
+            max_age: seconds after which an entry is reloaded regardless of versions
+        """
+        self._data_version_probe = data_version_probe
+        self._max_age = max_age
+        self._lock = Lock()
+        self._versions = {}
+        self._entries = {}
+        self._last_data_version = None
+        self.hits = 0
+        self.misses = 0
+
+    def bump(self, *datasets: str):
+        """Invalidate datasets after a write that changed them"""
+        with self._lock:
+            for dataset in datasets:
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+
+    def invalidate_all(self):
+        with self._lock:
+            for dataset in set(self._versions) | set(self._entries):
+                self._versions[dataset] = self._versions.get(dataset, 0) + 1
+
+    def version(self, dataset: str) -> int:
+        with self._lock:
+            return self._versions.get(dataset, 0)
+
+    def get(self, dataset: str, loader: Callable):
+        """Return the cached value of `dataset`, calling `loader()` if it is stale"""
+        self.check_external_writes()
+        with self._lock:
+            version = self._versions.get(dataset, 0)
+            entry = self._entries.get(dataset)
+            if entry is not None and entry[0] == version and time.monotonic() - entry[1] < self._max_age:
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        # Load outside the lock; tagging with the version read before loading means
+        # a write that lands during the load makes the entry stale right away
+        value = loader()
+        with self._lock:
+            self._entries[dataset] = (version, time.monotonic(), value)
+        return value
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'versions': dict(self._versions)}
+
+    def check_external_writes(self):
+        """Invalidate everything if another process committed since the last check"""
+        if self._data_version_probe is None:
+            return
+        try:
+            data_version = self._data_version_probe()
+        except Exception:
+            # Without a probe result only the version counters and max_age apply
+            return
+        if data_version is None:
+            return
+        with self._lock:
+            changed = self._last_data_version is not None and data_version != self._last_data_version
+            self._last_data_version = data_version
+        if changed:
+            self.invalidate_all()
+
+class LookupCache:
+    """Bounded LRU of key -> value with a TTL, invalidated with a ReferenceCache dataset"""
+
+    def __init__(self, reference_cache: ReferenceCache, dataset: str, maxsize: int = 5000, ttl: float = 60):
+        self._reference_cache = reference_cache
+        self._dataset = dataset
+        self._maxsize = maxsize
+        self._ttl = ttl
+        self._lock = Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, loader: Callable):
+        """Return the cached value for `key` (None results are cached too)"""
+        self._reference_cache.check_external_writes()
+        version = self._reference_cache.version(self._dataset)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version and now - entry[1] < self._ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+        value = loader()
+        with self._lock:
+            self._entries[key] = (version, now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+            }
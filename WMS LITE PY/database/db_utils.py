@@ -1,150 +1,761 @@
 import sqlite3
 import os
+import atexit
+import time
+from bisect import bisect_left
 from pathlib import Path
 from contextlib import contextmanager
-from queue import Queue
-from threading import Lock
+from concurrent.futures import Future
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from itertools import islice
+from queue import Queue, Empty
+from threading import Condition, Lock, Thread, current_thread
+from .cache import LookupCache, ReferenceCache
+from .migrator import run_migrations
+
+# Named connection profiles. Every pragma can also be overridden individually
+# through WMS_DB_<PRAGMA> environment variables (e.g. WMS_DB_BUSY_TIMEOUT=10000).
+CONNECTION_PROFILES = {
+    'wal': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -20000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'foreign_keys': False,
+    },
+    'durable': {
+        'journal_mode': 'WAL',
+        'synchronous': 'FULL',
+        'busy_timeout': 10000,
+        'cache_size': -20000,
+        'mmap_size': 0,
+        'temp_store': 'MEMORY',
+        'foreign_keys': True,
+    },
+    'legacy': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+        'cache_size': -2000,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'foreign_keys': False,
+    },
+}
+
+DEFAULT_PROFILE = 'wal'
+
+class ConnectionProfile:
+    """Set of pragmas applied to every connection handed out by the pools"""
+
+    def __init__(self, name=DEFAULT_PROFILE, **overrides):
+        if name not in CONNECTION_PROFILES:
+            raise ValueError(f"Unknown connection profile '{name}'. Must be one of: {', '.join(CONNECTION_PROFILES)}")
+        self.name = name
+        self.settings = dict(CONNECTION_PROFILES[name])
+        self.settings.update(overrides)
+
+    @classmethod
+    def from_env(cls):
+        """Build the profile from WMS_DB_PROFILE plus per-pragma WMS_DB_* overrides"""
+        name = os.getenv('WMS_DB_PROFILE', DEFAULT_PROFILE).lower()
+        overrides = {}
+        for pragma in CONNECTION_PROFILES[DEFAULT_PROFILE]:
+            value = os.getenv(f'WMS_DB_{pragma.upper()}')
+            if value is not None:
+                overrides[pragma] = value
+        return cls(name, **overrides)
+
+    def apply(self, conn, read_only=False):
+        settings = self.settings
+        # journal_mode is persistent in the database file and can only be
+        # changed by a writable connection
+        if not read_only:
+            conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+        conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout'])}")
+        conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+        conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+        conn.execute(f"PRAGMA temp_store = {settings['temp_store']}")
+        conn.execute(f"PRAGMA foreign_keys = {'ON' if _as_bool(settings['foreign_keys']) else 'OFF'}")
+        if read_only:
+            conn.execute('PRAGMA query_only = ON')
+
+def _as_text(value):
+    """None, or the value as a string"""
+    return value if value is None or isinstance(value, str) else str(value)
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return bool(value)
 
 class DatabaseConnectionPool:
+    """Bounded pool of connections created lazily up to WMS_DB_POOL_SIZE.
+
+    Checkout is a queue pop: a connection is only probed with SELECT 1 after it
+    was returned from a failed block or has been idle longer than
+    WMS_DB_POOL_IDLE_CHECK seconds. Broken connections are closed and their slot
+    is refilled on the next checkout.
+    """
     _instance = None
     _lock = Lock()
     _pool = None
-    _max_connections = 5
+    _read_only = False
+    # Upper bounds (ms) of the checkout wait-time histogram buckets
+    WAIT_BUCKETS_MS = (1, 5, 25, 100, 500, 1000)
 
     def __new__(cls):
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super(DatabaseConnectionPool, cls).__new__(cls)
-                    cls._instance._initialize()
+                    # Publish the instance only once it is fully initialized
+                    instance = super(DatabaseConnectionPool, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
         return cls._instance
 
     def _initialize(self):
+        self._profile = ConnectionProfile.from_env()
+        self._max_connections = int(os.getenv('WMS_DB_POOL_SIZE', 5))
+        self._timeout = float(os.getenv('WMS_DB_POOL_TIMEOUT', 5))
+        self._idle_check = float(os.getenv('WMS_DB_POOL_IDLE_CHECK', 60))
+        # Idle connections as (connection, returned_at, needs_check)
         self._pool = Queue(maxsize=self._max_connections)
-        for _ in range(self._max_connections):
-            conn = self._create_connection()
-            self._pool.put(conn)
+        self._state_lock = Lock()
+        self._created = 0
+        self._in_use = 0
+        self._checkout_times = deque(maxlen=10000)
+        self._metrics = {
+            'checkouts': 0,
+            'timeouts': 0,
+            'created': 0,
+            'replaced': 0,
+            'health_checks': 0,
+            'total_wait_ms': 0.0,
+            'max_wait_ms': 0.0,
+        }
+        self._wait_histogram = [0] * (len(self.WAIT_BUCKETS_MS) + 1)
 
     def _create_connection(self):
-        conn = sqlite3.connect(get_db_path(), check_same_thread=False)
+        if self._read_only:
+            uri = Path(get_db_path()).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            conn = sqlite3.connect(get_db_path(), check_same_thread=False)
         conn.row_factory = sqlite3.Row
+        self._profile.apply(conn, read_only=self._read_only)
         return conn
 
+    def _reserve_slot(self):
+        with self._state_lock:
+            if self._created < self._max_connections:
+                self._created += 1
+                return True
+            return False
+
+    def _release_slot(self):
+        with self._state_lock:
+            self._created -= 1
+
+    def _new_connection(self):
+        """Create a connection for a reserved slot"""
+        try:
+            conn = self._create_connection()
+        except Exception:
+            self._release_slot()
+            raise
+        with self._state_lock:
+            self._metrics['created'] += 1
+        return conn
+
+    def _discard(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass  # Ignore close errors
+        self._release_slot()
+        with self._state_lock:
+            self._metrics['replaced'] += 1
+
+    def _is_healthy(self, conn):
+        with self._state_lock:
+            self._metrics['health_checks'] += 1
+        try:
+            conn.execute('SELECT 1').fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
     def get_connection(self):
+        started = time.perf_counter()
         try:
             if self._pool is None:
                 raise sqlite3.Error("Connection pool is not initialized")
-            conn = self._pool.get(timeout=5)  # Add timeout to prevent deadlock
-            # Test connection before returning
-            try:
-                conn.execute('SELECT 1').fetchone()
-                return conn
-            except sqlite3.Error:
-                # Connection is broken, create a new one
+            while True:
                 try:
-                    conn.close()
-                except sqlite3.Error:
-                    pass  # Ignore close errors
-                conn = self._create_connection()
-                return conn
+                    conn, returned_at, needs_check = self._pool.get_nowait()
+                except Empty:
+                    if self._reserve_slot():
+                        conn = self._new_connection()
+                        break
+                    remaining = self._timeout - (time.perf_counter() - started)
+                    try:
+                        conn, returned_at, needs_check = self._pool.get(timeout=max(remaining, 0))
+                    except Empty:
+                        with self._state_lock:
+                            self._metrics['timeouts'] += 1
+                        raise sqlite3.Error(
+                            f"timed out after {self._timeout}s waiting for one of {self._max_connections} connections"
+                        )
+                if needs_check or time.monotonic() - returned_at > self._idle_check:
+                    if not self._is_healthy(conn):
+                        self._discard(conn)
+                        continue
+                break
         except Exception as e:
             raise sqlite3.Error(f"Failed to get database connection: {str(e)}")
 
-    def return_connection(self, conn):
-        if conn:
-            try:
-                # Always rollback any uncommitted changes
+        wait_ms = (time.perf_counter() - started) * 1000
+        with self._state_lock:
+            self._in_use += 1
+            self._metrics['checkouts'] += 1
+            self._metrics['total_wait_ms'] += wait_ms
+            self._metrics['max_wait_ms'] = max(self._metrics['max_wait_ms'], wait_ms)
+            self._wait_histogram[bisect_left(self.WAIT_BUCKETS_MS, wait_ms)] += 1
+            self._checkout_times.append(time.monotonic())
+        return conn
+
+    def return_connection(self, conn, failed=False):
+        """Give a connection back; `failed` marks it for a health check before its next use"""
+        if not conn:
+            return
+        with self._state_lock:
+            self._in_use -= 1
+        try:
+            if conn.in_transaction:
                 conn.rollback()
-                # Test connection before returning to pool
-                try:
-                    conn.execute('SELECT 1').fetchone()
-                    if self._pool is not None:
-                        self._pool.put(conn)
-                    else:
-                        conn.close()
-                except sqlite3.Error:
-                    try:
-                        conn.close()
-                    except sqlite3.Error:
-                        pass  # Ignore close errors
-                    if self._pool is not None:
-                        self._pool.put(self._create_connection())
-                    else:
-                        raise sqlite3.Error("Connection pool is not initialized")
-            except Exception as e:
-                # If anything goes wrong, ensure we don't lose a pool slot
-                try:
-                    conn.close()
-                except sqlite3.Error:
-                    pass  # Ignore close errors
-                # Check if pool exists before attempting to put new connection
-                if self._pool is not None:
-                    try:
-                        self._pool.put(self._create_connection())
-                    except Exception as e:
-                        raise sqlite3.Error(f"Failed to replace broken connection: {str(e)}")
-                else:
-                    raise sqlite3.Error("Connection pool is not initialized")
+        except sqlite3.Error:
+            self._discard(conn)
+            return
+        if self._pool is None:
+            conn.close()
+            return
+        self._pool.put((conn, time.monotonic(), failed))
 
-def get_db_path():
-    return os.path.join(os.path.dirname(os.path.dirname(__file__)), 'wms.db')
+    def metrics(self):
+        """Checkout rate, wait-time histogram, timeouts and replaced connections"""
+        now = time.monotonic()
+        with self._state_lock:
+            metrics = dict(self._metrics)
+            metrics['size'] = self._max_connections
+            metrics['open'] = self._created
+            metrics['in_use'] = self._in_use
+            recent = sum(1 for checked_out in self._checkout_times if now - checked_out <= 60)
+            histogram = list(self._wait_histogram)
+        metrics['checkouts_per_sec'] = recent / 60
+        total_wait_ms = metrics.pop('total_wait_ms')
+        metrics['avg_wait_ms'] = total_wait_ms / metrics['checkouts'] if metrics['checkouts'] else 0.0
+        labels = [f'<={bound}ms' for bound in self.WAIT_BUCKETS_MS] + [f'>{self.WAIT_BUCKETS_MS[-1]}ms']
+        metrics['wait_histogram'] = dict(zip(labels, histogram))
+        return metrics
+
+class ReadOnlyConnectionPool(DatabaseConnectionPool):
+    """Pool of mode=ro connections used by read paths so they never contend with writers"""
+    _instance = None
+    _read_only = True
 
-def get_schema_path():
-    return os.path.join(os.path.dirname(__file__), 'schema.sql')
+def get_db_path():
+    return os.getenv('WMS_DB_PATH') or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'wms.db')
 
 @contextmanager
-def get_db_connection():
-    """Get a database connection using connection pool for better resource management"""
-    pool = DatabaseConnectionPool()
+def get_db_read_connection():
+    """Get a read-only database connection from the read pool"""
+    pool = ReadOnlyConnectionPool()
     conn = None
+    failed = False
     try:
         conn = pool.get_connection()
         yield conn
-        try:
-            conn.commit()
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise sqlite3.Error(f"Failed to commit transaction: {str(e)}")
-    except Exception as e:
-        if conn:
-            conn.rollback()
-        raise e
+    except sqlite3.Error:
+        failed = True
+        raise
     finally:
         if conn:
-            pool.return_connection(conn)
+            pool.return_connection(conn, failed)
+
+class DatabaseWriter:
+    """Single writer thread that serializes every mutation through one connection.
+
+    Jobs are callables receiving the writer connection. Jobs submitted while a
+    batch is being collected are grouped into one transaction (group commit):
+    each job runs inside its own savepoint so a failing job only rolls back its
+    own changes, and the whole batch is committed with a single fsync.
+    """
+    _instance = None
+    _lock = Lock()
+    _stop = object()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    # Publish the instance only once it is fully initialized
+                    instance = super(DatabaseWriter, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        self._profile = ConnectionProfile.from_env()
+        self._group_commit_window = float(os.getenv('WMS_DB_GROUP_COMMIT_MS', 5)) / 1000
+        self._max_batch_size = int(os.getenv('WMS_DB_GROUP_COMMIT_MAX', 256))
+        self._queue = Queue()
+        self._conn = None
+        # Held while a batch uses the connection; data_version() only reads it in between
+        self._conn_lock = Lock()
+        self._data_version = None
+        self._running = True
+        self._thread = Thread(target=self._run, name='wms-db-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def _create_connection(self):
+        # Autocommit mode: transactions are managed explicitly by the batch loop
+        conn = sqlite3.connect(get_db_path(), check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        self._profile.apply(conn)
+        return conn
+
+    def submit(self, job, *args, **kwargs):
+        """Queue `job(conn, *args, **kwargs)` and return a Future with its result"""
+        future = Future()
+        if current_thread() is self._thread:
+            # Nested write from inside a running job: it already owns the transaction
+            try:
+                future.set_result(job(self._conn, *args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+        if not self._running:
+            raise sqlite3.Error("Database writer is stopped")
+        self._queue.put((future, job, args, kwargs))
+        return future
+
+    def shutdown(self, timeout=5):
+        """Stop accepting jobs, commit everything already queued and close the connection"""
+        if not self._running:
+            return
+        self._running = False
+        self._queue.put(self._stop)
+        self._thread.join(timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is self._stop:
+                break
+            batch = [item]
+            deadline = time.monotonic() + self._group_commit_window
+            while len(batch) < self._max_batch_size:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except Empty:
+                    break
+                if item is self._stop:
+                    stopping = True
+                    break
+                batch.append(item)
+            with self._conn_lock:
+                self._execute_batch(batch)
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def data_version(self):
+        """PRAGMA data_version of the writer connection.
+
+        Every write of this process goes through this connection, so the value
+        only changes when another process (or connection) commits. While a batch
+        holds the connection the last value read is returned: no other
+        connection can commit during the batch anyway.
+        """
+        if not self._conn_lock.acquire(blocking=False):
+            return self._data_version
+        try:
+            if self._conn is None:
+                self._conn = self._create_connection()
+            self._data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            return self._data_version
+        finally:
+            self._conn_lock.release()
+
+    def _execute_batch(self, batch):
+        outcomes = []
+        try:
+            if self._conn is None:
+                self._conn = self._create_connection()
+            conn = self._conn
+            conn.execute('BEGIN IMMEDIATE')
+            for future, job, args, kwargs in batch:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                conn.execute('SAVEPOINT job')
+                try:
+                    result = job(conn, *args, **kwargs)
+                except Exception as e:
+                    conn.execute('ROLLBACK TO job')
+                    conn.execute('RELEASE job')
+                    outcomes.append((future, e, False))
+                else:
+                    conn.execute('RELEASE job')
+                    outcomes.append((future, result, True))
+            conn.execute('COMMIT')
+        except Exception as e:
+            error = sqlite3.Error(f"Failed to commit transaction: {str(e)}")
+            if self._conn is not None:
+                try:
+                    if self._conn.in_transaction:
+                        self._conn.rollback()
+                except sqlite3.Error:
+                    # Connection is unusable, reopen it for the next batch
+                    self._conn.close()
+                    self._conn = None
+            for future, _, _, _ in batch:
+                if not future.done() and (future.running() or future.set_running_or_notify_cancel()):
+                    future.set_exception(error)
+            return
+        for future, value, ok in outcomes:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+def submit_write(job, *args, **kwargs):
+    """Queue a write job on the writer thread and return its Future"""
+    return DatabaseWriter().submit(job, *args, **kwargs)
+
+def execute_write(job, *args, **kwargs):
+    """Run a write job on the writer thread and wait for its result"""
+    return submit_write(job, *args, **kwargs).result()
+
+class AuditLogger:
+    """Buffers process_history entries in memory and writes them in batches.
+
+    A background thread flushes the buffer when it reaches WMS_AUDIT_BATCH_SIZE
+    entries or every WMS_AUDIT_FLUSH_MS milliseconds, whichever comes first.
+    Entries keep the timestamp of the moment they were logged. Pending entries
+    are flushed on clean interpreter shutdown. A batch that fails
+    WMS_AUDIT_MAX_RETRIES times in a row is written entry by entry and the
+    entries that still fail are dropped (counted as 'rejected'), so one bad
+    entry cannot block the log.
+    """
+    _instance = None
+    _lock = Lock()
+
+    def __new__(cls):
+        if cls._instance is None:
+            with cls._lock:
+                if cls._instance is None:
+                    # Publish the instance only once it is fully initialized
+                    instance = super(AuditLogger, cls).__new__(cls)
+                    instance._initialize()
+                    cls._instance = instance
+        return cls._instance
+
+    def _initialize(self):
+        # Start the writer first so its exit hook runs after ours (atexit is LIFO)
+        DatabaseWriter()
+        self._batch_size = int(os.getenv('WMS_AUDIT_BATCH_SIZE', 100))
+        self._flush_interval = float(os.getenv('WMS_AUDIT_FLUSH_MS', 500)) / 1000
+        self._max_queue = int(os.getenv('WMS_AUDIT_MAX_QUEUE', 10000))
+        self._max_retries = int(os.getenv('WMS_AUDIT_MAX_RETRIES', 3))
+        self._failed_attempts = 0
+        self._buffer = deque()
+        self._condition = Condition()
+        self._flush_requested = False
+        self._in_flight = 0
+        self._running = True
+        self._metrics = {
+            'enqueued': 0,
+            'flushed': 0,
+            'dropped': 0,
+            'rejected': 0,
+            'flushes': 0,
+            'failed_flushes': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+        }
+        self._thread = Thread(target=self._run, name='wms-audit-logger', daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+
+    def log(self, operation_type, sub_operation, status, details=None, user_id=None):
+        """Queue an entry; blocks briefly if the buffer is full, then drops it"""
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+        # Stored as TEXT; anything else (e.g. a dict of details) would fail the whole batch
+        entry = (
+            _as_text(operation_type), _as_text(sub_operation), _as_text(status),
+            timestamp, _as_text(details), _as_text(user_id)
+        )
+        if not self._running:
+            # Logged during shutdown: nothing will flush the buffer anymore
+            execute_write(ProcessHistoryDB._insert_entries, [entry])
+            return True
+        with self._condition:
+            if len(self._buffer) >= self._max_queue:
+                self._condition.notify_all()
+                self._condition.wait_for(lambda: len(self._buffer) < self._max_queue, timeout=self._flush_interval * 4)
+                if len(self._buffer) >= self._max_queue:
+                    self._metrics['dropped'] += 1
+                    return False
+            self._buffer.append(entry)
+            self._metrics['enqueued'] += 1
+            if len(self._buffer) >= self._batch_size:
+                self._condition.notify_all()
+        return True
+
+    def flush(self, timeout=None):
+        """Write every queued entry now and wait until they are committed"""
+        with self._condition:
+            if not self._running:
+                return not self._buffer
+            self._flush_requested = True
+            self._condition.notify_all()
+            return self._condition.wait_for(lambda: not self._buffer and not self._in_flight, timeout=timeout)
+
+    def metrics(self):
+        """Queue depth and flush statistics"""
+        with self._condition:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = len(self._buffer)
+        total_flush_ms = metrics.pop('total_flush_ms')
+        metrics['avg_flush_ms'] = total_flush_ms / metrics['flushes'] if metrics['flushes'] else 0.0
+        return metrics
+
+    def shutdown(self, timeout=5):
+        """Stop the background thread after a final flush"""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._condition.notify_all()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: len(self._buffer) >= self._batch_size or self._flush_requested or not self._running,
+                    timeout=self._flush_interval
+                )
+                if not self._buffer:
+                    self._flush_requested = False
+                    self._condition.notify_all()
+                    if not self._running:
+                        return
+                    continue
+                batch = list(self._buffer)
+                self._buffer.clear()
+                self._in_flight = len(batch)
+            start = time.perf_counter()
+            isolate = self._failed_attempts >= self._max_retries
+            try:
+                if isolate:
+                    written = execute_write(ProcessHistoryDB._insert_each_entry, batch)
+                else:
+                    written = execute_write(ProcessHistoryDB._insert_entries, batch)
+            except Exception:
+                with self._condition:
+                    self._in_flight = 0
+                    self._metrics['failed_flushes'] += 1
+                    if isolate:
+                        # Not even entry by entry: give the batch up rather than block the log
+                        self._metrics['rejected'] += len(batch)
+                        self._failed_attempts = 0
+                        self._condition.notify_all()
+                    else:
+                        # Keep the entries for the next attempt, ahead of newer ones
+                        self._buffer.extendleft(reversed(batch))
+                        self._failed_attempts += 1
+                    if not self._running:
+                        return
+                time.sleep(self._flush_interval)
+                continue
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            with self._condition:
+                self._in_flight = 0
+                self._failed_attempts = 0
+                self._metrics['rejected'] += len(batch) - written
+                self._metrics['flushed'] += written
+                self._metrics['flushes'] += 1
+                self._metrics['last_flush_ms'] = elapsed_ms
+                self._metrics['max_flush_ms'] = max(self._metrics['max_flush_ms'], elapsed_ms)
+                self._metrics['total_flush_ms'] += elapsed_ms
+                if not self._buffer:
+                    self._flush_requested = False
+                self._condition.notify_all()
+
+def _data_version():
+    """PRAGMA data_version seen by the writer connection (changes only on other processes' commits)"""
+    return DatabaseWriter().data_version()
+
+# Reference datasets re-read on every Streamlit rerun (products, categories, locations)
+reference_cache = ReferenceCache(
+    data_version_probe=_data_version,
+    max_age=float(os.getenv('WMS_CACHE_MAX_AGE', 300))
+)
+
+# Barcode/SKU -> product lookups of the scan path
+product_lookup_cache = LookupCache(
+    reference_cache,
+    'products',
+    maxsize=int(os.getenv('WMS_SKU_CACHE_SIZE', 5000)),
+    ttl=float(os.getenv('WMS_SKU_CACHE_TTL', 60))
+)
+
+def execute_cached_write(job, *datasets):
+    """Run a write job and invalidate the cached reference datasets it changes"""
+    result = execute_write(job)
+    reference_cache.bump(*datasets)
+    return result
+
+_database_initialized = False
+_init_lock = Lock()
 
 def init_database():
-    """Initialize the database with schema"""
-    db_path = get_db_path()
-    schema_path = get_schema_path()
-    
-    # Create database directory if it doesn't exist
-    Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
-    
-    with get_db_connection() as conn:
-        with open(schema_path, 'r') as schema_file:
-            conn.executescript(schema_file.read())
+    """Apply pending schema migrations; later calls in the same process are a no-op"""
+    global _database_initialized
+    if _database_initialized:
+        return
+    with _init_lock:
+        if _database_initialized:
+            return
+        db_path = get_db_path()
+        
+        # Create database directory if it doesn't exist
+        Path(os.path.dirname(db_path)).mkdir(parents=True, exist_ok=True)
+        
+        conn = sqlite3.connect(db_path, isolation_level=None)
+        try:
+            ConnectionProfile.from_env().apply(conn)
+            run_migrations(conn)
+        finally:
+            conn.close()
+        _database_initialized = True
+
+def insert_rows(conn, sql, rows, chunk_size=500):
+    """Insert `rows` with executemany in chunks, reporting constraint conflicts per row.
+
+    Each chunk runs inside a savepoint; if it hits an IntegrityError the chunk is
+    rolled back and replayed row by row so the conflicting rows are skipped and
+    reported while the rest of the batch is still inserted.
+    Returns (inserted_count, conflicts) where conflicts is a list of
+    {'index', 'row', 'error'} dicts.
+    """
+    inserted = 0
+    conflicts = []
+    rows = iter(rows)
+    start = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        conn.execute('SAVEPOINT bulk_chunk')
+        try:
+            conn.executemany(sql, chunk)
+            conn.execute('RELEASE bulk_chunk')
+            inserted += len(chunk)
+        except sqlite3.IntegrityError:
+            conn.execute('ROLLBACK TO bulk_chunk')
+            conn.execute('RELEASE bulk_chunk')
+            for offset, row in enumerate(chunk):
+                try:
+                    conn.execute(sql, row)
+                    inserted += 1
+                except sqlite3.IntegrityError as e:
+                    conflicts.append({'index': start + offset, 'row': row, 'error': str(e)})
+        start += len(chunk)
+    return inserted, conflicts
+
+def iter_query(sql, params=(), chunk_size=1000):
+    """Yield rows of a read query in fetchmany chunks, holding one read connection until exhausted"""
+    with get_db_read_connection() as conn:
+        cursor = conn.execute(sql, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cursor.close()
+
+def _timestamp_bound(value, inclusive_day=False):
+    """Format a date/datetime as a process_history timestamp bound"""
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        if inclusive_day:
+            value += timedelta(days=1)
+        return value.strftime('%Y-%m-%d')
+    return str(value)
+
+@contextmanager
+def movement_context(conn, order_id=None, reason=None):
+    """Describe the stock movements journaled by the ledger triggers inside this block.
+
+    Must be used on the writer connection within a write job: the context row
+    is removed before the job ends, so it is never committed.
+    """
+    if order_id is None and reason is None:
+        yield
+        return
+    previous = conn.execute('SELECT order_id, reason FROM stock_movement_context').fetchone()
+    conn.execute(
+        'INSERT OR REPLACE INTO stock_movement_context (context_id, order_id, reason) VALUES (1, ?, ?)',
+        (order_id, reason)
+    )
+    try:
+        yield
+    finally:
+        if previous is None:
+            conn.execute('DELETE FROM stock_movement_context')
+        else:
+            conn.execute(
+                'UPDATE stock_movement_context SET order_id = ?, reason = ?',
+                (previous['order_id'], previous['reason'])
+            )
 
 # Database operation classes
 class ProductDB:
     @staticmethod
     def add_category(name):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO categories (name) VALUES (?)',
                 (name,)
             )
             return cursor.lastrowid
+        return execute_cached_write(_write, 'categories')
     
     @staticmethod
     def get_all_categories():
-        with get_db_connection() as conn:
-            return conn.execute('SELECT * FROM categories').fetchall()
+        def _load():
+            with get_db_read_connection() as conn:
+                return conn.execute('SELECT * FROM categories').fetchall()
+        return list(reference_cache.get('categories', _load))
     
     @staticmethod
     def delete_category(category_id):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             # Check if category has products
             products = cursor.execute('SELECT COUNT(*) FROM products WHERE category_id = ?', (category_id,)).fetchone()[0]
@@ -152,10 +763,11 @@ class ProductDB:
                 return False
             cursor.execute('DELETE FROM categories WHERE category_id = ?', (category_id,))
             return True
+        return execute_cached_write(_write, 'categories')
     
     @staticmethod
     def add_product(sku, code, name, description, category_id, min_stock=0, max_stock=None, stock=0):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             # Check for existing SKU
             cursor.execute('SELECT COUNT(*) FROM products WHERE sku = ?', (sku,))
@@ -169,108 +781,498 @@ class ProductDB:
                 (sku, code, name, description, category_id, min_stock, max_stock, stock, is_duplicate)
             )
             return cursor.lastrowid, is_duplicate
+        return execute_cached_write(_write, 'products')
+    
+    @staticmethod
+    def add_products_bulk(products, chunk_size=500):
+        """Insert many products in one transaction.
+
+        `products` is an iterable of dicts with the add_product fields. SKUs already
+        present (in the database or in an earlier inserted row of the batch) are
+        inserted with is_duplicate set, as add_product does. Rows violating a
+        constraint (e.g. a repeated code) are skipped and reported in 'conflicts';
+        a skipped row does not make later rows with its SKU duplicates.
+        """
+        def _write(conn):
+            result = {'inserted': 0, 'duplicates': [], 'conflicts': []}
+            products_iter = iter(products)
+            start = 0
+            while True:
+                chunk = list(islice(products_iter, chunk_size))
+                if not chunk:
+                    break
+                skus = list({product['sku'] for product in chunk})
+                seen_skus = set()
+                for i in range(0, len(skus), 900):
+                    batch = skus[i:i + 900]
+                    placeholders = ','.join('?' * len(batch))
+                    seen_skus.update(row[0] for row in conn.execute(
+                        f'SELECT DISTINCT sku FROM products WHERE sku IN ({placeholders})', batch
+                    ))
+                rows = [
+                    (
+                        product['sku'], product['code'], product['name'], product.get('description'),
+                        product.get('category_id'), product.get('min_stock', 0), product.get('max_stock'),
+                        product.get('stock', 0), product['sku']
+                    )
+                    for product in chunk
+                ]
+                # is_duplicate is decided per row at insert time, so only rows that
+                # were actually inserted count for the SKUs that follow
+                inserted, conflicts = insert_rows(
+                    conn,
+                    '''INSERT INTO products (sku, code, name, description, category_id, min_stock, max_stock, stock, is_duplicate)
+                       SELECT ?, ?, ?, ?, ?, ?, ?, ?, EXISTS (SELECT 1 FROM products WHERE sku = ?)''',
+                    rows,
+                    chunk_size
+                )
+                # Report the same duplicates the insert flagged
+                skipped = {conflict['index'] for conflict in conflicts}
+                for offset, product in enumerate(chunk):
+                    if offset in skipped:
+                        continue
+                    if product['sku'] in seen_skus:
+                        result['duplicates'].append({'index': start + offset, 'sku': product['sku']})
+                    seen_skus.add(product['sku'])
+                result['inserted'] += inserted
+                for conflict in conflicts:
+                    conflict['index'] += start
+                result['conflicts'].extend(conflicts)
+                start += len(chunk)
+            return result
+        return execute_cached_write(_write, 'products')
     
     @staticmethod
     def get_all_products():
-        with get_db_connection() as conn:
-            return conn.execute(
-                '''SELECT p.product_id, p.sku, p.code, p.name, p.description, 
-                   p.min_stock, p.max_stock, p.stock, p.category_id, c.name as category_name 
-                   FROM products p 
-                   LEFT JOIN categories c ON p.category_id = c.category_id'''
-            ).fetchall()
+        def _load():
+            with get_db_read_connection() as conn:
+                return conn.execute(
+                    '''SELECT p.product_id, p.sku, p.code, p.name, p.description, 
+                       p.min_stock, p.max_stock, p.stock, p.category_id, c.name as category_name 
+                       FROM products p 
+                       LEFT JOIN categories c ON p.category_id = c.category_id'''
+                ).fetchall()
+        return list(reference_cache.get('products', _load))
 
     @staticmethod
     def get_product_by_sku(sku):
-        with get_db_connection() as conn:
+        product = product_lookup_cache.get(('sku', sku), lambda: ProductDB._fetch_product('p.sku = ?', sku))
+        return dict(product) if product else None
+
+    @staticmethod
+    def get_product_by_code(code):
+        product = product_lookup_cache.get(('code', code), lambda: ProductDB._fetch_product('p.code = ?', code))
+        return dict(product) if product else None
+
+    @staticmethod
+    def lookup_barcode(barcode):
+        """Resolve scanned barcode data to a product, matching the SKU first and then the code"""
+        return ProductDB.get_product_by_sku(barcode) or ProductDB.get_product_by_code(barcode)
+
+    @staticmethod
+    def get_products_by_codes(barcodes, chunk_size=400):
+        """Resolve many scanned barcodes at once, with the SKU-then-code precedence of lookup_barcode.
+
+        Runs one query per chunk of distinct barcodes instead of one lookup per
+        barcode. Returns {barcode: product} for the barcodes that matched.
+        """
+        barcodes = list(dict.fromkeys(b for b in barcodes if b))
+        by_sku, by_code = {}, {}
+        with get_db_read_connection() as conn:
+            for start in range(0, len(barcodes), chunk_size):
+                chunk = barcodes[start:start + chunk_size]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = conn.execute(
+                    f'''SELECT p.*, c.name as category
+                       FROM products p
+                       LEFT JOIN categories c ON p.category_id = c.category_id
+                       WHERE p.sku IN ({placeholders}) OR p.code IN ({placeholders})''',
+                    chunk + chunk
+                ).fetchall()
+                for row in rows:
+                    # Like the single lookups, the lowest product id wins on duplicates
+                    for index, key in ((by_sku, row['sku']), (by_code, row['code'])):
+                        if key not in index or row['product_id'] < index[key]['product_id']:
+                            index[key] = row
+        products = {}
+        for barcode in barcodes:
+            row = by_sku.get(barcode) or by_code.get(barcode)
+            if row is not None:
+                products[barcode] = dict(row)
+        return products
+
+    @staticmethod
+    def _fetch_product(condition, value):
+        with get_db_read_connection() as conn:
             product = conn.execute(
-                '''SELECT p.*, c.name as category
+                f'''SELECT p.*, c.name as category
                    FROM products p
                    LEFT JOIN categories c ON p.category_id = c.category_id
-                   WHERE p.sku = ?''',
-                (sku,)
+                   WHERE {condition}''',
+                (value,)
             ).fetchone()
             return dict(product) if product else None
 
     @staticmethod
-    def update_stock(product_id, quantity_change):
-        """Update product stock by adding or subtracting quantity"""
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            # Get current stock
-            current_stock = cursor.execute(
-                'SELECT stock FROM products WHERE product_id = ?',
-                (product_id,)
-            ).fetchone()
-            
-            if current_stock is None:
+    def update_stock(product_id, quantity_change, reason=None, order_id=None):
+        """Update product stock by adding or subtracting quantity.
+
+        `reason` and `order_id` are recorded on the stock ledger movement.
+        """
+        def _write(conn):
+            with movement_context(conn, order_id, reason):
+                # Single statement: concurrent updates cannot overwrite each other
+                cursor = conn.execute(
+                    'UPDATE products SET stock = COALESCE(stock, 0) + ? WHERE product_id = ?',
+                    (quantity_change, product_id)
+                )
+            if cursor.rowcount == 0:
                 raise ValueError(f"Product with ID {product_id} not found")
-            
-            # Calculate new stock
-            new_stock = current_stock['stock'] + quantity_change
-            
-            # Update stock
-            cursor.execute(
-                'UPDATE products SET stock = ? WHERE product_id = ?',
-                (new_stock, product_id)
-            )
             return True
+        return execute_cached_write(_write, 'products')
+
+    @staticmethod
+    def apply_stock_deltas(deltas, reason=None, order_id=None):
+        """Apply (product_id, quantity_change) pairs in one transaction.
+
+        Changes to the same product are summed first, so a reception of any size
+        is one UPDATE per distinct product and a single commit. Raises ValueError
+        (and applies nothing) if any product does not exist.
+        """
+        def _write(conn):
+            with movement_context(conn, order_id, reason):
+                return ProductDB._apply_stock_deltas(conn, deltas)
+        return execute_cached_write(_write, 'products')
+
+    @staticmethod
+    def _apply_stock_deltas(conn, deltas):
+        """apply_stock_deltas body for use inside other writer jobs; returns {product_id: change}"""
+        totals = {}
+        for product_id, quantity_change in deltas:
+            totals[product_id] = totals.get(product_id, 0) + quantity_change
+        totals = {product_id: change for product_id, change in totals.items() if change}
+        if not totals:
+            return totals
+        cursor = conn.executemany(
+            'UPDATE products SET stock = COALESCE(stock, 0) + ? WHERE product_id = ?',
+            ((change, product_id) for product_id, change in totals.items())
+        )
+        if cursor.rowcount != len(totals):
+            placeholders = ', '.join('?' * len(totals))
+            found = {
+                row[0] for row in conn.execute(
+                    f'SELECT product_id FROM products WHERE product_id IN ({placeholders})', list(totals)
+                )
+            }
+            missing = sorted(set(totals) - found)
+            raise ValueError(f"Products with IDs {', '.join(map(str, missing))} not found")
+        return totals
 
 class ProcessHistoryDB:
     @staticmethod
-    def log_process(operation_type, sub_operation, status, details=None, user_id=None):
-        """Log a process completion to the process_history table"""
-        with get_db_connection() as conn:
+    def log_process(operation_type, sub_operation, status, details=None, user_id=None, buffered=True):
+        """Log a process completion to the process_history table.
+
+        By default the entry is queued on the AuditLogger and written in the next
+        batch; pass buffered=False to write it immediately and get its process_id.
+        """
+        if buffered:
+            AuditLogger().log(operation_type, sub_operation, status, details, user_id)
+            return None
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO process_history (operation_type, sub_operation, status, details, user_id) VALUES (?, ?, ?, ?, ?)',
                 (operation_type, sub_operation, status, details, user_id)
             )
             return cursor.lastrowid
+        return execute_write(_write)
     
     @staticmethod
-    def get_process_history(limit=None):
-        """Get process history records, optionally limited to a specific number"""
-        with get_db_connection() as conn:
-            if limit:
-                history = conn.execute(
-                    'SELECT * FROM process_history ORDER BY timestamp DESC LIMIT ?',
-                    (limit,)
-                ).fetchall()
+    def log_processes(entries):
+        """Write (operation_type, sub_operation, status, timestamp, details, user_id) tuples in one transaction"""
+        return execute_write(ProcessHistoryDB._insert_entries, entries)
+
+    _insert_query = 'INSERT INTO process_history (operation_type, sub_operation, status, timestamp, details, user_id) VALUES (?, ?, ?, ?, ?, ?)'
+
+    @staticmethod
+    def _insert_entries(conn, entries):
+        conn.executemany(ProcessHistoryDB._insert_query, entries)
+        return len(entries)
+
+    @staticmethod
+    def _insert_each_entry(conn, entries):
+        """Insert entries one by one, skipping those that fail; returns the number inserted"""
+        inserted = 0
+        for entry in entries:
+            conn.execute('SAVEPOINT entry')
+            try:
+                conn.execute(ProcessHistoryDB._insert_query, entry)
+            except sqlite3.Error:
+                conn.execute('ROLLBACK TO entry')
             else:
-                history = conn.execute(
-                    'SELECT * FROM process_history ORDER BY timestamp DESC'
-                ).fetchall()
-            return [dict(record) for record in history]
+                inserted += 1
+            conn.execute('RELEASE entry')
+        return inserted
 
-class InventoryDB:
     @staticmethod
-    def add_inventory(product_id, location_id, quantity, min_quantity=0, max_quantity=None):
-        with get_db_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                'INSERT INTO inventory (product_id, location_id, quantity, min_quantity, max_quantity) VALUES (?, ?, ?, ?, ?)',
-                (product_id, location_id, quantity, min_quantity, max_quantity)
+    def get_process_history(limit=None, before_id=None, after_id=None, operation_type=None, status=None, user_id=None, date_from=None, date_to=None):
+        """Get process history records, newest first, optionally limited and filtered.
+
+        Pagination is keyset based: pass the process_id of the last record of the
+        previous page as `before_id`, or the newest known process_id as `after_id`
+        to fetch only newer records. `date_from`/`date_to` are inclusive dates
+        or datetimes compared against the stored UTC timestamp. Archived
+        records (see history_archive) are included after the hot ones.
+        """
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append('process_id < ?')
+            params.append(before_id)
+        if after_id is not None:
+            conditions.append('process_id > ?')
+            params.append(after_id)
+        if operation_type:
+            conditions.append('operation_type = ?')
+            params.append(operation_type)
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if user_id:
+            conditions.append('user_id = ?')
+            params.append(user_id)
+        if date_from:
+            conditions.append('timestamp >= ?')
+            params.append(_timestamp_bound(date_from))
+        if date_to:
+            conditions.append('timestamp < ?')
+            params.append(_timestamp_bound(date_to, inclusive_day=True))
+        where = ' AND '.join(conditions)
+        query = 'SELECT * FROM process_history'
+        if conditions:
+            query += ' WHERE ' + where
+        query += ' ORDER BY process_id DESC'
+        with get_db_read_connection() as conn:
+            history = [
+                dict(record)
+                for record in conn.execute(query + (' LIMIT ?' if limit else ''), params + ([limit] if limit else []))
+            ]
+
+        # Records older than the retention horizon live in the monthly archives;
+        # a page the hot table cannot fill continues there (new records are always hot)
+        if after_id is None and (not limit or len(history) < limit):
+            from .history_archive import HistoryArchiver
+            archived = HistoryArchiver().iter_archived(
+                where, params,
+                date_from=_timestamp_bound(date_from) if date_from else None,
+                date_to=_timestamp_bound(date_to, inclusive_day=True) if date_to else None
             )
-            inventory_id = cursor.lastrowid
-            return inventory_id
-    
+            history.extend(dict(record) for record in islice(archived, limit - len(history) if limit else None))
+        return history
+
     @staticmethod
-    def get_inventory_levels():
-        with get_db_connection() as conn:
-            inventory = conn.execute(
-                '''SELECT i.*, p.name as product_name, p.sku, 
+    def get_process_history_page(page_size=50, before_id=None, **filters):
+        """Return (records, next_before_id); next_before_id is None on the last page"""
+        records = ProcessHistoryDB.get_process_history(limit=page_size + 1, before_id=before_id, **filters)
+        if len(records) > page_size:
+            records = records[:page_size]
+            return records, records[-1]['process_id']
+        return records, None
+
+    @staticmethod
+    def iter_process_history(chunk_size=1000):
+        """Stream the whole process history in insertion order, archived months first"""
+        from .history_archive import HistoryArchiver
+        return HistoryArchiver().iter_history(chunk_size=chunk_size)
+
+class InventoryDB:
+    _levels_query = '''SELECT i.*, p.name as product_name, p.sku, 
                    l.zone, l.aisle, l.shelf, l.position
                    FROM inventory i
                    JOIN products p ON i.product_id = p.product_id
                    JOIN locations l ON i.location_id = l.location_id'''
-            ).fetchall()
+
+    # A slot (product, location) has one row; adding to an occupied slot accumulates
+    # the quantity and keeps the thresholds already configured for it
+    _upsert_query = '''INSERT INTO inventory (product_id, location_id, quantity, min_quantity, max_quantity)
+                   VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (product_id, location_id)
+                   DO UPDATE SET quantity = COALESCE(quantity, 0) + excluded.quantity'''
+
+    @staticmethod
+    def add_inventory(product_id, location_id, quantity, min_quantity=0, max_quantity=None, reason=None, order_id=None):
+        """Add quantity to a product's slot at a location; returns the slot's inventory_id"""
+        def _write(conn):
+            with movement_context(conn, order_id, reason):
+                inventory_id = conn.execute(
+                    InventoryDB._upsert_query + ' RETURNING inventory_id',
+                    (product_id, location_id, quantity, min_quantity, max_quantity)
+                ).fetchone()[0]
+            return inventory_id
+        return execute_write(_write)
+    
+    @staticmethod
+    def transfer_inventory(product_id, from_location_id, to_location_id, quantity, min_quantity=0, max_quantity=None, reason='transfer', order_id=None):
+        """Move quantity of a product from one slot to another in a single writer job.
+
+        The source slot is decremented (and deleted once empty, see
+        _remove_quantity) and the destination slot incremented (or created with
+        the given thresholds) together, so the ledger gets one
+        movement out and one movement in with the same reason.
+        Returns the destination slot's inventory_id.
+
+        Raises:
+            ValueError: non-positive quantity, same source and destination, or not
+                enough quantity at the source slot; nothing is written in that case
+        """
+        if quantity <= 0:
+            raise ValueError("Transfer quantity must be positive")
+        if from_location_id == to_location_id:
+            raise ValueError("Source and destination locations must differ")
+
+        def _write(conn):
+            with movement_context(conn, order_id, reason):
+                InventoryDB._remove_quantity(conn, product_id, from_location_id, quantity)
+                inventory_id = conn.execute(
+                    InventoryDB._upsert_query + ' RETURNING inventory_id',
+                    (product_id, to_location_id, quantity, min_quantity, max_quantity)
+                ).fetchone()[0]
+            return inventory_id
+        return execute_write(_write)
+
+    @staticmethod
+    def _remove_quantity(conn, product_id, location_id, quantity):
+        """Take quantity out of a slot inside a writer job.
+
+        A slot left empty without a minimum quantity is deleted, so it does not
+        stay in low_stock_inventory (0 <= 0) and on the replenishment list.
+
+        Raises:
+            ValueError: the slot does not hold `quantity`
+        """
+        cursor = conn.execute(
+            'UPDATE inventory SET quantity = quantity - ? WHERE product_id = ? AND location_id = ? AND quantity >= ?',
+            (quantity, product_id, location_id, quantity)
+        )
+        if cursor.rowcount == 0:
+            raise ValueError(f"Not enough quantity of product ID {product_id} at location ID {location_id}")
+        conn.execute(
+            'DELETE FROM inventory WHERE product_id = ? AND location_id = ? AND quantity = 0 AND COALESCE(min_quantity, 0) = 0',
+            (product_id, location_id)
+        )
+
+    @staticmethod
+    def add_inventory_bulk(items, chunk_size=500):
+        """Add many inventory quantities (dicts with add_inventory fields) in one transaction"""
+        def _write(conn):
+            rows = (
+                (item['product_id'], item['location_id'], item['quantity'],
+                 item.get('min_quantity', 0), item.get('max_quantity'))
+                for item in items
+            )
+            inserted, conflicts = insert_rows(
+                conn,
+                InventoryDB._upsert_query,
+                rows,
+                chunk_size
+            )
+            return {'inserted': inserted, 'conflicts': conflicts}
+        return execute_write(_write)
+    
+    @staticmethod
+    def get_inventory_levels():
+        with get_db_read_connection() as conn:
+            inventory = conn.execute(InventoryDB._levels_query).fetchall()
             return inventory
 
+    @staticmethod
+    def iter_inventory_levels(chunk_size=1000):
+        """Stream inventory levels without materializing the whole join"""
+        return iter_query(InventoryDB._levels_query, (), chunk_size)
+
+    @staticmethod
+    def find_duplicate_slots():
+        """(product_id, location_id, rows, quantity) of slots stored in more than one row.
+
+        Always empty once migration 0006 has merged them and added the unique key.
+        """
+        with get_db_read_connection() as conn:
+            return conn.execute(
+                '''SELECT product_id, location_id, COUNT(*) as rows, SUM(quantity) as quantity
+                   FROM inventory
+                   WHERE product_id IS NOT NULL AND location_id IS NOT NULL
+                   GROUP BY product_id, location_id
+                   HAVING COUNT(*) > 1'''
+            ).fetchall()
+
+    @staticmethod
+    def merge_duplicate_slots():
+        """Merge every duplicated slot into its oldest row (keeping that row's thresholds).
+
+        Same merge as migration 0006, journaled as offsetting 'merge' movements.
+        Returns the merged slots as find_duplicate_slots reported them.
+        """
+        def _write(conn):
+            slots = [dict(slot) for slot in conn.execute(
+                '''SELECT product_id, location_id, COUNT(*) as rows, SUM(quantity) as quantity, MIN(inventory_id) as keep_id
+                   FROM inventory
+                   WHERE product_id IS NOT NULL AND location_id IS NOT NULL
+                   GROUP BY product_id, location_id
+                   HAVING COUNT(*) > 1'''
+            )]
+            with movement_context(conn, None, 'merge'):
+                for slot in slots:
+                    conn.execute(
+                        'UPDATE inventory SET quantity = ? WHERE inventory_id = ?',
+                        (slot['quantity'], slot['keep_id'])
+                    )
+                    conn.execute(
+                        'DELETE FROM inventory WHERE product_id = ? AND location_id = ? AND inventory_id != ?',
+                        (slot['product_id'], slot['location_id'], slot['keep_id'])
+                    )
+            return slots
+        return execute_write(_write)
+
+    @staticmethod
+    def get_product_inventory(product_id, zone=None):
+        """Slots holding a product (quantity > 0), optionally only those of one zone"""
+        query = InventoryDB._levels_query + ' WHERE i.product_id = ? AND i.quantity > 0'
+        params = [product_id]
+        if zone:
+            query += ' AND l.zone = ?'
+            params.append(zone)
+        with get_db_read_connection() as conn:
+            return [dict(row) for row in conn.execute(query + ' ORDER BY i.inventory_id', params).fetchall()]
+
+    @staticmethod
+    def get_product_on_hand(product_id):
+        """On-hand quantity of a product summed over all its locations"""
+        with get_db_read_connection() as conn:
+            row = conn.execute('SELECT on_hand FROM product_on_hand WHERE product_id = ?', (product_id,)).fetchone()
+            return row['on_hand'] if row else 0
+
+    @staticmethod
+    def get_low_stock_items():
+        """Inventory rows at or below their minimum quantity (replenishment list)"""
+        with get_db_read_connection() as conn:
+            return conn.execute(
+                f'''{InventoryDB._levels_query}
+                    JOIN low_stock_inventory ls ON ls.inventory_id = i.inventory_id
+                    ORDER BY i.quantity - i.min_quantity'''
+            ).fetchall()
+
+    @staticmethod
+    def get_zone_occupancy():
+        with get_db_read_connection() as conn:
+            return conn.execute(
+                'SELECT zone, total_locations, occupied_locations, quantity FROM zone_occupancy WHERE total_locations > 0 ORDER BY zone'
+            ).fetchall()
+
 class LocationDB:
     @staticmethod
     def add_location(zone, aisle, shelf, position):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO locations (zone, aisle, shelf, position) VALUES (?, ?, ?, ?)',
@@ -278,33 +1280,53 @@ class LocationDB:
             )
             location_id = cursor.lastrowid
             return location_id
+        return execute_cached_write(_write, 'locations')
+    
+    @staticmethod
+    def add_locations_bulk(locations, chunk_size=500):
+        """Insert many (zone, aisle, shelf, position) tuples in one transaction.
+
+        Locations that already exist are skipped and reported in 'conflicts'.
+        """
+        def _write(conn):
+            inserted, conflicts = insert_rows(
+                conn,
+                'INSERT INTO locations (zone, aisle, shelf, position) VALUES (?, ?, ?, ?)',
+                (tuple(location) for location in locations),
+                chunk_size
+            )
+            return {'inserted': inserted, 'conflicts': conflicts}
+        return execute_cached_write(_write, 'locations')
     
     @staticmethod
     def get_all_locations():
-        with get_db_connection() as conn:
-            locations = conn.execute('SELECT * FROM locations').fetchall()
-            return locations
+        def _load():
+            with get_db_read_connection() as conn:
+                return conn.execute('SELECT * FROM locations').fetchall()
+        return list(reference_cache.get('locations', _load))
 
     @staticmethod
     def update_location(location_id, zone, aisle, shelf, position):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'UPDATE locations SET zone = ?, aisle = ?, shelf = ?, position = ? WHERE location_id = ?',
                 (zone, aisle, shelf, position, location_id)
             )
             return cursor.rowcount > 0
+        return execute_cached_write(_write, 'locations')
 
     @staticmethod
     def delete_location(location_id):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute('DELETE FROM locations WHERE location_id = ?', (location_id,))
             return cursor.rowcount > 0
+        return execute_cached_write(_write, 'locations')
 
     @staticmethod
     def duplicate_location(location_id):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             # Get the location to duplicate
             location = cursor.execute('SELECT zone, aisle, shelf, position FROM locations WHERE location_id = ?', (location_id,)).fetchone()
@@ -317,17 +1339,30 @@ class LocationDB:
                 new_id = cursor.lastrowid
                 return new_id
             return None
+        return execute_cached_write(_write, 'locations')
 
     @staticmethod
     def clear_all_locations():
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute('DELETE FROM locations')
+        return execute_cached_write(_write, 'locations')
 
 class OrderDB:
+    _all_orders_query = '''SELECT o.*, ot.name as type_name, ot.code as type_code,
+                   sl.zone as source_zone, sl.aisle as source_aisle, sl.shelf as source_shelf, sl.position as source_position,
+                   dl.zone as dest_zone, dl.aisle as dest_aisle, dl.shelf as dest_shelf, dl.position as dest_position,
+                   COUNT(oi.order_item_id) as item_count
+                   FROM orders o
+                   LEFT JOIN order_types ot ON o.type_id = ot.type_id
+                   LEFT JOIN locations sl ON o.source_location_id = sl.location_id
+                   LEFT JOIN locations dl ON o.destination_location_id = dl.location_id
+                   LEFT JOIN order_items oi ON o.order_id = oi.order_id
+                   GROUP BY o.order_id'''
+
     @staticmethod
     def add_order_type(code, name, description, requires_source_location=False, requires_destination_location=False, affects_stock=True, allowed_source_zones=None, allowed_destination_zones=None):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO order_types (code, name, description, requires_source_location, requires_destination_location, affects_stock, allowed_source_zones, allowed_destination_zones) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
@@ -335,43 +1370,39 @@ class OrderDB:
             )
             type_id = cursor.lastrowid
             return type_id
+        return execute_write(_write)
 
     @staticmethod
     def get_all_order_types():
-        with get_db_connection() as conn:
+        with get_db_read_connection() as conn:
             order_types = conn.execute('SELECT * FROM order_types').fetchall()
             return order_types
 
     @staticmethod
     def create_order(order_number, type_id, source_location_id=None, destination_location_id=None, status='pending'):
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             cursor.execute(
                 'INSERT INTO orders (order_number, type_id, source_location_id, destination_location_id, status) VALUES (?, ?, ?, ?, ?)',
                 (order_number, type_id, source_location_id, destination_location_id, status)
             )
             return cursor.lastrowid
+        return execute_write(_write)
     
     @staticmethod
     def get_all_orders():
-        with get_db_connection() as conn:
-            orders = conn.execute(
-                '''SELECT o.*, ot.name as type_name, ot.code as type_code,
-                   sl.zone as source_zone, sl.aisle as source_aisle, sl.shelf as source_shelf, sl.position as source_position,
-                   dl.zone as dest_zone, dl.aisle as dest_aisle, dl.shelf as dest_shelf, dl.position as dest_position,
-                   COUNT(oi.order_item_id) as item_count
-                   FROM orders o
-                   LEFT JOIN order_types ot ON o.type_id = ot.type_id
-                   LEFT JOIN locations sl ON o.source_location_id = sl.location_id
-                   LEFT JOIN locations dl ON o.destination_location_id = dl.location_id
-                   LEFT JOIN order_items oi ON o.order_id = oi.order_id
-                   GROUP BY o.order_id'''
-            ).fetchall()
+        with get_db_read_connection() as conn:
+            orders = conn.execute(OrderDB._all_orders_query).fetchall()
             return [dict(order) for order in orders]
 
+    @staticmethod
+    def iter_all_orders(chunk_size=1000):
+        """Stream all orders with their type, locations and item count"""
+        return iter_query(OrderDB._all_orders_query, (), chunk_size)
+
     @staticmethod
     def get_order_by_id(order_id):
-        with get_db_connection() as conn:
+        with get_db_read_connection() as conn:
             order = conn.execute(
                 '''SELECT o.*, ot.name as type_name, ot.code as type_code,
                    sl.zone as source_zone, sl.aisle as source_aisle, sl.shelf as source_shelf, sl.position as source_position,
@@ -388,17 +1419,17 @@ class OrderDB:
     @staticmethod
     def add_order_items(order_id, items):
         """Add items to an order with proper error handling"""
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             try:
-                for item in items:
-                    cursor.execute(
-                        'INSERT INTO order_items (order_id, product_id, quantity) VALUES (?, ?, ?)',
-                        (order_id, item['product_id'], item['quantity'])
-                    )
+                cursor.executemany(
+                    'INSERT INTO order_items (order_id, product_id, quantity) VALUES (?, ?, ?)',
+                    ((order_id, item['product_id'], item['quantity']) for item in items)
+                )
                 return True
             except sqlite3.Error as e:
                 raise sqlite3.Error(f"Failed to add order items: {str(e)}")
+        return execute_write(_write)
 
     @staticmethod
     def update_order_status(order_id, new_status):
@@ -407,7 +1438,7 @@ class OrderDB:
         if new_status not in valid_statuses:
             raise ValueError(f"Invalid status. Must be one of: {', '.join(valid_statuses)}")
 
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             try:
                 cursor.execute(
@@ -419,11 +1450,12 @@ class OrderDB:
                 return True
             except sqlite3.Error as e:
                 raise sqlite3.Error(f"Failed to update order status: {str(e)}")
+        return execute_write(_write)
 
     @staticmethod
     def get_order_items(order_id):
         """Get all items for a specific order with product details"""
-        with get_db_connection() as conn:
+        with get_db_read_connection() as conn:
             try:
                 items = conn.execute(
                     '''SELECT oi.*, p.name as product_name, p.sku, p.code
@@ -439,7 +1471,7 @@ class OrderDB:
     @staticmethod
     def delete_order(order_id):
         """Delete an order and its items with proper cascading"""
-        with get_db_connection() as conn:
+        def _write(conn):
             cursor = conn.cursor()
             try:
                 # First delete order items
@@ -450,4 +1482,144 @@ class OrderDB:
                     raise ValueError(f"Order with ID {order_id} not found")
                 return True
             except sqlite3.Error as e:
-                raise sqlite3.Error(f"Failed to delete order: {str(e)}")
\ No newline at end of file
+                raise sqlite3.Error(f"Failed to delete order: {str(e)}")
+        return execute_write(_write)
+
+class StockMovementDB:
+    """Reads of the stock ledger (stock_movements, written by triggers).
+
+    Movements with a NULL location_id journal products.stock; the others journal
+    inventory.quantity at that location.
+    """
+    _movements_query = '''SELECT m.*, p.sku, p.name as product_name,
+                   l.zone, l.aisle, l.shelf, l.position, o.order_number
+                   FROM stock_movements m
+                   JOIN products p ON m.product_id = p.product_id
+                   LEFT JOIN locations l ON m.location_id = l.location_id
+                   LEFT JOIN orders o ON m.order_id = o.order_id'''
+
+    LEDGERS = ('stock', 'inventory')
+
+    @staticmethod
+    def get_movements(limit=None, before_id=None, product_id=None, location_id=None, ledger=None, order_id=None, reason=None, date_from=None, date_to=None):
+        """Get movements, newest first, with the same keyset pagination as the process history.
+
+        `ledger` is 'stock' (products.stock) or 'inventory' (location stock).
+        """
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append('m.movement_id < ?')
+            params.append(before_id)
+        if product_id is not None:
+            conditions.append('m.product_id = ?')
+            params.append(product_id)
+        if location_id is not None:
+            conditions.append('m.location_id = ?')
+            params.append(location_id)
+        if ledger == 'stock':
+            conditions.append('m.location_id IS NULL')
+        elif ledger == 'inventory':
+            conditions.append('m.location_id IS NOT NULL')
+        elif ledger is not None:
+            raise ValueError(f"Invalid ledger. Must be one of: {', '.join(StockMovementDB.LEDGERS)}")
+        if order_id is not None:
+            conditions.append('m.order_id = ?')
+            params.append(order_id)
+        if reason:
+            conditions.append('m.reason = ?')
+            params.append(reason)
+        if date_from:
+            conditions.append('m.created_at >= ?')
+            params.append(_timestamp_bound(date_from))
+        if date_to:
+            conditions.append('m.created_at < ?')
+            params.append(_timestamp_bound(date_to, inclusive_day=True))
+        query = StockMovementDB._movements_query
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY m.movement_id DESC'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with get_db_read_connection() as conn:
+            return [dict(movement) for movement in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def get_movements_page(page_size=50, before_id=None, **filters):
+        """Return (movements, next_before_id); next_before_id is None on the last page"""
+        movements = StockMovementDB.get_movements(limit=page_size + 1, before_id=before_id, **filters)
+        if len(movements) > page_size:
+            movements = movements[:page_size]
+            return movements, movements[-1]['movement_id']
+        return movements, None
+
+    @staticmethod
+    def iter_movements(chunk_size=1000):
+        """Stream the whole ledger, oldest first"""
+        return iter_query(StockMovementDB._movements_query + ' ORDER BY m.movement_id', (), chunk_size)
+
+    @staticmethod
+    def get_on_hand(product_id, location_id=None, at=None, ledger='inventory'):
+        """Balance of a product from the latest snapshot plus the movements after it.
+
+        With ledger='inventory' the balance is at `location_id`, or summed over all
+        locations when it is None; ledger='stock' is the products.stock balance.
+        `at` (date or datetime, UTC) gives the balance at that time; a date means
+        the end of that day. Before the compaction horizon the answer is exact
+        only at snapshot times.
+        """
+        if ledger == 'stock':
+            key_condition, key_params = 'location_id IS NULL', []
+        elif ledger == 'inventory':
+            if location_id is None:
+                key_condition, key_params = 'location_id IS NOT NULL', []
+            else:
+                key_condition, key_params = 'location_id = ?', [location_id]
+        else:
+            raise ValueError(f"Invalid ledger. Must be one of: {', '.join(StockMovementDB.LEDGERS)}")
+
+        if at is None:
+            time_condition, time_params = '', []
+        elif isinstance(at, date) and not isinstance(at, datetime):
+            time_condition, time_params = ' < ?', [_timestamp_bound(at, inclusive_day=True)]
+        else:
+            time_condition, time_params = ' <= ?', [_timestamp_bound(at)]
+
+        with get_db_read_connection() as conn:
+            snapshot = conn.execute(
+                'SELECT snapshot_id, movement_id FROM stock_snapshots'
+                + (f' WHERE taken_at{time_condition}' if time_condition else '')
+                + ' ORDER BY snapshot_id DESC LIMIT 1',
+                time_params
+            ).fetchone()
+            balance = 0
+            after_movement = 0
+            if snapshot is not None:
+                after_movement = snapshot['movement_id']
+                balance = conn.execute(
+                    f'''SELECT COALESCE(SUM(quantity), 0) FROM stock_snapshot_balances
+                        WHERE snapshot_id = ? AND product_id = ? AND {key_condition}''',
+                    [snapshot['snapshot_id'], product_id] + key_params
+                ).fetchone()[0]
+            balance += conn.execute(
+                f'''SELECT COALESCE(SUM(delta), 0) FROM stock_movements
+                    WHERE product_id = ? AND {key_condition} AND movement_id > ?'''
+                + (f' AND created_at{time_condition}' if time_condition else ''),
+                [product_id] + key_params + [after_movement] + time_params
+            ).fetchone()[0]
+            return balance
+
+class DashboardDB:
+    _stats_query = '''SELECT
+           (SELECT COUNT(*) FROM products) as total_products,
+           (SELECT COUNT(*) FROM locations) as total_locations,
+           (SELECT COUNT(*) FROM categories) as total_categories,
+           (SELECT COUNT(*) FROM low_stock_inventory) as low_stock,
+           (SELECT COUNT(*) FROM orders WHERE status = 'pending') as pending_orders'''
+
+    @staticmethod
+    def get_dashboard_stats():
+        """Return the landing page KPIs computed in a single round trip"""
+        with get_db_read_connection() as conn:
+            return dict(conn.execute(DashboardDB._stats_query).fetchone())
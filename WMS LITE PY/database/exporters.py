@@ -0,0 +1,67 @@
+"""Constant-memory CSV/JSONL export of inventory, orders, process history and stock movements.
+
+Rows are streamed from the database cursor straight into the output file,
+so exports of millions of history rows never materialize a full result list.
+"""
+import csv
+import json
+import os
+import tempfile
+from typing import Iterable, Optional
+from .db_utils import InventoryDB, OrderDB, ProcessHistoryDB, StockMovementDB
+
+EXPORT_DATASETS = {
+    'inventory': InventoryDB.iter_inventory_levels,
+    'orders': OrderDB.iter_all_orders,
+    'process_history': ProcessHistoryDB.iter_process_history,
+    'stock_movements': StockMovementDB.iter_movements,
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+def write_csv(rows: Iterable, output) -> int:
+    """Write sqlite3.Row (or dict) rows as CSV with a header row; returns the row count"""
+    writer = csv.writer(output)
+    count = 0
+    for row in rows:
+        if count == 0:
+            writer.writerow(row.keys())
+        writer.writerow(tuple(row))
+        count += 1
+    return count
+
+def write_jsonl(rows: Iterable, output) -> int:
+    """Write rows as one JSON object per line; returns the row count"""
+    count = 0
+    for row in rows:
+        output.write(json.dumps(dict(row), ensure_ascii=False, default=str))
+        output.write('\n')
+        count += 1
+    return count
+
+def export_dataset(dataset: str, output, fmt: str = 'csv', chunk_size: int = 1000) -> int:
+    """Stream `dataset` into a path or text stream and return the number of rows written"""
+    if dataset not in EXPORT_DATASETS:
+        raise ValueError(f"Unknown dataset '{dataset}'. Must be one of: {', '.join(EXPORT_DATASETS)}")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown format '{fmt}'. Must be one of: {', '.join(EXPORT_FORMATS)}")
+    rows = EXPORT_DATASETS[dataset](chunk_size=chunk_size)
+    writer = write_csv if fmt == 'csv' else write_jsonl
+    if isinstance(output, (str, os.PathLike)):
+        with open(output, 'w', encoding='utf-8', newline='') as output_file:
+            return writer(rows, output_file)
+    return writer(rows, output)
+
+def export_to_tempfile(dataset: str, fmt: str = 'csv', chunk_size: int = 1000, directory: Optional[str] = None):
+    """Export into a temporary file and return (path, row count); the caller removes the file"""
+    handle, path = tempfile.mkstemp(prefix=f'wms_{dataset}_', suffix=f'.{fmt}', dir=directory)
+    os.close(handle)
+    try:
+        count = export_dataset(dataset, path, fmt, chunk_size)
+    except Exception:
+        os.remove(path)
+        raise
+    return path, count
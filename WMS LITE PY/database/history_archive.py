@@ -0,0 +1,231 @@
+"""Retention and monthly archival of process_history.
+
+Rows older than the retention horizon are copied into one SQLite file per
+month (archive/process_history_YYYY_MM.db) and then deleted from the hot
+table, in small batches so no write lock is held for long. Archive files are
+opened read-only on demand: ProcessHistoryDB continues its history pages into
+them and the process_history export reads them through iter_history.
+"""
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Event, Lock, Thread
+from typing import Iterator, List, Optional
+from .db_utils import ConnectionProfile, execute_write, get_db_path, get_db_read_connection
+
+_ARCHIVE_FILE = re.compile(r'^process_history_(\d{4})_(\d{2})\.db$')
+
+_ARCHIVE_SCHEMA = '''CREATE TABLE IF NOT EXISTS process_history (
+    process_id INTEGER PRIMARY KEY,
+    operation_type TEXT NOT NULL,
+    sub_operation TEXT NOT NULL,
+    status TEXT NOT NULL,
+    timestamp DATETIME,
+    details TEXT,
+    user_id TEXT
+)'''
+
+_COLUMNS = 'process_id, operation_type, sub_operation, status, timestamp, details, user_id'
+
+def _fetch_chunks(cursor, chunk_size: int) -> Iterator[sqlite3.Row]:
+    """Yield a cursor's rows in fetchmany chunks, closing it when done"""
+    try:
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        cursor.close()
+
+def get_archive_dir() -> str:
+    return os.getenv('WMS_HISTORY_ARCHIVE_DIR') or os.path.join(os.path.dirname(get_db_path()), 'archive')
+
+def get_retention_days() -> int:
+    """Retention horizon in days; 0 disables archival"""
+    return int(os.getenv('WMS_HISTORY_RETENTION_DAYS', 90))
+
+class HistoryArchiver:
+    _background_thread = None
+    _background_stop = Event()
+    _background_lock = Lock()
+
+    def __init__(self, retention_days: Optional[int] = None, archive_dir: Optional[str] = None, batch_size: int = 500):
+        self.retention_days = get_retention_days() if retention_days is None else retention_days
+        self.archive_dir = archive_dir or get_archive_dir()
+        self.batch_size = batch_size
+
+    def cutoff(self) -> str:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        return cutoff.strftime('%Y-%m-%d %H:%M:%S')
+
+    def archive_path(self, month: str) -> str:
+        """Path of the archive file for a 'YYYY-MM' month"""
+        return os.path.join(self.archive_dir, f"process_history_{month.replace('-', '_')}.db")
+
+    def archived_months(self) -> List[str]:
+        if not os.path.isdir(self.archive_dir):
+            return []
+        months = []
+        for filename in os.listdir(self.archive_dir):
+            match = _ARCHIVE_FILE.match(filename)
+            if match:
+                months.append(f"{match.group(1)}-{match.group(2)}")
+        return sorted(months)
+
+    def archive_batch(self) -> int:
+        """Move up to batch_size expired rows into their monthly archives; returns rows moved"""
+        if self.retention_days <= 0:
+            return 0
+        with get_db_read_connection() as conn:
+            rows = conn.execute(
+                f'SELECT {_COLUMNS} FROM process_history WHERE timestamp < ? ORDER BY timestamp LIMIT ?',
+                (self.cutoff(), self.batch_size)
+            ).fetchall()
+        if not rows:
+            return 0
+
+        by_month = {}
+        for row in rows:
+            by_month.setdefault(row['timestamp'][:7], []).append(tuple(row))
+
+        # Copy first: INSERT OR IGNORE keeps the copy idempotent if a previous
+        # run stopped between the copy and the delete
+        Path(self.archive_dir).mkdir(parents=True, exist_ok=True)
+        for month, month_rows in by_month.items():
+            archive = sqlite3.connect(self.archive_path(month))
+            try:
+                archive.execute(_ARCHIVE_SCHEMA)
+                archive.executemany(
+                    f'INSERT OR IGNORE INTO process_history ({_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                    month_rows
+                )
+                archive.commit()
+            finally:
+                archive.close()
+
+        def _delete(conn):
+            conn.executemany(
+                'DELETE FROM process_history WHERE process_id = ?',
+                ((row['process_id'],) for row in rows)
+            )
+        execute_write(_delete)
+        return len(rows)
+
+    def run(self, max_batches: Optional[int] = None, pause: float = 0.05, stop_event: Optional[Event] = None) -> int:
+        """Archive batches until nothing is left (or max_batches), pausing between them
+        so other writers get the lock"""
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            moved = self.archive_batch()
+            if not moved:
+                break
+            total += moved
+            batches += 1
+            if stop_event is not None:
+                if stop_event.wait(pause):
+                    break
+            else:
+                time.sleep(pause)
+        return total
+
+    def iter_archived(self, where: str = '', params=(), date_from: Optional[str] = None,
+                      date_to: Optional[str] = None, newest_first: bool = True) -> Iterator[sqlite3.Row]:
+        """Yield archived rows matching `where` (a SQL condition on process_history), month by month.
+
+        `date_from`/`date_to` are timestamp bounds ('YYYY-MM-DD...') used to skip
+        months outside the range; the filtering itself is up to `where`. Months
+        and rows come newest first (or oldest first), in process_id order, so
+        the result continues a keyset page of the hot table.
+        """
+        months = [
+            month for month in self.archived_months()
+            if (not date_from or month >= date_from[:7]) and (not date_to or month <= date_to[:7])
+        ]
+        order = 'DESC' if newest_first else 'ASC'
+        for month in (reversed(months) if newest_first else months):
+            uri = Path(self.archive_path(month)).resolve().as_uri() + '?mode=ro'
+            conn = sqlite3.connect(uri, uri=True)
+            conn.row_factory = sqlite3.Row
+            try:
+                yield from conn.execute(
+                    f"SELECT {_COLUMNS} FROM process_history{f' WHERE {where}' if where else ''} ORDER BY process_id {order}",
+                    params
+                )
+            finally:
+                conn.close()
+
+    def iter_history(self, date_from: Optional[str] = None, date_to: Optional[str] = None,
+                     chunk_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """Yield history rows from the archives and the hot table, oldest first.
+
+        `date_from`/`date_to` are 'YYYY-MM-DD' strings; date_to is inclusive.
+        Each monthly archive in range is attached read-only only while it is
+        read. Rows are fetched `chunk_size` at a time.
+        """
+        conditions = []
+        params = []
+        if date_from:
+            conditions.append('timestamp >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('timestamp < ?')
+            params.append((datetime.strptime(date_to, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d'))
+        where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+
+        months = [
+            month for month in self.archived_months()
+            if (not date_from or month >= date_from[:7]) and (not date_to or month <= date_to[:7])
+        ]
+        conn = sqlite3.connect(Path(get_db_path()).resolve().as_uri() + '?mode=ro', uri=True)
+        conn.row_factory = sqlite3.Row
+        try:
+            ConnectionProfile.from_env().apply(conn, read_only=True)
+            for month in months:
+                uri = Path(self.archive_path(month)).resolve().as_uri() + '?mode=ro'
+                conn.execute('ATTACH DATABASE ? AS archive', (uri,))
+                try:
+                    yield from _fetch_chunks(conn.execute(
+                        f'SELECT {_COLUMNS} FROM archive.process_history{where} ORDER BY process_id', params
+                    ), chunk_size)
+                finally:
+                    conn.execute('DETACH DATABASE archive')
+            yield from _fetch_chunks(conn.execute(
+                f'SELECT {_COLUMNS} FROM main.process_history{where} ORDER BY process_id', params
+            ), chunk_size)
+        finally:
+            conn.close()
+
+    @classmethod
+    def start_background(cls, interval: float = 3600, **kwargs) -> bool:
+        """Run the archiver every `interval` seconds in a daemon thread (once per process)"""
+        with cls._background_lock:
+            if cls._background_thread is not None and cls._background_thread.is_alive():
+                return False
+            archiver = cls(**kwargs)
+            if archiver.retention_days <= 0:
+                return False
+            cls._background_stop.clear()
+
+            def _loop():
+                while not cls._background_stop.is_set():
+                    try:
+                        archiver.run(stop_event=cls._background_stop)
+                    except Exception as e:
+                        print(f"Error archiving process history: {str(e)}")
+                    cls._background_stop.wait(interval)
+
+            cls._background_thread = Thread(target=_loop, name='wms-history-archiver', daemon=True)
+            cls._background_thread.start()
+            return True
+
+    @classmethod
+    def stop_background(cls, timeout: float = 5):
+        cls._background_stop.set()
+        if cls._background_thread is not None:
+            cls._background_thread.join(timeout)
+            cls._background_thread = None
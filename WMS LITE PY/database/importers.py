@@ -0,0 +1,219 @@
+"""Streaming CSV/JSONL import of products and locations.
+
+Records are read lazily and written in chunks through the bulk insert APIs,
+so memory use depends on the chunk size and not on the size of the file.
+"""
+import csv
+import io
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Iterator, Optional, Tuple
+from .db_utils import ProductDB, LocationDB
+
+PRODUCT_FIELDS = ['sku', 'code', 'name', 'description', 'category', 'min_stock', 'max_stock', 'stock']
+LOCATION_FIELDS = ['zone', 'aisle', 'shelf', 'position']
+_SQLITE_INT_MIN, _SQLITE_INT_MAX = -2 ** 63, 2 ** 63 - 1
+
+class ImportReport:
+    """Counters plus the first `max_issues` per-line duplicates and errors of an import"""
+
+    def __init__(self, max_issues: int = 1000):
+        self.max_issues = max_issues
+        self.processed = 0
+        self.inserted = 0
+        self.duplicates = 0
+        self.errors = 0
+        self.issues = []
+
+    def add_issue(self, line: int, kind: str, message: str):
+        if kind == 'duplicate':
+            self.duplicates += 1
+        else:
+            self.errors += 1
+        if len(self.issues) < self.max_issues:
+            self.issues.append({'line': line, 'type': kind, 'message': message})
+
+    @property
+    def truncated(self) -> bool:
+        return self.duplicates + self.errors > len(self.issues)
+
+    def to_dict(self) -> dict:
+        return {
+            'processed': self.processed,
+            'inserted': self.inserted,
+            'duplicates': self.duplicates,
+            'errors': self.errors,
+            'issues': list(self.issues),
+            'truncated': self.truncated,
+        }
+
+def detect_format(name: str) -> str:
+    extension = os.path.splitext(name)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f"Unsupported file type '{extension}'. Use .csv or .jsonl")
+
+def _open_text(source):
+    """Return (text stream, cleanup) for a path, a text stream or a binary stream"""
+    if isinstance(source, (str, os.PathLike)):
+        stream = open(source, 'r', encoding='utf-8-sig', newline='')
+        return stream, stream.close
+    if isinstance(source, io.TextIOBase):
+        return source, lambda: None
+    # Binary upload: wrap it, and detach afterwards so the caller's stream stays open
+    stream = io.TextIOWrapper(source, encoding='utf-8-sig', newline='')
+    return stream, stream.detach
+
+def iter_records(source, fmt: Optional[str] = None, delimiter: str = ',') -> Iterator[Tuple[int, object]]:
+    """Yield (line number, record) pairs; records that cannot be parsed are yielded as exceptions"""
+    if fmt is None:
+        fmt = detect_format(source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', ''))
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError(f"Unsupported format '{fmt}'. Use 'csv' or 'jsonl'")
+    stream, cleanup = _open_text(source)
+    try:
+        if fmt == 'csv':
+            reader = csv.DictReader(stream, delimiter=delimiter)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_number, line in enumerate(stream, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    yield line_number, ValueError(f"Invalid JSON: {e.msg}")
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, ValueError("Each JSONL line must be an object")
+                    continue
+                yield line_number, record
+    finally:
+        cleanup()
+
+def _text(record: dict, field: str) -> Optional[str]:
+    value = record.get(field)
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+def _integer(record: dict, field: str, default=None):
+    value = _text(record, field)
+    if value is None:
+        return default
+    try:
+        number = Decimal(value)
+    except InvalidOperation:
+        raise ValueError(f"'{field}' must be a number, got '{value}'")
+    # Decimal keeps 'inf', 'nan' and huge exponents out of int() and SQLite's 64-bit INTEGER
+    if not number.is_finite() or not _SQLITE_INT_MIN <= number <= _SQLITE_INT_MAX:
+        raise ValueError(f"'{field}' must be a finite integer in SQLite's range, got '{value}'")
+    # int() would silently truncate '2.7' to 2
+    if number != number.to_integral_value():
+        raise ValueError(f"'{field}' must be a whole number, got '{value}'")
+    return int(number)
+
+def _chunks(records, chunk_size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+def import_products(source, fmt: Optional[str] = None, chunk_size: int = 1000,
+                    create_missing_categories: bool = True, max_issues: int = 1000,
+                    delimiter: str = ',') -> ImportReport:
+    """Stream products from a CSV/JSONL file into the products table.
+
+    Category names (column 'category') are resolved through an in-memory
+    name -> category_id map loaded once; a numeric 'category_id' column is
+    used as is. SKUs that already exist are inserted flagged as duplicates.
+    """
+    report = ImportReport(max_issues)
+    categories = {category['name'].strip().lower(): category['category_id'] for category in ProductDB.get_all_categories()}
+
+    for chunk in _chunks(iter_records(source, fmt, delimiter), chunk_size):
+        products = []
+        lines = []
+        for line_number, record in chunk:
+            report.processed += 1
+            if isinstance(record, Exception):
+                report.add_issue(line_number, 'error', str(record))
+                continue
+            try:
+                sku, code, name = _text(record, 'sku'), _text(record, 'code'), _text(record, 'name')
+                missing = [field for field, value in (('sku', sku), ('code', code), ('name', name)) if not value]
+                if missing:
+                    raise ValueError(f"Missing required fields: {', '.join(missing)}")
+                category_id = _integer(record, 'category_id')
+                category_name = _text(record, 'category')
+                if category_id is None and category_name:
+                    category_id = categories.get(category_name.lower())
+                    if category_id is None:
+                        if not create_missing_categories:
+                            raise ValueError(f"Unknown category '{category_name}'")
+                        category_id = ProductDB.add_category(category_name)
+                        categories[category_name.lower()] = category_id
+                min_stock = _integer(record, 'min_stock', 0)
+                max_stock = _integer(record, 'max_stock')
+                if max_stock is not None and max_stock < min_stock:
+                    raise ValueError("max_stock cannot be lower than min_stock")
+                products.append({
+                    'sku': sku,
+                    'code': code,
+                    'name': name,
+                    'description': _text(record, 'description'),
+                    'category_id': category_id,
+                    'min_stock': min_stock,
+                    'max_stock': max_stock,
+                    'stock': _integer(record, 'stock', 0),
+                })
+                lines.append(line_number)
+            except ValueError as e:
+                report.add_issue(line_number, 'error', str(e))
+
+        if not products:
+            continue
+        result = ProductDB.add_products_bulk(products, chunk_size=chunk_size)
+        report.inserted += result['inserted']
+        for duplicate in result['duplicates']:
+            report.add_issue(lines[duplicate['index']], 'duplicate', f"SKU {duplicate['sku']} already exists; marked as duplicate")
+        for conflict in result['conflicts']:
+            report.add_issue(lines[conflict['index']], 'error', conflict['error'])
+    return report
+
+def import_locations(source, fmt: Optional[str] = None, chunk_size: int = 1000,
+                     max_issues: int = 1000, delimiter: str = ',') -> ImportReport:
+    """Stream (zone, aisle, shelf, position) rows from a CSV/JSONL file into locations"""
+    report = ImportReport(max_issues)
+
+    for chunk in _chunks(iter_records(source, fmt, delimiter), chunk_size):
+        locations = []
+        lines = []
+        for line_number, record in chunk:
+            report.processed += 1
+            if isinstance(record, Exception):
+                report.add_issue(line_number, 'error', str(record))
+                continue
+            values = tuple(_text(record, field) for field in LOCATION_FIELDS)
+            missing = [field for field, value in zip(LOCATION_FIELDS, values) if not value]
+            if missing:
+                report.add_issue(line_number, 'error', f"Missing required fields: {', '.join(missing)}")
+                continue
+            locations.append(values)
+            lines.append(line_number)
+
+        if not locations:
+            continue
+        result = LocationDB.add_locations_bulk(locations, chunk_size=chunk_size)
+        report.inserted += result['inserted']
+        for conflict in result['conflicts']:
+            report.add_issue(lines[conflict['index']], 'duplicate', f"Location {'-'.join(conflict['row'])} already exists")
+    return report
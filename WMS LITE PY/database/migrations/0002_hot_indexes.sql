@@ -0,0 +1,21 @@
+-- Secondary indexes for the hot lookup paths of WMS Lite.
+-- Statements are idempotent: databases indexed before the migration runner existed re-apply this safely.
+
+-- Barcode scans (get_product_by_sku) and the duplicate-SKU check in add_product
+CREATE INDEX IF NOT EXISTS idx_products_sku ON products (sku);
+
+-- Inventory lookups by product/location pair and by location
+CREATE INDEX IF NOT EXISTS idx_inventory_product_location ON inventory (product_id, location_id);
+CREATE INDEX IF NOT EXISTS idx_inventory_location ON inventory (location_id);
+
+-- get_order_items and the order_items join in get_all_orders
+CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items (order_id);
+
+-- Order listings filtered by status and sorted by creation date
+CREATE INDEX IF NOT EXISTS idx_orders_status_created ON orders (status, created_at);
+
+-- get_process_history ORDER BY timestamp DESC
+CREATE INDEX IF NOT EXISTS idx_process_history_timestamp ON process_history (timestamp);
+
+-- Lookups by zone (get_locations_by_zone, get_zone_locations_count) are served by
+-- the UNIQUE (zone, aisle, shelf, position) index of the locations table.
@@ -0,0 +1,4 @@
+-- Keyset pagination of process_history filtered by operation type or user.
+-- Both indexes end in process_id so each page is an index range read.
+CREATE INDEX IF NOT EXISTS idx_process_history_operation ON process_history (operation_type, process_id);
+CREATE INDEX IF NOT EXISTS idx_process_history_user ON process_history (user_id, process_id);
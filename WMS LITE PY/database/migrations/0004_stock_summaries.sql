@@ -0,0 +1,157 @@
+-- Summary tables maintained by triggers in the same transaction as every
+-- inventory and location change, so dashboards and replenishment lists read
+-- a handful of rows instead of aggregating the inventory join.
+
+-- On-hand quantity of each product summed over its inventory rows
+CREATE TABLE IF NOT EXISTS product_on_hand (
+    product_id INTEGER PRIMARY KEY,
+    on_hand INTEGER NOT NULL DEFAULT 0,
+    inventory_rows INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (product_id) REFERENCES products (product_id)
+);
+
+-- Quantity stored at each location; feeds the occupied count of its zone
+CREATE TABLE IF NOT EXISTS location_stock (
+    location_id INTEGER PRIMARY KEY,
+    quantity INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (location_id) REFERENCES locations (location_id)
+);
+
+-- Locations per zone, how many of them hold stock and the units they hold
+CREATE TABLE IF NOT EXISTS zone_occupancy (
+    zone TEXT PRIMARY KEY,
+    total_locations INTEGER NOT NULL DEFAULT 0,
+    occupied_locations INTEGER NOT NULL DEFAULT 0,
+    quantity INTEGER NOT NULL DEFAULT 0
+);
+
+-- Inventory rows at or below their minimum quantity
+CREATE TABLE IF NOT EXISTS low_stock_inventory (
+    inventory_id INTEGER PRIMARY KEY,
+    product_id INTEGER,
+    location_id INTEGER,
+    FOREIGN KEY (inventory_id) REFERENCES inventory (inventory_id)
+);
+
+-- Backfill from the existing data
+INSERT INTO product_on_hand (product_id, on_hand, inventory_rows)
+SELECT product_id, SUM(COALESCE(quantity, 0)), COUNT(*)
+FROM inventory
+WHERE product_id IS NOT NULL
+GROUP BY product_id;
+
+INSERT INTO location_stock (location_id, quantity)
+SELECT l.location_id, COALESCE(SUM(i.quantity), 0)
+FROM locations l
+LEFT JOIN inventory i ON i.location_id = l.location_id
+GROUP BY l.location_id;
+
+INSERT INTO zone_occupancy (zone, total_locations, occupied_locations, quantity)
+SELECT l.zone, COUNT(*), SUM(ls.quantity > 0), SUM(ls.quantity)
+FROM locations l
+JOIN location_stock ls ON ls.location_id = l.location_id
+GROUP BY l.zone;
+
+INSERT INTO low_stock_inventory (inventory_id, product_id, location_id)
+SELECT inventory_id, product_id, location_id
+FROM inventory
+WHERE quantity <= min_quantity;
+
+-- Locations
+CREATE TRIGGER IF NOT EXISTS trg_locations_summary_insert
+AFTER INSERT ON locations
+BEGIN
+    INSERT INTO location_stock (location_id, quantity) VALUES (NEW.location_id, 0);
+    INSERT INTO zone_occupancy (zone, total_locations) VALUES (NEW.zone, 1)
+        ON CONFLICT (zone) DO UPDATE SET total_locations = total_locations + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_locations_summary_delete
+AFTER DELETE ON locations
+BEGIN
+    UPDATE zone_occupancy
+    SET total_locations = total_locations - 1,
+        occupied_locations = occupied_locations - COALESCE((SELECT quantity > 0 FROM location_stock WHERE location_id = OLD.location_id), 0),
+        quantity = quantity - COALESCE((SELECT quantity FROM location_stock WHERE location_id = OLD.location_id), 0)
+    WHERE zone = OLD.zone;
+    DELETE FROM location_stock WHERE location_id = OLD.location_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_locations_summary_zone
+AFTER UPDATE OF zone ON locations
+WHEN NEW.zone IS NOT OLD.zone
+BEGIN
+    UPDATE zone_occupancy
+    SET total_locations = total_locations - 1,
+        occupied_locations = occupied_locations - COALESCE((SELECT quantity > 0 FROM location_stock WHERE location_id = OLD.location_id), 0),
+        quantity = quantity - COALESCE((SELECT quantity FROM location_stock WHERE location_id = OLD.location_id), 0)
+    WHERE zone = OLD.zone;
+    INSERT INTO zone_occupancy (zone, total_locations, occupied_locations, quantity)
+    SELECT NEW.zone, 1, quantity > 0, quantity FROM location_stock WHERE location_id = NEW.location_id
+        ON CONFLICT (zone) DO UPDATE SET
+            total_locations = total_locations + 1,
+            occupied_locations = occupied_locations + excluded.occupied_locations,
+            quantity = quantity + excluded.quantity;
+END;
+
+-- A location becomes occupied or empty when its stored quantity crosses zero
+CREATE TRIGGER IF NOT EXISTS trg_location_stock_zone
+AFTER UPDATE OF quantity ON location_stock
+BEGIN
+    UPDATE zone_occupancy
+    SET occupied_locations = occupied_locations + (NEW.quantity > 0) - (OLD.quantity > 0),
+        quantity = quantity + NEW.quantity - OLD.quantity
+    WHERE zone = (SELECT zone FROM locations WHERE location_id = NEW.location_id);
+END;
+
+-- Inventory
+CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_insert
+AFTER INSERT ON inventory
+BEGIN
+    INSERT INTO product_on_hand (product_id, on_hand, inventory_rows)
+    SELECT NEW.product_id, COALESCE(NEW.quantity, 0), 1
+    WHERE NEW.product_id IS NOT NULL
+        ON CONFLICT (product_id) DO UPDATE SET
+            on_hand = on_hand + excluded.on_hand,
+            inventory_rows = inventory_rows + 1;
+    UPDATE location_stock SET quantity = quantity + COALESCE(NEW.quantity, 0)
+    WHERE location_id = NEW.location_id;
+    INSERT INTO low_stock_inventory (inventory_id, product_id, location_id)
+    SELECT NEW.inventory_id, NEW.product_id, NEW.location_id
+    WHERE NEW.quantity <= NEW.min_quantity;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_delete
+AFTER DELETE ON inventory
+BEGIN
+    UPDATE product_on_hand
+    SET on_hand = on_hand - COALESCE(OLD.quantity, 0),
+        inventory_rows = inventory_rows - 1
+    WHERE product_id = OLD.product_id;
+    UPDATE location_stock SET quantity = quantity - COALESCE(OLD.quantity, 0)
+    WHERE location_id = OLD.location_id;
+    DELETE FROM low_stock_inventory WHERE inventory_id = OLD.inventory_id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_inventory_summary_update
+AFTER UPDATE OF product_id, location_id, quantity, min_quantity ON inventory
+BEGIN
+    UPDATE product_on_hand
+    SET on_hand = on_hand - COALESCE(OLD.quantity, 0),
+        inventory_rows = inventory_rows - 1
+    WHERE product_id = OLD.product_id;
+    INSERT INTO product_on_hand (product_id, on_hand, inventory_rows)
+    SELECT NEW.product_id, COALESCE(NEW.quantity, 0), 1
+    WHERE NEW.product_id IS NOT NULL
+        ON CONFLICT (product_id) DO UPDATE SET
+            on_hand = on_hand + excluded.on_hand,
+            inventory_rows = inventory_rows + 1;
+    UPDATE location_stock SET quantity = quantity - COALESCE(OLD.quantity, 0)
+    WHERE location_id = OLD.location_id;
+    UPDATE location_stock SET quantity = quantity + COALESCE(NEW.quantity, 0)
+    WHERE location_id = NEW.location_id;
+    DELETE FROM low_stock_inventory WHERE inventory_id = OLD.inventory_id;
+    INSERT INTO low_stock_inventory (inventory_id, product_id, location_id)
+    SELECT NEW.inventory_id, NEW.product_id, NEW.location_id
+    WHERE NEW.quantity <= NEW.min_quantity;
+END;
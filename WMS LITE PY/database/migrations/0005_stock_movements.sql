@@ -0,0 +1,143 @@
+-- Append-only stock ledger. Every change of products.stock (location_id NULL)
+-- and of inventory.quantity (location_id set) is journaled by the triggers
+-- below, so no write path can bypass it. Writer jobs describe the movement
+-- (order, reason) through the single row of stock_movement_context.
+
+CREATE TABLE IF NOT EXISTS stock_movements (
+    movement_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product_id INTEGER NOT NULL,
+    location_id INTEGER,
+    delta INTEGER NOT NULL,
+    order_id INTEGER,
+    reason TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (product_id) REFERENCES products (product_id),
+    FOREIGN KEY (location_id) REFERENCES locations (location_id),
+    FOREIGN KEY (order_id) REFERENCES orders (order_id)
+);
+
+-- Balance of a product/location pair and history of a product
+CREATE INDEX IF NOT EXISTS idx_stock_movements_product_location ON stock_movements (product_id, location_id, movement_id);
+-- Point-in-time queries and date-filtered reports
+CREATE INDEX IF NOT EXISTS idx_stock_movements_created ON stock_movements (created_at);
+-- Movements of an order
+CREATE INDEX IF NOT EXISTS idx_stock_movements_order ON stock_movements (order_id);
+
+-- Set and cleared inside a writer transaction, so other connections never see it
+CREATE TABLE IF NOT EXISTS stock_movement_context (
+    context_id INTEGER PRIMARY KEY CHECK (context_id = 1),
+    order_id INTEGER,
+    reason TEXT
+);
+
+-- Balances as of movement_id; movements up to an old snapshot can be compacted away
+CREATE TABLE IF NOT EXISTS stock_snapshots (
+    snapshot_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    movement_id INTEGER NOT NULL,
+    taken_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS stock_snapshot_balances (
+    snapshot_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL,
+    location_id INTEGER,
+    quantity INTEGER NOT NULL,
+    FOREIGN KEY (snapshot_id) REFERENCES stock_snapshots (snapshot_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_snapshot_balances_key ON stock_snapshot_balances (product_id, location_id, snapshot_id);
+CREATE INDEX IF NOT EXISTS idx_stock_snapshot_balances_snapshot ON stock_snapshot_balances (snapshot_id);
+
+-- Opening balances of the existing data
+INSERT INTO stock_movements (product_id, location_id, delta, reason)
+SELECT product_id, NULL, stock, 'opening'
+FROM products
+WHERE COALESCE(stock, 0) != 0;
+
+INSERT INTO stock_movements (product_id, location_id, delta, reason)
+SELECT product_id, location_id, SUM(quantity), 'opening'
+FROM inventory
+WHERE product_id IS NOT NULL
+GROUP BY product_id, location_id
+HAVING COALESCE(SUM(quantity), 0) != 0;
+
+-- products.stock ledger
+CREATE TRIGGER IF NOT EXISTS trg_products_stock_movement_insert
+AFTER INSERT ON products
+WHEN COALESCE(NEW.stock, 0) != 0
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    VALUES (
+        NEW.product_id, NULL, NEW.stock,
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'product_created')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_products_stock_movement_update
+AFTER UPDATE OF stock ON products
+WHEN COALESCE(NEW.stock, 0) != COALESCE(OLD.stock, 0)
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    VALUES (
+        NEW.product_id, NULL, COALESCE(NEW.stock, 0) - COALESCE(OLD.stock, 0),
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'adjustment')
+    );
+END;
+
+-- inventory ledger
+CREATE TRIGGER IF NOT EXISTS trg_inventory_movement_insert
+AFTER INSERT ON inventory
+WHEN NEW.product_id IS NOT NULL AND COALESCE(NEW.quantity, 0) != 0
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    VALUES (
+        NEW.product_id, NEW.location_id, NEW.quantity,
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'adjustment')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_inventory_movement_delete
+AFTER DELETE ON inventory
+WHEN OLD.product_id IS NOT NULL AND COALESCE(OLD.quantity, 0) != 0
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    VALUES (
+        OLD.product_id, OLD.location_id, -OLD.quantity,
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'adjustment')
+    );
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_inventory_movement_quantity
+AFTER UPDATE OF quantity ON inventory
+WHEN NEW.product_id IS OLD.product_id AND NEW.location_id IS OLD.location_id
+    AND NEW.product_id IS NOT NULL
+    AND COALESCE(NEW.quantity, 0) != COALESCE(OLD.quantity, 0)
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    VALUES (
+        NEW.product_id, NEW.location_id, COALESCE(NEW.quantity, 0) - COALESCE(OLD.quantity, 0),
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'adjustment')
+    );
+END;
+
+-- A row moved to another product or location leaves one key and enters another
+CREATE TRIGGER IF NOT EXISTS trg_inventory_movement_rekey
+AFTER UPDATE OF product_id, location_id ON inventory
+WHEN NEW.product_id IS NOT OLD.product_id OR NEW.location_id IS NOT OLD.location_id
+BEGIN
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    SELECT OLD.product_id, OLD.location_id, -OLD.quantity,
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'transfer')
+    WHERE OLD.product_id IS NOT NULL AND COALESCE(OLD.quantity, 0) != 0;
+    INSERT INTO stock_movements (product_id, location_id, delta, order_id, reason)
+    SELECT NEW.product_id, NEW.location_id, NEW.quantity,
+        (SELECT order_id FROM stock_movement_context),
+        COALESCE((SELECT reason FROM stock_movement_context), 'transfer')
+    WHERE NEW.product_id IS NOT NULL AND COALESCE(NEW.quantity, 0) != 0;
+END;
@@ -0,0 +1,33 @@
+-- One inventory row per (product, location) slot. Duplicate rows created by
+-- repeated assignments are merged into the oldest row of their slot (keeping
+-- its thresholds) before the unique index is built. The ledger records the
+-- merge as offsetting 'merge' movements, so balances are unchanged.
+
+INSERT OR REPLACE INTO stock_movement_context (context_id, order_id, reason) VALUES (1, NULL, 'merge');
+
+UPDATE inventory
+SET quantity = (
+    SELECT SUM(COALESCE(d.quantity, 0)) FROM inventory d
+    WHERE d.product_id = inventory.product_id AND d.location_id = inventory.location_id
+)
+WHERE inventory_id IN (
+    SELECT MIN(inventory_id) FROM inventory
+    WHERE product_id IS NOT NULL AND location_id IS NOT NULL
+    GROUP BY product_id, location_id
+    HAVING COUNT(*) > 1
+);
+
+DELETE FROM inventory
+WHERE product_id IS NOT NULL AND location_id IS NOT NULL
+  AND inventory_id NOT IN (
+    SELECT MIN(inventory_id) FROM inventory
+    WHERE product_id IS NOT NULL AND location_id IS NOT NULL
+    GROUP BY product_id, location_id
+);
+
+DELETE FROM stock_movement_context;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_inventory_slot ON inventory (product_id, location_id);
+
+-- Superseded by the unique index on the same columns
+DROP INDEX IF EXISTS idx_inventory_product_location;
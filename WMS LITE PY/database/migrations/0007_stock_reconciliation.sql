@@ -0,0 +1,27 @@
+-- Differences between products.stock and the inventory summed over locations,
+-- one row per product, written by the reconciliation job.
+CREATE TABLE IF NOT EXISTS stock_discrepancies (
+    product_id INTEGER PRIMARY KEY,
+    product_stock INTEGER NOT NULL,
+    inventory_quantity INTEGER NOT NULL,
+    difference INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'open',
+    detected_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    resolved_at DATETIME,
+    notes TEXT,
+    FOREIGN KEY (product_id) REFERENCES products (product_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_stock_discrepancies_status ON stock_discrepancies (status, product_id);
+
+-- Each run checks the products moved after the previous run's last movement
+CREATE TABLE IF NOT EXISTS reconciliation_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    from_movement_id INTEGER,
+    to_movement_id INTEGER NOT NULL,
+    products_checked INTEGER NOT NULL DEFAULT 0,
+    discrepancies INTEGER NOT NULL DEFAULT 0,
+    started_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    finished_at DATETIME
+);
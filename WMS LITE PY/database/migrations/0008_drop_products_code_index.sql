@@ -0,0 +1,4 @@
+-- products.code is UNIQUE, so code lookups already search its automatic
+-- index. Databases that got the redundant idx_products_code from an earlier
+-- version of this migration drop it here; new databases have nothing to drop.
+DROP INDEX IF EXISTS idx_products_code;
@@ -0,0 +1,78 @@
+"""Versioned schema migrations tracked through PRAGMA user_version.
+
+Migrations are SQL files in database/migrations named NNNN_description.sql.
+Each pending migration runs inside its own BEGIN IMMEDIATE transaction
+together with the user_version bump, so a failed migration leaves the
+database at the previous version.
+"""
+import os
+import re
+import sqlite3
+from typing import List, Tuple
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), 'migrations')
+_MIGRATION_FILE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+def discover_migrations(directory: str = MIGRATIONS_DIR) -> List[Tuple[int, str, str]]:
+    """Return (version, name, path) for every migration file, ordered by version"""
+    migrations = []
+    for filename in os.listdir(directory):
+        match = _MIGRATION_FILE.match(filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(directory, filename)))
+    migrations.sort()
+    versions = [version for version, _, _ in migrations]
+    if len(versions) != len(set(versions)):
+        raise ValueError(f"Duplicate migration versions in {directory}")
+    return migrations
+
+def get_schema_version(conn) -> int:
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def get_latest_version(directory: str = MIGRATIONS_DIR) -> int:
+    migrations = discover_migrations(directory)
+    return migrations[-1][0] if migrations else 0
+
+def split_statements(script: str) -> List[str]:
+    """Split a SQL script into complete statements (trigger bodies stay intact)"""
+    statements = []
+    buffer = ''
+    for part in script.split(';'):
+        buffer += part + ';'
+        if sqlite3.complete_statement(buffer):
+            statement = buffer.strip()
+            if statement.strip(';').strip() and not _is_comment_only(statement):
+                statements.append(statement)
+            buffer = ''
+    return statements
+
+def _is_comment_only(statement: str) -> bool:
+    lines = [line.strip() for line in statement.strip(';').splitlines()]
+    return all(not line or line.startswith('--') for line in lines)
+
+def run_migrations(conn, directory: str = MIGRATIONS_DIR) -> List[int]:
+    """Apply pending migrations on an autocommit connection and return the applied versions"""
+    if conn.isolation_level is not None:
+        raise ValueError("run_migrations requires a connection opened with isolation_level=None")
+    applied = []
+    for version, name, path in discover_migrations(directory):
+        if version <= get_schema_version(conn):
+            continue
+        with open(path, 'r', encoding='utf-8') as migration_file:
+            statements = split_statements(migration_file.read())
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Another process may have applied it while we waited for the lock
+            if version <= get_schema_version(conn):
+                conn.execute('ROLLBACK')
+                continue
+            for statement in statements:
+                conn.execute(statement)
+            conn.execute(f'PRAGMA user_version = {version}')
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise sqlite3.Error(f"Migration {version:04d}_{name} failed: {str(e)}")
+        applied.append(version)
+    return applied
@@ -0,0 +1,146 @@
+"""Finalization of purchase order receptions in a single transaction.
+
+The order header, its items, the product stock and the inventory of the
+receiving locations are written by one writer job, so a reception is either
+fully applied or not at all, and it holds one connection for one commit
+regardless of the number of lines.
+"""
+from typing import Dict, Iterable
+from .db_utils import InventoryDB, ProductDB, execute_cached_write, movement_context
+
+# Bound variables per IN (...) lookup, below SQLite's historical limit of 999
+_LOOKUP_CHUNK = 500
+
+def _map_skus(conn, skus) -> Dict[str, int]:
+    """Map each SKU to its product_id (the oldest product when a SKU is duplicated)"""
+    skus = list(skus)
+    sku_map = {}
+    for start in range(0, len(skus), _LOOKUP_CHUNK):
+        chunk = skus[start:start + _LOOKUP_CHUNK]
+        placeholders = ', '.join('?' * len(chunk))
+        for row in conn.execute(
+            f'SELECT sku, MIN(product_id) FROM products WHERE sku IN ({placeholders}) GROUP BY sku', chunk
+        ):
+            sku_map[row[0]] = row[1]
+    return sku_map
+
+def _map_locations(conn, zone: str) -> Dict[str, int]:
+    """Map 'aisle-shelf-position' labels of a zone to their location_id"""
+    return {
+        f"{row['aisle']}-{row['shelf']}-{row['position']}": row['location_id']
+        for row in conn.execute('SELECT location_id, aisle, shelf, position FROM locations WHERE zone = ?', (zone,))
+    }
+
+def _received_movements(conn, order_id) -> Dict[tuple, int]:
+    """Net (product_id, location_id) changes journaled by earlier receptions of an order.
+
+    location_id is None for products.stock. The ledger records exactly what was
+    applied, so orders created elsewhere without receiving stock have none.
+    """
+    return {
+        (row['product_id'], row['location_id']): row['quantity']
+        for row in conn.execute(
+            '''SELECT product_id, location_id, SUM(delta) as quantity
+               FROM stock_movements
+               WHERE order_id = ? AND reason = 'reception'
+               GROUP BY product_id, location_id
+               HAVING SUM(delta) != 0''',
+            (order_id,)
+        )
+    }
+
+def finalize_reception(order_number: str, items: Iterable[dict], order_type_code: str = 'INBOUND',
+                       status: str = 'completed', receiving_zone: str = 'Recepción') -> dict:
+    """Commit a received purchase order in one transaction.
+
+    Args:
+        order_number: PO number; an existing order with this number keeps its row
+            and has its items replaced, and only the difference with what its
+            earlier reception put into stock and inventory is applied
+        items: dicts with 'sku' and 'quantity', and optionally 'location' as an
+            'aisle-shelf-position' label of `receiving_zone` where the goods are stored
+        order_type_code: code of the order type for new orders
+        status: status the order is left in
+
+    Returns:
+        dict with order_id, whether the order was created, the number of item
+        lines, the stock change per product_id and the inventory rows touched
+
+    Raises:
+        ValueError: unknown order type, SKU or location, a non-positive quantity, or
+            fewer units than the earlier reception left at a location that are
+            still there; nothing is written in that case
+    """
+    items = list(items)
+    for index, item in enumerate(items):
+        if item['quantity'] <= 0:
+            raise ValueError(f"Item {index + 1} ({item['sku']}) must have a positive quantity")
+
+    def _write(conn):
+        sku_map = _map_skus(conn, {item['sku'] for item in items})
+        missing_skus = sorted({item['sku'] for item in items} - set(sku_map))
+        if missing_skus:
+            raise ValueError(f"Products with SKU {', '.join(missing_skus)} not found")
+
+        location_map = _map_locations(conn, receiving_zone) if any(item.get('location') for item in items) else {}
+        missing_locations = sorted({
+            item['location'] for item in items if item.get('location') and item['location'] not in location_map
+        })
+        if missing_locations:
+            raise ValueError(f"Locations {', '.join(missing_locations)} not found in zone {receiving_zone}")
+
+        existing = conn.execute('SELECT order_id FROM orders WHERE order_number = ?', (order_number,)).fetchone()
+        received = {}
+        if existing:
+            order_id = existing['order_id']
+            received = _received_movements(conn, order_id)
+            conn.execute('DELETE FROM order_items WHERE order_id = ?', (order_id,))
+            conn.execute('UPDATE orders SET status = ? WHERE order_id = ?', (status, order_id))
+        else:
+            order_type = conn.execute('SELECT type_id FROM order_types WHERE code = ?', (order_type_code,)).fetchone()
+            if order_type is None:
+                raise ValueError(f"Order type '{order_type_code}' not found")
+            order_id = conn.execute(
+                'INSERT INTO orders (order_number, type_id, status) VALUES (?, ?, ?)',
+                (order_number, order_type['type_id'], status)
+            ).lastrowid
+
+        conn.executemany(
+            'INSERT INTO order_items (order_id, product_id, quantity) VALUES (?, ?, ?)',
+            ((order_id, sku_map[item['sku']], item['quantity']) for item in items)
+        )
+
+        # Net change per slot: this reception minus what an earlier one of the order received
+        inventory = {}
+        for item in items:
+            if item.get('location'):
+                key = (sku_map[item['sku']], location_map[item['location']])
+                inventory[key] = inventory.get(key, 0) + item['quantity']
+        for (product_id, location_id), quantity in received.items():
+            if location_id is not None:
+                key = (product_id, location_id)
+                inventory[key] = inventory.get(key, 0) - quantity
+        inventory = {key: quantity for key, quantity in inventory.items() if quantity}
+
+        with movement_context(conn, order_id, 'reception'):
+            stock = ProductDB._apply_stock_deltas(conn, [
+                *((sku_map[item['sku']], item['quantity']) for item in items),
+                *((product_id, -quantity) for (product_id, location_id), quantity in received.items() if location_id is None)
+            ])
+            for (product_id, location_id), quantity in inventory.items():
+                if quantity < 0:
+                    InventoryDB._remove_quantity(conn, product_id, location_id, -quantity)
+            conn.executemany(
+                InventoryDB._upsert_query,
+                ((product_id, location_id, quantity, 0, None)
+                 for (product_id, location_id), quantity in inventory.items() if quantity > 0)
+            )
+
+        return {
+            'order_id': order_id,
+            'created': existing is None,
+            'items': len(items),
+            'stock': stock,
+            'inventory_rows': len(inventory),
+        }
+    return execute_cached_write(_write, 'products')
@@ -0,0 +1,200 @@
+"""Reconciliation of products.stock against the inventory held in locations.
+
+Each run compares, per product, the stock counter with the inventory summed
+over all locations using one grouped query per chunk of products, and keeps
+one row per product in stock_discrepancies. Incremental runs only check the
+products with stock movements after the previous run, found through the
+stock_movements ledger.
+"""
+from typing import List, Optional
+from .db_utils import execute_cached_write, execute_write, get_db_read_connection, movement_context
+
+DISCREPANCY_STATUSES = ['open', 'ignored', 'resolved']
+
+_COMPARE_QUERY = '''SELECT p.product_id,
+                   COALESCE(p.stock, 0) as product_stock,
+                   COALESCE(SUM(i.quantity), 0) as inventory_quantity
+                   FROM products p
+                   LEFT JOIN inventory i ON i.product_id = p.product_id'''
+
+class StockReconciler:
+    def __init__(self, chunk_size: int = 500):
+        self.chunk_size = chunk_size
+
+    @staticmethod
+    def last_run() -> Optional[dict]:
+        with get_db_read_connection() as conn:
+            run = conn.execute(
+                'SELECT * FROM reconciliation_runs WHERE finished_at IS NOT NULL ORDER BY run_id DESC LIMIT 1'
+            ).fetchone()
+            return dict(run) if run else None
+
+    def run(self, incremental: bool = True) -> dict:
+        """Reconcile all products, or only those moved since the last run.
+
+        Falls back to a full run when there is no previous run or when ledger
+        compaction removed movements the incremental run would need.
+        Returns the reconciliation_runs row of this run.
+        """
+        last = self.last_run() if incremental else None
+        with get_db_read_connection() as conn:
+            # Movements up to this id are covered by this run; later ones go to the next
+            bounds = conn.execute('SELECT MIN(movement_id), MAX(movement_id) FROM stock_movements').fetchone()
+        first_movement, to_movement = bounds[0], bounds[1] or 0
+        if last is not None and (first_movement is None or first_movement <= last['to_movement_id'] + 1):
+            mode, from_movement = 'incremental', last['to_movement_id']
+        else:
+            mode, from_movement = 'full', None
+
+        run_id = execute_write(lambda conn: conn.execute(
+            'INSERT INTO reconciliation_runs (mode, from_movement_id, to_movement_id) VALUES (?, ?, ?)',
+            (mode, from_movement, to_movement)
+        ).lastrowid)
+
+        checked = 0
+        for rows in (self._iter_changed(from_movement, to_movement) if mode == 'incremental' else self._iter_all()):
+            self._record(rows)
+            checked += len(rows)
+
+        def _finish(conn):
+            conn.execute(
+                '''UPDATE reconciliation_runs
+                   SET products_checked = ?,
+                       discrepancies = (SELECT COUNT(*) FROM stock_discrepancies WHERE status = 'open'),
+                       finished_at = CURRENT_TIMESTAMP
+                   WHERE run_id = ?''',
+                (checked, run_id)
+            )
+            return dict(conn.execute('SELECT * FROM reconciliation_runs WHERE run_id = ?', (run_id,)).fetchone())
+        return execute_write(_finish)
+
+    def _iter_all(self):
+        """Yield comparison rows for the whole catalog, chunk by chunk in product_id order"""
+        after = 0
+        while True:
+            with get_db_read_connection() as conn:
+                rows = conn.execute(
+                    f'{_COMPARE_QUERY} WHERE p.product_id > ? GROUP BY p.product_id ORDER BY p.product_id LIMIT ?',
+                    (after, self.chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            after = rows[-1]['product_id']
+
+    def _iter_changed(self, from_movement: int, to_movement: int):
+        """Yield comparison rows for the products moved in (from_movement, to_movement]"""
+        with get_db_read_connection() as conn:
+            product_ids = [
+                row[0] for row in conn.execute(
+                    'SELECT DISTINCT product_id FROM stock_movements WHERE movement_id > ? AND movement_id <= ?',
+                    (from_movement, to_movement)
+                )
+            ]
+        for start in range(0, len(product_ids), self.chunk_size):
+            chunk = product_ids[start:start + self.chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            with get_db_read_connection() as conn:
+                rows = conn.execute(
+                    f'{_COMPARE_QUERY} WHERE p.product_id IN ({placeholders}) GROUP BY p.product_id', chunk
+                ).fetchall()
+            if rows:
+                yield rows
+
+    @staticmethod
+    def _record(rows):
+        """Open or update discrepancies for mismatched products and resolve the ones that agree again"""
+        mismatched = [
+            (row['product_id'], row['product_stock'], row['inventory_quantity'],
+             row['product_stock'] - row['inventory_quantity'])
+            for row in rows if row['product_stock'] != row['inventory_quantity']
+        ]
+        matching = [
+            (row['product_stock'], row['inventory_quantity'], row['product_id'])
+            for row in rows if row['product_stock'] == row['inventory_quantity']
+        ]
+
+        def _write(conn):
+            # An ignored discrepancy stays ignored only while its difference is unchanged
+            conn.executemany(
+                '''INSERT INTO stock_discrepancies (product_id, product_stock, inventory_quantity, difference)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT (product_id) DO UPDATE SET
+                       product_stock = excluded.product_stock,
+                       inventory_quantity = excluded.inventory_quantity,
+                       difference = excluded.difference,
+                       status = CASE WHEN status = 'ignored' AND difference = excluded.difference
+                                     THEN 'ignored' ELSE 'open' END,
+                       detected_at = CASE WHEN status = 'resolved' OR difference != excluded.difference
+                                          THEN CURRENT_TIMESTAMP ELSE detected_at END,
+                       resolved_at = NULL''',
+                mismatched
+            )
+            conn.executemany(
+                '''UPDATE stock_discrepancies
+                   SET product_stock = ?, inventory_quantity = ?, difference = 0,
+                       status = 'resolved', resolved_at = CURRENT_TIMESTAMP
+                   WHERE product_id = ? AND status IN ('open', 'ignored')''',
+                matching
+            )
+        execute_write(_write)
+
+class DiscrepancyDB:
+    @staticmethod
+    def get_discrepancies(status: Optional[str] = 'open', limit: Optional[int] = None) -> List[dict]:
+        """Discrepancies with product details, largest absolute difference first"""
+        query = '''SELECT d.*, p.sku, p.name as product_name
+                   FROM stock_discrepancies d
+                   JOIN products p ON d.product_id = p.product_id'''
+        params = []
+        if status:
+            query += ' WHERE d.status = ?'
+            params.append(status)
+        query += ' ORDER BY ABS(d.difference) DESC, d.product_id'
+        if limit:
+            query += ' LIMIT ?'
+            params.append(limit)
+        with get_db_read_connection() as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    @staticmethod
+    def set_status(product_id, status, notes=None):
+        if status not in DISCREPANCY_STATUSES:
+            raise ValueError(f"Invalid status. Must be one of: {', '.join(DISCREPANCY_STATUSES)}")
+
+        def _write(conn):
+            cursor = conn.execute(
+                '''UPDATE stock_discrepancies
+                   SET status = ?, notes = COALESCE(?, notes),
+                       resolved_at = CASE WHEN ? = 'resolved' THEN CURRENT_TIMESTAMP END
+                   WHERE product_id = ?''',
+                (status, notes, status, product_id)
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"No discrepancy recorded for product ID {product_id}")
+            return True
+        return execute_write(_write)
+
+    @staticmethod
+    def adjust_stock_to_inventory(product_id, notes=None):
+        """Set products.stock to the inventory held in locations and resolve the discrepancy.
+
+        The difference is recomputed inside the write, so changes made since the
+        last run are taken into account. Returns the stock change applied.
+        """
+        def _write(conn):
+            row = conn.execute(f'{_COMPARE_QUERY} WHERE p.product_id = ? GROUP BY p.product_id', (product_id,)).fetchone()
+            if row is None:
+                raise ValueError(f"Product with ID {product_id} not found")
+            change = row['inventory_quantity'] - row['product_stock']
+            with movement_context(conn, reason='reconciliation'):
+                conn.execute('UPDATE products SET stock = COALESCE(stock, 0) + ? WHERE product_id = ?', (change, product_id))
+            conn.execute(
+                '''UPDATE stock_discrepancies
+                   SET product_stock = ?, inventory_quantity = ?, difference = 0,
+                       status = 'resolved', resolved_at = CURRENT_TIMESTAMP, notes = COALESCE(?, notes)
+                   WHERE product_id = ?''',
+                (row['inventory_quantity'], row['inventory_quantity'], notes, product_id)
+            )
+            return change
+        return execute_cached_write(_write, 'products')
@@ -0,0 +1,179 @@
+"""Snapshots and compaction of the stock_movements ledger.
+
+A snapshot stores every non-zero balance as of a movement_id, computed from
+the previous snapshot plus the movements after it, so taking one costs the
+number of recent movements rather than the size of the ledger. Compaction
+deletes the movements already covered by the newest snapshot older than the
+retention horizon; balances before that point remain available at snapshot
+granularity. Snapshots older than that one are pruned as well, except the last
+snapshot of each month (WMS_LEDGER_KEEP_MONTHLY_SNAPSHOTS), so the snapshot
+tables do not take over the growth of the ledger.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from threading import Event, Lock, Thread
+from typing import Optional
+from .db_utils import execute_write, get_db_read_connection
+
+def get_ledger_retention_days() -> int:
+    """Days of individual movements kept; 0 disables compaction"""
+    return int(os.getenv('WMS_LEDGER_RETENTION_DAYS', 365))
+
+def get_keep_monthly_snapshots() -> bool:
+    """Keep the last snapshot of every month when pruning (point-in-time history)"""
+    return os.getenv('WMS_LEDGER_KEEP_MONTHLY_SNAPSHOTS', '1').strip().lower() in ('1', 'true', 'yes', 'on')
+
+class LedgerCompactor:
+    _background_thread = None
+    _background_stop = Event()
+    _background_lock = Lock()
+
+    def __init__(self, retention_days: Optional[int] = None, batch_size: int = 5000, keep_monthly: Optional[bool] = None):
+        self.retention_days = get_ledger_retention_days() if retention_days is None else retention_days
+        self.batch_size = batch_size
+        self.keep_monthly = get_keep_monthly_snapshots() if keep_monthly is None else keep_monthly
+
+    def cutoff(self) -> str:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=self.retention_days)
+        return cutoff.strftime('%Y-%m-%d %H:%M:%S')
+
+    def take_snapshot(self) -> Optional[int]:
+        """Snapshot the balances up to the latest movement; returns the snapshot_id,
+        or None if nothing moved since the previous snapshot"""
+        def _write(conn):
+            last_movement = conn.execute('SELECT COALESCE(MAX(movement_id), 0) FROM stock_movements').fetchone()[0]
+            previous = conn.execute(
+                'SELECT snapshot_id, movement_id FROM stock_snapshots ORDER BY snapshot_id DESC LIMIT 1'
+            ).fetchone()
+            if previous is not None and previous['movement_id'] == last_movement:
+                return None
+            previous_id = previous['snapshot_id'] if previous else None
+            previous_movement = previous['movement_id'] if previous else 0
+
+            snapshot_id = conn.execute(
+                'INSERT INTO stock_snapshots (movement_id) VALUES (?)', (last_movement,)
+            ).lastrowid
+            conn.execute(
+                '''INSERT INTO stock_snapshot_balances (snapshot_id, product_id, location_id, quantity)
+                   SELECT ?, product_id, location_id, SUM(quantity)
+                   FROM (
+                       SELECT product_id, location_id, quantity FROM stock_snapshot_balances WHERE snapshot_id = ?
+                       UNION ALL
+                       SELECT product_id, location_id, delta FROM stock_movements
+                       WHERE movement_id > ? AND movement_id <= ?
+                   )
+                   GROUP BY product_id, location_id
+                   HAVING SUM(quantity) != 0''',
+                (snapshot_id, previous_id, previous_movement, last_movement)
+            )
+            return snapshot_id
+        return execute_write(_write)
+
+    def _horizon_snapshot(self):
+        """(snapshot_id, movement_id) of the newest snapshot older than the retention horizon"""
+        with get_db_read_connection() as conn:
+            return conn.execute(
+                'SELECT snapshot_id, movement_id FROM stock_snapshots WHERE taken_at < ? ORDER BY snapshot_id DESC LIMIT 1',
+                (self.cutoff(),)
+            ).fetchone()
+
+    def compact_batch(self) -> int:
+        """Delete up to batch_size movements covered by the newest snapshot older
+        than the retention horizon; returns the number deleted"""
+        if self.retention_days <= 0:
+            return 0
+        horizon = self._horizon_snapshot()
+        if horizon is None:
+            return 0
+
+        def _delete(conn):
+            return conn.execute(
+                '''DELETE FROM stock_movements WHERE movement_id IN (
+                       SELECT movement_id FROM stock_movements WHERE movement_id <= ? ORDER BY movement_id LIMIT ?
+                   )''',
+                (horizon['movement_id'], self.batch_size)
+            ).rowcount
+        return execute_write(_delete)
+
+    def prune_snapshot(self) -> bool:
+        """Delete the oldest snapshot older than the horizon snapshot (keeping the
+        last one of each month if keep_monthly); returns False when none is left"""
+        if self.retention_days <= 0:
+            return False
+        horizon = self._horizon_snapshot()
+        if horizon is None:
+            return False
+        monthly = (
+            ''' AND snapshot_id NOT IN (
+                   SELECT MAX(snapshot_id) FROM stock_snapshots GROUP BY strftime('%Y-%m', taken_at)
+               )''' if self.keep_monthly else ''
+        )
+
+        def _delete(conn):
+            snapshot = conn.execute(
+                'SELECT snapshot_id FROM stock_snapshots WHERE snapshot_id < ?' + monthly + ' ORDER BY snapshot_id LIMIT 1',
+                (horizon['snapshot_id'],)
+            ).fetchone()
+            if snapshot is None:
+                return False
+            conn.execute('DELETE FROM stock_snapshot_balances WHERE snapshot_id = ?', (snapshot['snapshot_id'],))
+            conn.execute('DELETE FROM stock_snapshots WHERE snapshot_id = ?', (snapshot['snapshot_id'],))
+            return True
+        return execute_write(_delete)
+
+    def run(self, max_batches: Optional[int] = None, pause: float = 0.05, stop_event: Optional[Event] = None) -> int:
+        """Take a snapshot, compact in batches (pausing between them so other
+        writers get the lock) and prune old snapshots; returns the number of
+        movements deleted"""
+        self.take_snapshot()
+        total = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            deleted = self.compact_batch()
+            if not deleted:
+                break
+            total += deleted
+            batches += 1
+            if self._pause(pause, stop_event):
+                return total
+        while self.prune_snapshot():
+            if self._pause(pause, stop_event):
+                break
+        return total
+
+    @staticmethod
+    def _pause(pause: float, stop_event: Optional[Event]) -> bool:
+        """Sleep between batches; returns True if stop_event was set"""
+        if stop_event is not None:
+            return stop_event.wait(pause)
+        time.sleep(pause)
+        return False
+
+    @classmethod
+    def start_background(cls, interval: float = 86400, **kwargs) -> bool:
+        """Snapshot and compact every `interval` seconds in a daemon thread (once per process)"""
+        with cls._background_lock:
+            if cls._background_thread is not None and cls._background_thread.is_alive():
+                return False
+            compactor = cls(**kwargs)
+            cls._background_stop.clear()
+
+            def _loop():
+                while not cls._background_stop.is_set():
+                    try:
+                        compactor.run(stop_event=cls._background_stop)
+                    except Exception as e:
+                        print(f"Error compacting stock ledger: {str(e)}")
+                    cls._background_stop.wait(interval)
+
+            cls._background_thread = Thread(target=_loop, name='wms-ledger-compactor', daemon=True)
+            cls._background_thread.start()
+            return True
+
+    @classmethod
+    def stop_background(cls, timeout: float = 5):
+        cls._background_stop.set()
+        if cls._background_thread is not None:
+            cls._background_thread.join(timeout)
+            cls._background_thread = None
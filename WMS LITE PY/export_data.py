@@ -0,0 +1,25 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from database.exporters import EXPORT_DATASETS, EXPORT_FORMATS, export_dataset
+
+def main():
+    parser = argparse.ArgumentParser(description="Export inventory, orders, process history or stock movements to CSV/JSONL")
+    parser.add_argument('dataset', choices=list(EXPORT_DATASETS), help="Dataset to export")
+    parser.add_argument('path', help="Output file, or - for standard output")
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS), default='csv', help="Output format")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Rows fetched per round trip")
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_database()
+
+    output = sys.stdout if args.path == '-' else args.path
+    count = export_dataset(args.dataset, output, args.format, args.chunk_size)
+    if args.path != '-':
+        print(f"Exported {count} {args.dataset} rows to {args.path}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,7 +3,10 @@ import pandas as pd
 import sqlite3
 from dotenv import load_dotenv
 import os
-from database.db_utils import init_database, ProductDB, InventoryDB, LocationDB, OrderDB, ProcessHistoryDB
+from database.db_utils import init_database, ProductDB, InventoryDB, LocationDB, ProcessHistoryDB, DashboardDB
+from database.history_archive import HistoryArchiver
+from database.stock_ledger import LedgerCompactor
+from database.importers import import_products, import_locations, detect_format, PRODUCT_FIELDS, LOCATION_FIELDS
 
 # Load environment variables
 load_dotenv()
@@ -12,6 +15,11 @@ load_dotenv()
 # Initialize database
 init_database()
 
+# Keep the process history table small by archiving old records in the background
+HistoryArchiver.start_background()
+# Snapshot stock balances and compact old ledger movements daily
+LedgerCompactor.start_background()
+
 # Configure the page
 st.set_page_config(
     page_title="WMS Lite",
@@ -26,7 +34,7 @@ st.title('WMS Lite 📦')
 st.sidebar.title('Navegación')
 option = st.sidebar.selectbox(
     'Seleccionar página',
-    ['Panel Principal', 'Gestión de Productos', 'Gestión de Zonas']
+    ['Panel Principal', 'Gestión de Productos', 'Gestión de Zonas', 'Importación de Datos']
 )
 
 # Main content area
@@ -34,35 +42,32 @@ if option == 'Panel Principal':
     st.header('Panel Principal')
     st.write('Bienvenido a WMS Lite - Tu Solución de Gestión de Almacenes')
     
+    stats = DashboardDB.get_dashboard_stats()
+
     # Dashboard metrics in a 2x2 grid
     col1, col2 = st.columns(2)
     col3, col4 = st.columns(2)
 
     # First row
     with col1:
-        products = len(ProductDB.get_all_products())
-        st.metric(label="Total de Productos", value=products)
+        st.metric(label="Total de Productos", value=stats['total_products'])
 
     with col2:
-        locations = len(LocationDB.get_all_locations())
-        st.metric(label="Total de Ubicaciones", value=locations)
+        st.metric(label="Total de Ubicaciones", value=stats['total_locations'])
 
     # Second row
     with col3:
-        categories = len(ProductDB.get_all_categories())
-        st.metric(label="Categorías de Productos", value=categories)
+        st.metric(label="Categorías de Productos", value=stats['total_categories'])
 
     with col4:
-        inventory = InventoryDB.get_inventory_levels()
-        low_stock = sum(1 for item in inventory if item['quantity'] <= item['min_quantity'])
+        low_stock = stats['low_stock']
         st.metric(label="Productos con Bajo Stock", value=low_stock)
 
     # Additional warehouse insights
     st.subheader("Resumen del Almacén")
     
     # Orders summary
-    orders = OrderDB.get_all_orders()
-    pending_orders = sum(1 for order in orders if order['status'] == 'pending')
+    pending_orders = stats['pending_orders']
     
     # Display orders information
     st.info(f"📦 Órdenes Pendientes: {pending_orders}")
@@ -70,9 +75,35 @@ if option == 'Panel Principal':
     # Stock alerts
     if low_stock > 0:
         st.warning(f"⚠️ Hay {low_stock} productos con stock bajo que requieren atención")
+        with st.expander("Lista de Reposición"):
+            low_stock_items = InventoryDB.get_low_stock_items()
+            st.dataframe(pd.DataFrame([
+                {
+                    'SKU': item['sku'],
+                    'Producto': item['product_name'],
+                    'Ubicación': f"{item['zone']}-{item['aisle']}-{item['shelf']}-{item['position']}",
+                    'Cantidad': item['quantity'],
+                    'Mínimo': item['min_quantity']
+                }
+                for item in low_stock_items
+            ]))
     else:
         st.success("✅ Todos los productos tienen niveles de stock adecuados")
 
+    # Zone occupancy
+    zone_occupancy = InventoryDB.get_zone_occupancy()
+    if zone_occupancy:
+        st.subheader("Ocupación por Zona")
+        st.dataframe(pd.DataFrame([
+            {
+                'Zona': zone['zone'],
+                'Ubicaciones': zone['total_locations'],
+                'Ocupadas': zone['occupied_locations'],
+                'Unidades': zone['quantity']
+            }
+            for zone in zone_occupancy
+        ]))
+
     # Recent activity
     st.subheader("Actividad Reciente")
     recent_history = ProcessHistoryDB.get_process_history(limit=5)
@@ -275,15 +306,13 @@ elif option == 'Gestión de Zonas':
                 LocationDB.add_location(zone_name, "1", "1", "1")
                 
                 # Create additional locations based on configuration
-                locations_added = 0
-                for aisle in range(1, num_aisles + 1):
-                    for shelf in range(1, num_shelves + 1):
-                        for position in range(1, num_positions + 1):
-                            try:
-                                LocationDB.add_location(zone_name, str(aisle), str(shelf), str(position))
-                                locations_added += 1
-                            except sqlite3.IntegrityError:
-                                continue
+                result = LocationDB.add_locations_bulk(
+                    (zone_name, str(aisle), str(shelf), str(position))
+                    for aisle in range(1, num_aisles + 1)
+                    for shelf in range(1, num_shelves + 1)
+                    for position in range(1, num_positions + 1)
+                )
+                locations_added = result['inserted']
                 
                 st.success(f"¡Zona {zone_name} creada exitosamente con {locations_added} ubicaciones!")
                 st.rerun()
@@ -341,16 +370,14 @@ elif option == 'Gestión de Zonas':
                 position_range = range(int(position_start), int(position_end) + 1) if position_end else [int(position_start)]
                 
                 # Create locations for all combinations
-                locations_added = 0
-                duplicates = 0
-                for aisle in aisle_range:
-                    for shelf in shelf_range:
-                        for position in position_range:
-                            try:
-                                LocationDB.add_location(zone, str(aisle), str(shelf), str(position))
-                                locations_added += 1
-                            except sqlite3.IntegrityError:
-                                duplicates += 1
+                result = LocationDB.add_locations_bulk(
+                    (zone, str(aisle), str(shelf), str(position))
+                    for aisle in aisle_range
+                    for shelf in shelf_range
+                    for position in position_range
+                )
+                locations_added = result['inserted']
+                duplicates = len(result['conflicts'])
                 
                 if locations_added > 0:
                     success_msg = f"¡{locations_added} ubicaciones agregadas exitosamente!"
@@ -553,4 +580,51 @@ elif option == 'Gestión de Zonas':
                                 
                                 st.markdown("---")
 
-    
\ No newline at end of file
+    
+
+elif option == 'Importación de Datos':
+    st.header('Importación de Datos')
+    st.write('Cargue el maestro de productos o la disposición de ubicaciones desde archivos CSV o JSONL.')
+    
+    dataset = st.radio("Tipo de Datos", ['Productos', 'Ubicaciones'], horizontal=True)
+    expected_fields = PRODUCT_FIELDS if dataset == 'Productos' else LOCATION_FIELDS
+    st.caption(f"Columnas esperadas: {', '.join(expected_fields)}")
+    
+    uploaded_file = st.file_uploader("Archivo", type=['csv', 'jsonl', 'ndjson'])
+    col1, col2 = st.columns(2)
+    with col1:
+        chunk_size = st.number_input("Filas por lote", min_value=100, value=1000, step=100)
+    with col2:
+        create_categories = st.checkbox("Crear categorías inexistentes", value=True, disabled=dataset != 'Productos')
+    
+    if uploaded_file and st.button("Importar"):
+        try:
+            fmt = detect_format(uploaded_file.name)
+            with st.spinner("Importando..."):
+                if dataset == 'Productos':
+                    report = import_products(uploaded_file, fmt=fmt, chunk_size=chunk_size, create_missing_categories=create_categories)
+                else:
+                    report = import_locations(uploaded_file, fmt=fmt, chunk_size=chunk_size)
+            
+            col1, col2, col3, col4 = st.columns(4)
+            col1.metric("Filas Procesadas", report.processed)
+            col2.metric("Registros Insertados", report.inserted)
+            col3.metric("Duplicados", report.duplicates)
+            col4.metric("Errores", report.errors)
+            
+            if report.issues:
+                st.subheader("Detalle por Línea")
+                issues_df = pd.DataFrame(report.issues)
+                issues_df.columns = ['Línea', 'Tipo', 'Mensaje']
+                st.dataframe(issues_df, use_container_width=True, hide_index=True)
+                if report.truncated:
+                    st.info(f"Se muestran solo las primeras {len(report.issues)} incidencias")
+            
+            ProcessHistoryDB.log_process(
+                operation_type="Importación",
+                sub_operation=f"Importación de {dataset}",
+                status="Completado" if report.errors == 0 else "Con Errores",
+                details=f"{uploaded_file.name}: {report.inserted} insertados, {report.duplicates} duplicados, {report.errors} errores"
+            )
+        except ValueError as e:
+            st.error(str(e))
@@ -0,0 +1,45 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from database.importers import import_products, import_locations
+
+def main():
+    parser = argparse.ArgumentParser(description="Import products or locations from CSV/JSONL files")
+    parser.add_argument('dataset', choices=['products', 'locations'], help="Dataset to import")
+    parser.add_argument('path', help="Path to a .csv or .jsonl file")
+    parser.add_argument('--format', choices=['csv', 'jsonl'], help="File format (defaults to the file extension)")
+    parser.add_argument('--chunk-size', type=int, default=1000, help="Rows per transaction")
+    parser.add_argument('--delimiter', default=',', help="CSV column delimiter")
+    parser.add_argument('--no-create-categories', action='store_true', help="Reject products whose category does not exist")
+    args = parser.parse_args()
+
+    load_dotenv()
+    print("Initializing database...")
+    init_database()
+
+    print(f"Importing {args.dataset} from {args.path}...")
+    if args.dataset == 'products':
+        report = import_products(
+            args.path,
+            fmt=args.format,
+            chunk_size=args.chunk_size,
+            create_missing_categories=not args.no_create_categories,
+            delimiter=args.delimiter
+        )
+    else:
+        report = import_locations(args.path, fmt=args.format, chunk_size=args.chunk_size, delimiter=args.delimiter)
+
+    for issue in report.issues:
+        print(f"Line {issue['line']} [{issue['type']}]: {issue['message']}")
+    if report.truncated:
+        print(f"... only the first {len(report.issues)} issues are listed")
+
+    print(f"\nProcessed: {report.processed}")
+    print(f"Inserted: {report.inserted}")
+    print(f"Duplicates: {report.duplicates}")
+    print(f"Errors: {report.errors}")
+    return 1 if report.errors else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from database.location_manager import LocationManager
+from database.db_utils import LocationDB
 
 def initialize_inbound_locations():
     # Define zones for inbound orders
@@ -23,28 +23,30 @@ def initialize_inbound_locations():
     # Create locations for each zone
     for zone in inbound_zones:
         print(f"\nCreating locations for zone: {zone}")
-        zone_locations = initial_locations.get(zone, [])
+        zone_locations = [
+            (zone, loc['aisle'], loc['shelf'], pos)
+            for loc in initial_locations.get(zone, [])
+            for pos in loc['positions']
+        ]
+        
+        try:
+            result = LocationDB.add_locations_bulk(zone_locations)
+        except Exception as e:
+            print(f"Error creating locations: {str(e)}")
+            continue
         
-        for loc in zone_locations:
-            for pos in loc['positions']:
-                try:
-                    location_id = LocationManager.create_location_in_zone(
-                        zone=zone,
-                        aisle=loc['aisle'],
-                        shelf=loc['shelf'],
-                        position=pos
-                    )
-                    if location_id:
-                        created_locations.append({
-                            'id': location_id,
-                            'zone': zone,
-                            'aisle': loc['aisle'],
-                            'shelf': loc['shelf'],
-                            'position': pos
-                        })
-                        print(f"Created location: {zone} - {loc['aisle']}-{loc['shelf']}-{pos}")
-                except Exception as e:
-                    print(f"Error creating location: {str(e)}")
+        skipped = {conflict['index'] for conflict in result['conflicts']}
+        for index, (_, aisle, shelf, pos) in enumerate(zone_locations):
+            if index in skipped:
+                print(f"Skipped existing location: {zone} - {aisle}-{shelf}-{pos}")
+                continue
+            created_locations.append({
+                'zone': zone,
+                'aisle': aisle,
+                'shelf': shelf,
+                'position': pos
+            })
+            print(f"Created location: {zone} - {aisle}-{shelf}-{pos}")
     
     print(f"\nCreated {len(created_locations)} locations for inbound operations")
     return created_locations
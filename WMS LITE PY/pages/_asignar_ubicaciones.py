@@ -1,88 +1,70 @@
 import streamlit as st
+import pandas as pd
 import cv2
-from pyzbar.pyzbar import decode
 import numpy as np
 import io
 from PIL import Image
 from streamlit_webrtc import webrtc_streamer, VideoTransformerBase, RTCConfiguration
 from database.db_utils import ProductDB, InventoryDB, LocationDB, ProcessHistoryDB
 from database.location_manager import LocationManager
+from scanning import DecodeWorkerPool, DetectionPipeline, ScanSessionBuffer, draw_detections
 import av
-import queue
 import threading
 import time
 
+SESSION_REFRESH_SECONDS = 0.3
+# Zone where finalize_reception leaves received goods until they are put away
+RECEIVING_ZONE = "Recepción"
+
+def _render_scan_session(placeholder, scan_buffer):
+    """Draw the units scanned per product into `placeholder`, replacing its previous content"""
+    items = scan_buffer.items()
+    with placeholder.container():
+        if not items:
+            st.caption("Aún no se han escaneado códigos en esta sesión.")
+            return
+        metrics = scan_buffer.metrics()
+        st.caption(f"{metrics['scans']} unidades escaneadas, {metrics['duplicates']} lecturas repetidas ignoradas")
+        st.dataframe(
+            pd.DataFrame([
+                {
+                    "SKU": item['product']['sku'] if item['product'] else "",
+                    "Producto": item['product']['name'] if item['product'] else (
+                        "No encontrado" if item['status'] == 'unknown' else "Buscando..."),
+                    "Códigos": ", ".join(item['codes']),
+                    "Unidades": item['count']
+                }
+                for item in items
+            ]),
+            use_container_width=True,
+            hide_index=True
+        )
+
 def render_asignar_ubicaciones():
     st.title("📍 Asignación de Ubicaciones")
     
     # Initialize session state
     if 'scanned_product' not in st.session_state:
         st.session_state.scanned_product = None
-    if 'result_queue' not in st.session_state:
-        st.session_state.result_queue = queue.Queue(maxsize=10)  # Limit queue size
+    if 'scan_buffer' not in st.session_state:
+        st.session_state.scan_buffer = ScanSessionBuffer()
     if 'camera_error' not in st.session_state:
         st.session_state.camera_error = None
     
     class BarcodeVideoTransformer(VideoTransformerBase):
         def __init__(self):
-            self.result_queue = st.session_state.result_queue
-            self.last_detection = None
-            self.detection_cooldown = 1.0  # Cooldown in seconds
-            self.last_detection_time = 0
+            # Decoding runs on worker threads so the video keeps the camera frame rate;
+            # the session buffer dedupes and counts the codes without involving Streamlit
+            self.scan_buffer = st.session_state.scan_buffer
+            self.pipeline = DetectionPipeline()
+            self.decoder_pool = DecodeWorkerPool(decode_fn=self.pipeline, on_result=self.scan_buffer.add_detections)
 
         def transform(self, frame):
             try:
-                current_time = time.time()
                 img = frame.to_ndarray(format="bgr24")
-                
-                # Only process frame if cooldown has elapsed
-                if current_time - self.last_detection_time >= self.detection_cooldown:
-                    # Convert to grayscale
-                    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-                    
-                    # Apply image processing to improve barcode detection
-                    gray = cv2.GaussianBlur(gray, (5, 5), 0)
-                    gray = cv2.adaptiveThreshold(
-                        gray, 255,
-                        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                        cv2.THRESH_BINARY,
-                        11, 2
-                    )
-                    
-                    # Detect barcodes
-                    barcodes = decode(gray)
-                    
-                    for barcode in barcodes:
-                        try:
-                            # Extract barcode data
-                            barcode_data = barcode.data.decode('utf-8')
-                            
-                            # Draw rectangle and text
-                            points = barcode.polygon
-                            if points:
-                                pts = np.array(points, np.int32)
-                                pts = pts.reshape((-1, 1, 2))
-                                cv2.polylines(img, [pts], True, (0, 255, 0), 2)
-                            
-                            # Add text with better visibility
-                            x = barcode.rect.left
-                            y = barcode.rect.top
-                            cv2.rectangle(img, (x, y - 30), (x + 200, y), (0, 255, 0), -1)
-                            cv2.putText(img, barcode_data, (x, y - 10),
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
-                            
-                            # Only add to queue if it's a new detection
-                            if barcode_data != self.last_detection:
-                                try:
-                                    self.result_queue.put_nowait(barcode_data)
-                                    self.last_detection = barcode_data
-                                    self.last_detection_time = current_time
-                                except queue.Full:
-                                    pass  # Queue is full, skip this detection
-                        except Exception as e:
-                            st.session_state.camera_error = f"Error processing barcode: {str(e)}"
-                
-                return img
+                self.decoder_pool.submit(img.copy())
+                # Overlay the most recent results; they may lag the frame by a decode
+                return draw_detections(img, self.decoder_pool.latest())
             except Exception as e:
                 st.session_state.camera_error = f"Error in transform: {str(e)}"
                 return frame.to_ndarray(format="bgr24")
@@ -94,6 +76,9 @@ def render_asignar_ubicaciones():
             except Exception as e:
                 st.session_state.camera_error = f"Error in recv: {str(e)}"
                 return frame
+
+        def on_ended(self):
+            self.decoder_pool.stop()
     
     # Create two columns for barcode input methods
     col1, col2 = st.columns(2)
@@ -103,7 +88,7 @@ def render_asignar_ubicaciones():
         barcode = st.text_input("Ingrese o escanee el código de barras", key="barcode_input")
         if st.button("Buscar Producto"):
             if barcode:
-                product = ProductDB.get_product_by_sku(barcode)
+                product = ProductDB.lookup_barcode(barcode)
                 if product:
                     st.session_state.scanned_product = product
                     st.success(f"Producto encontrado: {product['name']}")
@@ -136,33 +121,32 @@ def render_asignar_ubicaciones():
             rtc_configuration=rtc_config,
             media_stream_constraints={"video": True, "audio": False}
         )
-        
-        # Process results from the queue
-        if webrtc_ctx.state.playing:
-            try:
-                while True:
-                    barcode_data = st.session_state.result_queue.get_nowait()
-                    st.write(f"Código detectado: {barcode_data}")
-                    
-                    # Look up product
-                    product = ProductDB.get_product_by_sku(barcode_data)
-                    if product and not st.session_state.scanned_product:
-                        st.session_state.scanned_product = product
-                        st.success(f"Producto encontrado: {product['name']}")
-                        
-                        # Log the successful camera scan
-                        ProcessHistoryDB.log_process(
-                            operation_type="Asignación de Ubicaciones",
-                            sub_operation="Escaneo con Cámara",
-                            status="Completado",
-                            details=f"Producto escaneado: {product['name']} (SKU: {product['sku']})"
-                        )
-                        st.rerun()
-                    elif not product:
-                        st.error(f"No se encontró ningún producto con el código {barcode_data}")
-            except queue.Empty:
-                pass
-    
+
+    # Scan session: units counted per product, updated live while the camera runs
+    scan_buffer = st.session_state.scan_buffer
+    st.subheader("Sesión de Escaneo")
+    session_placeholder = st.empty()
+    _render_scan_session(session_placeholder, scan_buffer)
+
+    session_items = [item for item in scan_buffer.items() if item['product']]
+    col1, col2, col3 = st.columns([3, 1, 1])
+    with col1:
+        options = {
+            f"{item['product']['sku']} - {item['product']['name']} ({item['count']} uds.)": item
+            for item in session_items
+        }
+        selected_item = st.selectbox("Producto escaneado", options=list(options.keys()), key="session_product")
+    with col2:
+        if st.button("Asignar Escaneados", disabled=not session_items):
+            item = options[selected_item]
+            st.session_state.scanned_product = item['product']
+            st.session_state.scanned_codes = item['codes']
+            st.session_state.scanned_quantity = item['count']
+    with col3:
+        if st.button("Vaciar Sesión"):
+            scan_buffer.clear()
+            st.rerun()
+
     # Display product information and location assignment form if a product is scanned
     if st.session_state.scanned_product:
         st.subheader("Información del Producto")
@@ -176,8 +160,23 @@ def render_asignar_ubicaciones():
             st.write(f"**Categoría:** {product.get('category', 'N/A')}")
             st.write(f"**Stock Actual:** {product.get('current_stock', 0)}")
         
+        # Putaway moves units out of the receiving slots; only stock that was never
+        # located anywhere (e.g. initial stock) can be placed without a source
+        source_slots = InventoryDB.get_product_inventory(product['product_id'], zone=RECEIVING_ZONE)
+        unlocated = max(0, (product.get('stock') or 0) - InventoryDB.get_product_on_hand(product['product_id']))
+
         st.subheader("Asignar Ubicación")
         with st.form("location_assignment_form"):
+            source_options = {
+                f"{slot['zone']}-{slot['aisle']}-{slot['shelf']}-{slot['position']} ({slot['quantity']} uds.)": slot
+                for slot in source_slots
+            }
+            if source_options:
+                selected_source = st.selectbox("Ubicación de Origen", list(source_options.keys()))
+            else:
+                selected_source = None
+                st.info(f"El producto no tiene unidades en {RECEIVING_ZONE}. Unidades de stock sin ubicar: {unlocated}")
+
             # Get all zones for selection
             zones = LocationManager.get_available_zones()
             selected_zone = st.selectbox("Zona", zones)
@@ -187,7 +186,7 @@ def render_asignar_ubicaciones():
             location_options = [f"{loc['zone']}-{loc['aisle']}-{loc['shelf']}-{loc['position']}" for loc in locations]
             selected_location = st.selectbox("Ubicación", location_options)
             
-            quantity = st.number_input("Cantidad", min_value=1, value=1)
+            quantity = st.number_input("Cantidad", min_value=1, value=st.session_state.get('scanned_quantity', 1))
             min_quantity = st.number_input("Cantidad Mínima", min_value=0, value=0)
             max_quantity = st.number_input("Cantidad Máxima", min_value=0, value=0)
             
@@ -199,14 +198,28 @@ def render_asignar_ubicaciones():
                     location_id = next(loc['location_id'] for loc in locations 
                                      if f"{loc['zone']}-{loc['aisle']}-{loc['shelf']}-{loc['position']}" == selected_location)
                     
-                    # Add inventory record
-                    inventory_id = InventoryDB.add_inventory(
-                        product['product_id'],
-                        location_id,
-                        quantity,
-                        min_quantity,
-                        max_quantity
-                    )
+                    if selected_source:
+                        # Move the units from the receiving slot to the destination in one transaction
+                        inventory_id = InventoryDB.transfer_inventory(
+                            product['product_id'],
+                            source_options[selected_source]['location_id'],
+                            location_id,
+                            quantity,
+                            min_quantity,
+                            max_quantity,
+                            reason='putaway'
+                        )
+                    elif quantity <= unlocated:
+                        inventory_id = InventoryDB.add_inventory(
+                            product['product_id'],
+                            location_id,
+                            quantity,
+                            min_quantity,
+                            max_quantity,
+                            reason='putaway'
+                        )
+                    else:
+                        raise ValueError(f"Solo hay {unlocated} unidades de stock sin ubicar")
                     
                     if inventory_id:
                         st.success(f"Producto asignado exitosamente a la ubicación {selected_location}")
@@ -219,7 +232,9 @@ def render_asignar_ubicaciones():
                             details=f"Producto {product['name']} (SKU: {product['sku']}) asignado a {selected_location}"
                         )
                         
-                        # Clear the scanned product
+                        # Clear the scanned product and its units from the scan session
+                        scan_buffer.remove(st.session_state.pop('scanned_codes', []))
+                        st.session_state.pop('scanned_quantity', None)
                         st.session_state.scanned_product = None
                         st.rerun()
                     else:
@@ -236,9 +251,34 @@ def render_asignar_ubicaciones():
                     )
         
         if st.button("Cancelar"):
+            st.session_state.pop('scanned_codes', None)
+            st.session_state.pop('scanned_quantity', None)
             st.session_state.scanned_product = None
             st.rerun()
 
+    # Resolve new codes in batches and redraw the session only when it changed.
+    # Streamlit has no partial reruns here, so this loop keeps the script alive
+    # while the camera plays. Streamlit only acts on rerun/stop requests when the
+    # script sends an element, so the status line is rewritten on every pass;
+    # otherwise an idle camera would keep the page from reacting to interactions.
+    status_placeholder = st.empty()
+    shown_version = None
+    while webrtc_ctx.state.playing:
+        resolved = scan_buffer.resolve()
+        found = [product for product in resolved.values() if product]
+        if found:
+            ProcessHistoryDB.log_process(
+                operation_type="Asignación de Ubicaciones",
+                sub_operation="Escaneo con Cámara",
+                status="Completado",
+                details="Productos escaneados: " + ", ".join(f"{p['name']} (SKU: {p['sku']})" for p in found)
+            )
+        if scan_buffer.version() != shown_version:
+            shown_version = scan_buffer.version()
+            _render_scan_session(session_placeholder, scan_buffer)
+        status_placeholder.caption(f"Cámara activa · {scan_buffer.metrics()['scans']} unidades escaneadas")
+        time.sleep(SESSION_REFRESH_SECONDS)
+
 # This code runs when the file is accessed directly as a Streamlit page
 if __name__ == "__main__":
     render_asignar_ubicaciones()
\ No newline at end of file
@@ -0,0 +1,90 @@
+import streamlit as st
+import pandas as pd
+from database.db_utils import ProcessHistoryDB
+from scanning.batch import get_import_dir, iter_image_files, resolve_import_folder, scan_images
+
+def render_escaneo_lote():
+    st.title("🗂️ Escaneo de Etiquetas por Lote")
+    st.write("Decodifica los códigos de barras y QR de fotos de albaranes y etiquetas de palé, y los asocia a productos.")
+
+    # Server folders are only offered inside the configured import directory
+    import_dir = get_import_dir()
+    sources = ["Subir imágenes"] + (["Carpeta del servidor"] if import_dir else [])
+    source = st.radio("Origen de las imágenes", sources, horizontal=True)
+    items = []
+    if source == "Subir imágenes":
+        uploaded_files = st.file_uploader(
+            "Imágenes",
+            type=["png", "jpg", "jpeg", "bmp", "tif", "tiff", "webp"],
+            accept_multiple_files=True
+        )
+        items = [(uploaded.name, uploaded.getvalue()) for uploaded in uploaded_files or []]
+    else:
+        folder = st.text_input(f"Carpeta (relativa a {import_dir})")
+        if folder.strip():
+            try:
+                items = iter_image_files(resolve_import_folder(folder, import_dir))
+                st.caption(f"{len(items)} imágenes encontradas")
+            except ValueError as e:
+                st.warning(str(e))
+
+    if st.button("Procesar Imágenes", disabled=not items):
+        with st.spinner(f"Decodificando {len(items)} imágenes..."):
+            rows = scan_images(items)
+        st.session_state.batch_scan_rows = rows
+
+        codes = [row for row in rows if row['data']]
+        matched = [row for row in codes if row['product_id']]
+        ProcessHistoryDB.log_process(
+            operation_type="Recepción",
+            sub_operation="Escaneo de Etiquetas por Lote",
+            status="Completado",
+            details=f"{len(items)} imágenes, {len(codes)} códigos leídos, {len(matched)} asociados a productos"
+        )
+
+    rows = st.session_state.get('batch_scan_rows')
+    if not rows:
+        return
+
+    results = pd.DataFrame([
+        {
+            "Imagen": row['file'],
+            "Código": row['data'] or "",
+            "Tipo": row['symbology'] or "",
+            "SKU": row['sku'] or "",
+            "Producto": row['product_name'] or ("No encontrado" if row['data'] else ""),
+            "Stock": row['stock'],
+            "Error": row['error'] or ""
+        }
+        for row in rows
+    ])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Imágenes", results["Imagen"].nunique())
+    with col2:
+        st.metric("Códigos Leídos", int((results["Código"] != "").sum()))
+    with col3:
+        st.metric("Asociados a Productos", int((results["SKU"] != "").sum()))
+
+    # Units per product across the whole batch
+    matched = results[results["SKU"] != ""]
+    if not matched.empty:
+        st.subheader("Resumen por Producto")
+        st.dataframe(
+            matched.groupby(["SKU", "Producto"]).size().reset_index(name="Etiquetas"),
+            use_container_width=True,
+            hide_index=True
+        )
+
+    st.subheader("Detalle")
+    st.dataframe(results, use_container_width=True, hide_index=True)
+    st.download_button(
+        "Descargar CSV",
+        data=results.to_csv(index=False).encode('utf-8'),
+        file_name="escaneo_lote.csv",
+        mime="text/csv"
+    )
+
+if __name__ == "__main__":
+    render_escaneo_lote()
@@ -0,0 +1,107 @@
+import streamlit as st
+import pandas as pd
+from database.db_utils import ProcessHistoryDB
+from database.reconciliation import StockReconciler, DiscrepancyDB
+
+STATUS_LABELS = {
+    'open': 'Abierta',
+    'ignored': 'Ignorada',
+    'resolved': 'Resuelta'
+}
+
+def render_gestion_discrepancias():
+    st.title("⚖️ Gestión de Discrepancias")
+    st.write("Compara el stock de cada producto con el inventario registrado en sus ubicaciones.")
+
+    # Reconciliation runs
+    last_run = StockReconciler.last_run()
+    if last_run:
+        st.caption(
+            f"Última conciliación ({'completa' if last_run['mode'] == 'full' else 'incremental'}): "
+            f"{last_run['finished_at']} - {last_run['products_checked']} productos revisados"
+        )
+    else:
+        st.caption("Aún no se ha ejecutado ninguna conciliación.")
+
+    col1, col2 = st.columns(2)
+    with col1:
+        run_incremental = st.button("Conciliar Cambios Recientes")
+    with col2:
+        run_full = st.button("Conciliación Completa")
+
+    if run_incremental or run_full:
+        with st.spinner("Conciliando stock..."):
+            run = StockReconciler().run(incremental=run_incremental)
+        ProcessHistoryDB.log_process(
+            operation_type="Inventario",
+            sub_operation="Conciliación de Stock",
+            status="Completado",
+            details=f"Conciliación {run['mode']}: {run['products_checked']} productos revisados, {run['discrepancies']} discrepancias abiertas"
+        )
+        st.success(f"{run['products_checked']} productos revisados, {run['discrepancies']} discrepancias abiertas")
+
+    # Discrepancy report
+    status = st.selectbox(
+        "Estado",
+        options=list(STATUS_LABELS.keys()),
+        format_func=lambda s: STATUS_LABELS[s],
+        key="discrepancy_status"
+    )
+    discrepancies = DiscrepancyDB.get_discrepancies(status)
+    if not discrepancies:
+        st.success("✅ No hay discrepancias con este estado")
+        return
+
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "SKU": d['sku'],
+                "Producto": d['product_name'],
+                "Stock": d['product_stock'],
+                "Inventario en Ubicaciones": d['inventory_quantity'],
+                "Diferencia": d['difference'],
+                "Detectada": d['detected_at'],
+                "Notas": d['notes'] or ""
+            }
+            for d in discrepancies
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    if status == 'resolved':
+        return
+
+    # Actions on a single discrepancy
+    options = {f"{d['sku']} - {d['product_name']} ({d['difference']:+d})": d for d in discrepancies}
+    with st.form("discrepancy_action_form"):
+        selected = st.selectbox("Discrepancia", options=list(options.keys()))
+        notes = st.text_input("Notas")
+        col1, col2 = st.columns(2)
+        with col1:
+            adjust = st.form_submit_button("Ajustar Stock al Inventario")
+        with col2:
+            ignore = st.form_submit_button("Ignorar")
+
+    if adjust or ignore:
+        discrepancy = options[selected]
+        try:
+            if adjust:
+                change = DiscrepancyDB.adjust_stock_to_inventory(discrepancy['product_id'], notes or None)
+                details = f"Stock de {discrepancy['sku']} ajustado en {change:+d} unidades"
+            else:
+                DiscrepancyDB.set_status(discrepancy['product_id'], 'ignored', notes or None)
+                details = f"Discrepancia de {discrepancy['sku']} ignorada"
+            ProcessHistoryDB.log_process(
+                operation_type="Inventario",
+                sub_operation="Gestión de Discrepancias",
+                status="Completado",
+                details=details
+            )
+            st.success(details)
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error al procesar la discrepancia: {str(e)}")
+
+if __name__ == "__main__":
+    render_gestion_discrepancias()
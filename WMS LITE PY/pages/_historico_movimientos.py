@@ -0,0 +1,114 @@
+import streamlit as st
+import pandas as pd
+from database.db_utils import ProductDB, StockMovementDB
+
+MOVEMENTS_PAGE_SIZE = 50
+
+REASON_LABELS = {
+    'opening': 'Saldo Inicial',
+    'product_created': 'Alta de Producto',
+    'reception': 'Recepción',
+    'putaway': 'Asignación de Ubicación',
+    'transfer': 'Transferencia',
+    'merge': 'Consolidación',
+    'reconciliation': 'Conciliación',
+    'adjustment': 'Ajuste'
+}
+
+LEDGER_LABELS = {
+    'Todos': None,
+    'Stock de Producto': 'stock',
+    'Inventario por Ubicación': 'inventory'
+}
+
+def render_historico_movimientos():
+    st.title("📈 Histórico de Movimientos")
+
+    # Movement filters
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        sku = st.text_input("SKU", key="movements_sku")
+    with col2:
+        ledger_label = st.selectbox("Registro", options=list(LEDGER_LABELS.keys()), key="movements_ledger")
+    with col3:
+        reason_options = ["Todos"] + list(REASON_LABELS.keys())
+        reason = st.selectbox(
+            "Motivo",
+            options=reason_options,
+            format_func=lambda r: REASON_LABELS.get(r, r),
+            key="movements_reason"
+        )
+    with col4:
+        dates = st.date_input("Rango de Fechas", value=(), key="movements_dates")
+
+    product = None
+    if sku.strip():
+        product = ProductDB.get_product_by_sku(sku.strip())
+        if not product:
+            st.warning(f"No se encontró ningún producto con el SKU {sku.strip()}")
+            return
+
+    filters = {
+        "product_id": product['product_id'] if product else None,
+        "ledger": LEDGER_LABELS[ledger_label],
+        "reason": None if reason == "Todos" else reason,
+        "date_from": dates[0] if len(dates) > 0 else None,
+        "date_to": dates[1] if len(dates) > 1 else None
+    }
+
+    # Point-in-time balance of the selected product
+    if product:
+        col1, col2 = st.columns(2)
+        with col1:
+            at_date = st.date_input("Stock al día", value=None, key="movements_at_date")
+        stock = StockMovementDB.get_on_hand(product['product_id'], at=at_date, ledger='stock')
+        on_hand = StockMovementDB.get_on_hand(product['product_id'], at=at_date)
+        with col2:
+            st.metric("Stock de Producto", stock)
+            st.metric("Inventario en Ubicaciones", on_hand)
+
+    # Reload the first page whenever the filters change
+    if st.session_state.get('movements_loaded_filters') != filters:
+        movements, cursor = StockMovementDB.get_movements_page(MOVEMENTS_PAGE_SIZE, **filters)
+        st.session_state.movements_loaded_filters = filters
+        st.session_state.movements_records = movements
+        st.session_state.movements_cursor = cursor
+
+    movements = st.session_state.movements_records
+    if not movements:
+        st.info("No hay movimientos registrados para los filtros seleccionados.")
+        return
+
+    st.dataframe(
+        pd.DataFrame([
+            {
+                "Fecha": m['created_at'],
+                "SKU": m['sku'],
+                "Producto": m['product_name'],
+                "Ubicación": f"{m['zone']}-{m['aisle']}-{m['shelf']}-{m['position']}" if m['location_id'] else "Stock de Producto",
+                "Cantidad": m['delta'],
+                "Motivo": REASON_LABELS.get(m['reason'], m['reason']),
+                "Orden": m['order_number'] or ""
+            }
+            for m in movements
+        ]),
+        use_container_width=True,
+        hide_index=True
+    )
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"Mostrando {len(movements)} movimientos")
+    with col2:
+        if st.session_state.movements_cursor is not None and st.button("Cargar más", key="movements_more"):
+            more, cursor = StockMovementDB.get_movements_page(
+                MOVEMENTS_PAGE_SIZE,
+                before_id=st.session_state.movements_cursor,
+                **filters
+            )
+            st.session_state.movements_records = movements + more
+            st.session_state.movements_cursor = cursor
+            st.rerun()
+
+if __name__ == "__main__":
+    render_historico_movimientos()
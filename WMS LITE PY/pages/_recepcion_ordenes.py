@@ -1,6 +1,7 @@
 import streamlit as st
 import pandas as pd
-from database.db_utils import ProductDB, LocationDB, OrderDB, get_db_connection, ProcessHistoryDB
+from database.db_utils import ProductDB, LocationDB, OrderDB, get_db_read_connection, ProcessHistoryDB
+from database.reception_service import finalize_reception
 from database.location_manager import LocationManager
 from datetime import datetime
 
@@ -35,7 +36,7 @@ def render_recepcion_ordenes():
     
     if submit_header and po_number:
         # Check if order number already exists using context manager
-        with get_db_connection() as conn:
+        with get_db_read_connection() as conn:
             existing_order = conn.execute('SELECT order_id FROM orders WHERE order_number = ?', (po_number,)).fetchone()
         
         if existing_order:
@@ -164,38 +165,11 @@ def render_recepcion_ordenes():
             
             if st.button("Finalizar Recepción"):
                 try:
-                    with get_db_connection() as conn:
-                        # Get existing order ID if overwriting
-                        existing_order = conn.execute('SELECT order_id FROM orders WHERE order_number = ?', 
-                                                     (st.session_state.current_po_number,)).fetchone()
-                        
-                        if existing_order:
-                            # Delete existing order items
-                            OrderDB.delete_order(existing_order[0])
-                            order_id = existing_order[0]
-                        else:
-                            # Get order type for inbound orders
-                            order_types = OrderDB.get_all_order_types()
-                            order_type_id = next((ot['type_id'] for ot in order_types if ot['code'] == 'INBOUND'), None)
-                            if not order_type_id:
-                                raise ValueError("Order type 'INBOUND' not found")
-                            
-                            order_id = OrderDB.create_order(
-                                order_number=st.session_state.current_po_number,
-                                type_id=order_type_id,
-                                status="completed"
-                            )
-                        
-                        # Add items to order and update inventory
-                        for item in st.session_state.purchase_order_items:
-                            product = next(p for p in products if p['sku'] == item['sku'])
-                            OrderDB.add_order_items(order_id, [{
-                                'product_id': product['product_id'],
-                                'quantity': item['quantity']
-                            }])
-                            
-                            # Update product stock
-                            ProductDB.update_stock(product['product_id'], item['quantity'])
+                    # Order, items, stock and reception inventory are committed together
+                    finalize_reception(
+                        st.session_state.current_po_number,
+                        st.session_state.purchase_order_items
+                    )
                     
                     # Log the successful completion
                     ProcessHistoryDB.log_process(
@@ -3,10 +3,10 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
-import sqlite3
 import pandas as pd
 from database.location_manager import LocationManager
-from database.db_utils import get_db_connection, LocationDB, ProcessHistoryDB
+from database.db_utils import LocationDB, ProcessHistoryDB
+from database.exporters import EXPORT_FORMATS, export_to_tempfile
 
 # Page configuration
 st.set_page_config(
@@ -29,7 +29,8 @@ operations = {
             "Recepción de Órdenes de Compra",
             "Control de Calidad en Recepción",
             "Etiquetado y Registro",
-            "Asignación de Ubicaciones"
+            "Asignación de Ubicaciones",
+            "Escaneo de Etiquetas por Lote"
         ]
     },
     "Almacenamiento": {
@@ -135,6 +136,15 @@ if selected_operation:
         elif st.session_state.selected_sub_operation == "Asignación de Ubicaciones":
             from pages._asignar_ubicaciones import render_asignar_ubicaciones
             render_asignar_ubicaciones()
+        elif st.session_state.selected_sub_operation == "Escaneo de Etiquetas por Lote":
+            from pages._escaneo_lote import render_escaneo_lote
+            render_escaneo_lote()
+        elif st.session_state.selected_sub_operation == "Gestión de Discrepancias":
+            from pages._gestion_discrepancias import render_gestion_discrepancias
+            render_gestion_discrepancias()
+        elif st.session_state.selected_sub_operation == "Histórico de Movimientos":
+            from pages._historico_movimientos import render_historico_movimientos
+            render_historico_movimientos()
         else:
             st.info(f"Implementación del proceso '{st.session_state.selected_sub_operation}' en desarrollo.")
         
@@ -152,8 +162,60 @@ st.markdown("---")
 # Process History Table
 st.subheader("📋 Historial de Procesos")
 
-# Get process history from database
-process_history = ProcessHistoryDB.get_process_history()
+HISTORY_PAGE_SIZE = 50
+HISTORY_MAX_RECORDS = 1000
+HISTORY_STATUSES = ["Completado", "En Proceso", "Error", "Cancelado", "Con Errores"]
+EXPORT_DOWNLOAD_MAX_BYTES = int(os.getenv('WMS_EXPORT_DOWNLOAD_MAX_MB', 50)) * 1024 * 1024
+history_operation_types = sorted(set(operations.keys()) | {"Asignación de Ubicaciones", "Importación"})
+
+# History filters
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    history_operation = st.selectbox("Operación", options=["Todas"] + history_operation_types, key="history_operation")
+with col2:
+    history_status = st.selectbox("Estado", options=["Todos"] + HISTORY_STATUSES, key="history_status")
+with col3:
+    history_user = st.text_input("Usuario", key="history_user")
+with col4:
+    history_dates = st.date_input("Rango de Fechas", value=(), key="history_dates")
+
+history_filters = {
+    "operation_type": None if history_operation == "Todas" else history_operation,
+    "status": None if history_status == "Todos" else history_status,
+    "user_id": history_user.strip() or None,
+    "date_from": history_dates[0] if len(history_dates) > 0 else None,
+    "date_to": history_dates[1] if len(history_dates) > 1 else None
+}
+
+def load_first_history_page():
+    records, next_cursor = ProcessHistoryDB.get_process_history_page(HISTORY_PAGE_SIZE, **history_filters)
+    st.session_state.history_records = records
+    st.session_state.history_cursor = next_cursor
+
+# Reset the loaded pages whenever the filters change; otherwise only fetch records newer than the cached ones
+if st.session_state.get('history_loaded_filters') != history_filters:
+    load_first_history_page()
+    st.session_state.history_loaded_filters = history_filters
+elif st.session_state.history_records:
+    # At most one page of newer records per rerun; if more arrived, start over from the first page
+    newer = ProcessHistoryDB.get_process_history(
+        limit=HISTORY_PAGE_SIZE + 1,
+        after_id=st.session_state.history_records[0]['process_id'],
+        **history_filters
+    )
+    if len(newer) > HISTORY_PAGE_SIZE:
+        load_first_history_page()
+    elif newer:
+        records = newer + st.session_state.history_records
+        # Keep the loaded records bounded; "Cargar más" continues after the last one kept
+        if len(records) > HISTORY_MAX_RECORDS:
+            records = records[:HISTORY_MAX_RECORDS]
+            st.session_state.history_cursor = records[-1]['process_id']
+        st.session_state.history_records = records
+else:
+    load_first_history_page()
+
+process_history = st.session_state.history_records
 
 if process_history:
     # Convert to DataFrame for better display
@@ -173,8 +235,61 @@ if process_history:
         use_container_width=True,
         hide_index=True
     )
+    
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        st.caption(f"Mostrando {len(process_history)} registros")
+    with col2:
+        if st.session_state.history_cursor is not None and st.button("Cargar más"):
+            records, next_cursor = ProcessHistoryDB.get_process_history_page(
+                HISTORY_PAGE_SIZE,
+                before_id=st.session_state.history_cursor,
+                **history_filters
+            )
+            st.session_state.history_records = process_history + records
+            st.session_state.history_cursor = next_cursor
+            st.rerun()
 else:
     st.info("No hay procesos registrados aún.")
 
+# Streaming exports
+with st.expander("📤 Exportar Datos"):
+    export_datasets = {
+        "Historial de Procesos": "process_history",
+        "Niveles de Inventario": "inventory",
+        "Órdenes": "orders",
+        "Movimientos de Stock": "stock_movements"
+    }
+    col1, col2 = st.columns(2)
+    with col1:
+        export_label = st.selectbox("Datos a exportar", options=list(export_datasets.keys()))
+    with col2:
+        export_format = st.selectbox("Formato", options=list(EXPORT_FORMATS.keys()))
+    
+    if st.button("Generar archivo"):
+        dataset = export_datasets[export_label]
+        with st.spinner("Exportando..."):
+            export_path, row_count = export_to_tempfile(dataset, export_format)
+        try:
+            # st.download_button keeps the whole file in server memory (Streamlit 1.29 cannot
+            # stream downloads), so large exports are left to the constant-memory CLI exporter
+            export_size = os.path.getsize(export_path)
+            if export_size > EXPORT_DOWNLOAD_MAX_BYTES:
+                st.warning(
+                    f"La exportación ocupa {export_size / 1024 / 1024:.0f} MB ({row_count} registros) y supera el "
+                    f"límite de descarga desde el navegador ({EXPORT_DOWNLOAD_MAX_BYTES / 1024 / 1024:.0f} MB). "
+                    f"Use en el servidor: python export_data.py {dataset} {dataset}.{export_format} --format {export_format}"
+                )
+            else:
+                with open(export_path, 'rb') as export_file:
+                    st.download_button(
+                        f"Descargar {row_count} registros",
+                        data=export_file,
+                        file_name=f"{dataset}.{export_format}",
+                        mime=EXPORT_FORMATS[export_format]
+                    )
+        finally:
+            os.remove(export_path)
+
 # WMS Footer
 st.markdown("<div style='text-align: center'>WMS Lite - Sistema de Gestión de Almacenes</div>", unsafe_allow_html=True)
\ No newline at end of file
@@ -0,0 +1,26 @@
+import argparse
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from database.reconciliation import StockReconciler, DiscrepancyDB
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare products.stock with the inventory held in locations and record discrepancies")
+    parser.add_argument('--full', action='store_true', help="Check every product instead of those moved since the last run")
+    parser.add_argument('--chunk-size', type=int, default=500, help="Products compared per query")
+    parser.add_argument('--list', action='store_true', help="Print the open discrepancies after the run")
+    args = parser.parse_args()
+
+    load_dotenv()
+    init_database()
+
+    run = StockReconciler(chunk_size=args.chunk_size).run(incremental=not args.full)
+    print(f"{run['mode'].capitalize()} run: checked {run['products_checked']} products, {run['discrepancies']} open discrepancies")
+    if args.list:
+        for discrepancy in DiscrepancyDB.get_discrepancies('open'):
+            print(f"{discrepancy['sku']}: stock {discrepancy['product_stock']}, "
+                  f"inventory {discrepancy['inventory_quantity']} ({discrepancy['difference']:+d})")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
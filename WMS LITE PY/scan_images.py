@@ -0,0 +1,46 @@
+import argparse
+import csv
+import os
+import sys
+from dotenv import load_dotenv
+from database.db_utils import init_database
+from scanning.batch import iter_image_files, scan_images
+
+FIELDS = ['file', 'data', 'symbology', 'product_id', 'sku', 'product_name', 'stock', 'error']
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the barcodes and QR codes of many images and match them to products")
+    parser.add_argument('paths', nargs='+', help="Image files or folders of images")
+    parser.add_argument('--workers', type=int, help="Decode processes (default: one per CPU)")
+    parser.add_argument('--output', help="Write the results to this CSV file instead of stdout")
+    args = parser.parse_args()
+
+    items = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            items.extend(iter_image_files(path))
+        else:
+            items.append((os.path.basename(path), path))
+    if not items:
+        parser.error("No images found")
+
+    load_dotenv()
+    init_database()
+
+    rows = scan_images(items, args.workers)
+    output = open(args.output, 'w', newline='', encoding='utf-8') if args.output else sys.stdout
+    try:
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+    finally:
+        if args.output:
+            output.close()
+
+    codes = [row for row in rows if row['data']]
+    matched = [row for row in codes if row['product_id']]
+    print(f"{len(items)} images, {len(codes)} codes read, {len(matched)} matched to products", file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
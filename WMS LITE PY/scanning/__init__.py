@@ -0,0 +1,22 @@
+from .decoder import (
+    Detection,
+    preprocess,
+    decode_image,
+    decode_frame,
+    draw_detections
+)
+from .pipeline import DetectionPipeline, localize_regions
+from .session import ScanSessionBuffer
+from .worker import DecodeWorkerPool
+
+__all__ = [
+    'Detection',
+    'preprocess',
+    'decode_image',
+    'decode_frame',
+    'draw_detections',
+    'DetectionPipeline',
+    'localize_regions',
+    'ScanSessionBuffer',
+    'DecodeWorkerPool'
+]
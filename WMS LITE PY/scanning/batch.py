@@ -0,0 +1,122 @@
+"""Batch decoding of photos and scanned labels.
+
+Each image is decoded in a worker process (decode_batch) and the distinct
+codes of the whole batch are resolved against the products table with one
+query per chunk (scan_images). Photos are decoded thoroughly rather than fast:
+the grayscale image and two thresholded variants are all decoded and their
+results merged, since a delivery note or pallet label often carries several
+codes of different quality.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Union
+import cv2
+import numpy as np
+from .decoder import Detection, decode_image, preprocess
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff', '.webp')
+
+class ImageResult(NamedTuple):
+    name: str
+    detections: List[Detection]
+    error: Optional[str]
+
+def decode_all(img: np.ndarray) -> List[Detection]:
+    """Every code found in the grayscale, adaptive-threshold or Otsu version of an image"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    _, otsu = cv2.threshold(cv2.GaussianBlur(gray, (5, 5), 0), 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    detections = {}
+    for variant in (gray, preprocess(gray), otsu):
+        for detection in decode_image(variant):
+            detections.setdefault((detection.data, detection.symbology), detection)
+    return list(detections.values())
+
+def _decode_source(item: Tuple[str, Union[str, bytes]]) -> ImageResult:
+    """Worker entry point: decode an image given as a file path or encoded bytes"""
+    name, source = item
+    try:
+        if isinstance(source, (bytes, bytearray)):
+            img = cv2.imdecode(np.frombuffer(source, np.uint8), cv2.IMREAD_COLOR)
+        else:
+            img = cv2.imread(source, cv2.IMREAD_COLOR)
+        if img is None:
+            return ImageResult(name, [], "Formato de imagen no reconocido")
+        return ImageResult(name, decode_all(img), None)
+    except Exception as e:
+        return ImageResult(name, [], str(e))
+
+def iter_image_files(folder: str) -> List[Tuple[str, str]]:
+    """(file name, path) of the images in a folder, sorted by name"""
+    return [
+        (name, os.path.join(folder, name))
+        for name in sorted(os.listdir(folder))
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    ]
+
+def get_import_dir() -> Optional[str]:
+    """WMS_SCAN_IMPORT_DIR: the only server folder tree the batch scan page may read (None disables it)"""
+    return os.getenv('WMS_SCAN_IMPORT_DIR') or None
+
+def resolve_import_folder(relative_path: str, base_dir: str) -> str:
+    """Resolve a folder given relative to `base_dir`, refusing anything outside it.
+
+    Symlinks and '..' are resolved before the containment check.
+    """
+    base = os.path.realpath(base_dir)
+    folder = os.path.realpath(os.path.join(base, relative_path.strip().lstrip('/\\')))
+    if os.path.commonpath([base, folder]) != base:
+        raise ValueError("La carpeta debe estar dentro del directorio de importación")
+    if not os.path.isdir(folder):
+        raise ValueError("La carpeta no existe")
+    return folder
+
+def decode_batch(items: Iterable[Tuple[str, Union[str, bytes]]], workers: Optional[int] = None) -> List[ImageResult]:
+    """Decode (name, path or bytes) items in a process pool, returning results in input order.
+
+    Decoding is CPU bound and large photos take long enough that separate
+    processes pay off; a single image is decoded in-process. Workers are
+    spawned, not forked: the Streamlit server runs the database writer, audit
+    logger and archiver threads, and a fork could copy their locks held.
+    """
+    items = list(items)
+    if len(items) <= 1 or workers == 1:
+        return [_decode_source(item) for item in items]
+    workers = workers or min(len(items), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return list(executor.map(_decode_source, items, chunksize=max(1, len(items) // (workers * 4))))
+
+def scan_images(items: Iterable[Tuple[str, Union[str, bytes]]], workers: Optional[int] = None) -> List[dict]:
+    """Decode a batch of images and match every code against the products table.
+
+    Returns one row per (image, code) with the matched product, if any, and one
+    row per image that failed to decode or contained no code.
+    """
+    from database.db_utils import ProductDB
+
+    results = decode_batch(items, workers)
+    products = ProductDB.get_products_by_codes(
+        detection.data for result in results for detection in result.detections
+    )
+    rows = []
+    for result in results:
+        if result.error or not result.detections:
+            rows.append({
+                'file': result.name, 'data': None, 'symbology': None, 'product_id': None,
+                'sku': None, 'product_name': None, 'stock': None,
+                'error': result.error or "Sin códigos"
+            })
+            continue
+        for detection in result.detections:
+            product = products.get(detection.data)
+            rows.append({
+                'file': result.name,
+                'data': detection.data,
+                'symbology': detection.symbology,
+                'product_id': product['product_id'] if product else None,
+                'sku': product['sku'] if product else None,
+                'product_name': product['name'] if product else None,
+                'stock': product['stock'] if product else None,
+                'error': None
+            })
+    return rows
@@ -0,0 +1,272 @@
+"""Headless benchmark for the barcode decode path.
+
+Frames come from two sources:
+
+- synthetic_cases() renders EAN-13 barcodes (drawn with numpy) and QR codes
+  (cv2.QRCodeEncoder) at varying sizes, then applies blur, rotation, noise
+  and lighting changes with a seeded random generator, so runs are repeatable.
+- recorded_cases() replays image or video files captured from a real camera.
+  An optional labels.csv next to them (``filename,expected``) gives the code
+  each file should decode to; an empty expected value marks a frame without
+  a code.
+
+run_benchmark() feeds every frame through a decode function (decode_frame,
+a DetectionPipeline, or anything with the same signature) and reports the
+decode rate, false reads and per-frame latency percentiles, overall and per
+group. Use benchmark_scanning.py to run it from the command line.
+"""
+import csv
+import os
+import random
+import time
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional
+import cv2
+import numpy as np
+from .decoder import Detection, decode_frame
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp')
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv')
+
+class BenchmarkCase(NamedTuple):
+    name: str
+    group: str
+    frame: np.ndarray
+    expected: Optional[str]  # None: unlabeled, '': no code in the frame
+
+# EAN-13 module patterns (1 = bar) and the parity of the left half by first digit
+_EAN_L = ['0001101', '0011001', '0010011', '0111101', '0100011',
+          '0110001', '0101111', '0111011', '0110111', '0001011']
+_EAN_R = [''.join('1' if bit == '0' else '0' for bit in pattern) for pattern in _EAN_L]
+_EAN_G = [pattern[::-1] for pattern in _EAN_R]
+_EAN_PARITY = ['LLLLLL', 'LLGLGG', 'LLGGLG', 'LLGGGL', 'LGLLGG',
+               'LGGLLG', 'LGGGLL', 'LGLGLG', 'LGLGGL', 'LGGLGL']
+
+def ean13_check_digit(digits: str) -> str:
+    """Check digit for the first 12 digits of an EAN-13 code"""
+    total = sum(int(digit) * (3 if index % 2 else 1) for index, digit in enumerate(digits[:12]))
+    return str((10 - total % 10) % 10)
+
+def ean13_modules(code: str) -> str:
+    """The 95 modules of an EAN-13 symbol as a '0'/'1' string (12 or 13 digits)"""
+    if len(code) == 12:
+        code += ean13_check_digit(code)
+    if len(code) != 13 or not code.isdigit() or code[12] != ean13_check_digit(code):
+        raise ValueError(f"Invalid EAN-13 code: {code}")
+    left = ''.join(
+        (_EAN_L if parity == 'L' else _EAN_G)[int(digit)]
+        for digit, parity in zip(code[1:7], _EAN_PARITY[int(code[0])])
+    )
+    right = ''.join(_EAN_R[int(digit)] for digit in code[7:])
+    return '101' + left + '01010' + right + '101'
+
+def render_ean13(code: str, module_px: int = 3, height: int = 120, quiet_modules: int = 11) -> np.ndarray:
+    """Grayscale image of an EAN-13 barcode on a white background"""
+    modules = np.array([int(bit) for bit in ean13_modules(code)], np.uint8)
+    modules = np.pad(modules, quiet_modules)
+    row = np.repeat(np.where(modules == 1, 0, 255).astype(np.uint8), module_px)
+    image = np.tile(row, (height, 1))
+    margin = np.full((quiet_modules * module_px, image.shape[1]), 255, np.uint8)
+    return np.vstack([margin, image, margin])
+
+def render_qr(data: str, size: int = 200) -> np.ndarray:
+    """Grayscale image of a QR code, scaled to about `size` pixels with crisp modules"""
+    encoded = cv2.QRCodeEncoder.create().encode(data)
+    # The encoder returns one pixel per module including the quiet zone
+    module_px = max(1, size // encoded.shape[0])
+    return cv2.resize(encoded, None, fx=module_px, fy=module_px, interpolation=cv2.INTER_NEAREST)
+
+def place(code_img: np.ndarray, frame_size=(720, 1280), rng: Optional[random.Random] = None) -> np.ndarray:
+    """Paste a grayscale code image onto a light BGR frame, at a random spot if `rng` is given"""
+    height, width = frame_size
+    frame = np.full((height, width, 3), 235, np.uint8)
+    code_img = code_img[:height, :width]
+    top_range, left_range = height - code_img.shape[0], width - code_img.shape[1]
+    top = rng.randint(0, top_range) if rng else top_range // 2
+    left = rng.randint(0, left_range) if rng else left_range // 2
+    frame[top:top + code_img.shape[0], left:left + code_img.shape[1]] = code_img[..., None]
+    return frame
+
+def blur(frame: np.ndarray, kernel: int) -> np.ndarray:
+    kernel |= 1
+    return cv2.GaussianBlur(frame, (kernel, kernel), 0) if kernel > 1 else frame
+
+def rotate(frame: np.ndarray, angle: float) -> np.ndarray:
+    height, width = frame.shape[:2]
+    matrix = cv2.getRotationMatrix2D((width / 2, height / 2), angle, 1.0)
+    return cv2.warpAffine(frame, matrix, (width, height), borderValue=(235, 235, 235))
+
+def add_noise(frame: np.ndarray, sigma: float, seed: int = 0) -> np.ndarray:
+    noise = np.random.default_rng(seed).normal(0, sigma, frame.shape)
+    return np.clip(frame.astype(np.float32) + noise, 0, 255).astype(np.uint8)
+
+def adjust_lighting(frame: np.ndarray, gain: float, gradient: float = 0.0) -> np.ndarray:
+    """Scale brightness by `gain`, darkening linearly across the frame by up to `gradient`"""
+    shading = 1.0 - gradient * np.linspace(0, 1, frame.shape[1], dtype=np.float32)
+    shaded = frame.astype(np.float32) * gain * shading[None, :, None]
+    return np.clip(shaded, 0, 255).astype(np.uint8)
+
+def synthetic_cases(count: int = 200, seed: int = 0, frame_size=(720, 1280)) -> Iterator[BenchmarkCase]:
+    """Synthetic EAN-13 and QR frames with random size, position and distortions.
+
+    Every tenth frame has no code, to measure false reads.
+    """
+    rng = random.Random(seed)
+    for index in range(count):
+        if index % 10 == 9:
+            frame, group, expected = place(np.full((1, 1), 235, np.uint8), frame_size), 'empty', ''
+        elif index % 2 == 0:
+            expected = ''.join(str(rng.randint(0, 9)) for _ in range(12))
+            expected += ean13_check_digit(expected)
+            code_img = render_ean13(expected, module_px=rng.randint(2, 5), height=rng.randint(60, 160))
+            frame, group = place(code_img, frame_size, rng), 'ean13'
+        else:
+            expected = f"SKU-{rng.randint(0, 999999):06d}"
+            frame, group = place(render_qr(expected, rng.randint(90, 300)), frame_size, rng), 'qr'
+
+        distortions = []
+        kernel = rng.choice([0, 0, 3, 5, 7])
+        if kernel:
+            frame = blur(frame, kernel)
+            distortions.append(f"blur{kernel}")
+        angle = rng.choice([0, 0, rng.uniform(-15, 15), rng.uniform(-45, 45)])
+        if angle:
+            frame = rotate(frame, angle)
+            distortions.append(f"rot{angle:+.0f}")
+        sigma = rng.choice([0, 0, 8, 20])
+        if sigma:
+            frame = add_noise(frame, sigma, seed + index)
+            distortions.append(f"noise{sigma}")
+        gain = rng.choice([1.0, 1.0, 0.5, 1.3])
+        gradient = rng.choice([0.0, 0.0, 0.4])
+        if gain != 1.0 or gradient:
+            frame = adjust_lighting(frame, gain, gradient)
+            distortions.append(f"light{gain:g}/{gradient:g}")
+
+        yield BenchmarkCase(
+            name=f"{group}-{index:04d}" + (f" ({', '.join(distortions)})" if distortions else ''),
+            group=group,
+            frame=frame,
+            expected=expected
+        )
+
+def _read_labels(directory: str) -> Dict[str, str]:
+    path = os.path.join(directory, 'labels.csv')
+    if not os.path.exists(path):
+        return {}
+    with open(path, newline='', encoding='utf-8') as labels_file:
+        return {row['filename']: row.get('expected') or '' for row in csv.DictReader(labels_file)}
+
+def recorded_cases(path: str) -> Iterator[BenchmarkCase]:
+    """Replay an image, a video, or every image/video in a directory"""
+    if os.path.isdir(path):
+        labels = _read_labels(path)
+        files = sorted(
+            os.path.join(path, name) for name in os.listdir(path)
+            if name.lower().endswith(IMAGE_EXTENSIONS + VIDEO_EXTENSIONS)
+        )
+    else:
+        labels = _read_labels(os.path.dirname(path) or '.')
+        files = [path]
+
+    for file_path in files:
+        name = os.path.basename(file_path)
+        expected = labels.get(name)
+        if name.lower().endswith(VIDEO_EXTENSIONS):
+            capture = cv2.VideoCapture(file_path)
+            try:
+                index = 0
+                while True:
+                    ok, frame = capture.read()
+                    if not ok:
+                        break
+                    yield BenchmarkCase(f"{name}#{index}", 'recorded', frame, expected)
+                    index += 1
+            finally:
+                capture.release()
+        else:
+            frame = cv2.imread(file_path, cv2.IMREAD_COLOR)
+            if frame is None:
+                raise ValueError(f"Could not read image {file_path}")
+            yield BenchmarkCase(name, 'recorded', frame, expected)
+
+def decode_qr_opencv(img: np.ndarray) -> List[Detection]:
+    """The cv2.QRCodeDetector decode used by the camera demo, returning Detection tuples"""
+    data, points, _ = cv2.QRCodeDetector().detectAndDecode(img)
+    if not data:
+        return []
+    polygon = tuple((int(x), int(y)) for x, y in points.reshape(-1, 2))
+    x, y, w, h = cv2.boundingRect(np.array(polygon, np.int32))
+    return [Detection(data, 'QRCODE', polygon, (x, y, w, h))]
+
+def _new_stats() -> dict:
+    return {'frames': 0, 'with_code': 0, 'correct': 0, 'false_reads': 0, 'latencies_ms': []}
+
+def _summarize(stats: dict) -> dict:
+    latencies = np.array(stats.pop('latencies_ms') or [0.0])
+    with_code = stats['with_code']
+    stats['decode_rate'] = stats['correct'] / with_code if with_code else None
+    stats['latency_ms'] = {
+        'mean': float(latencies.mean()),
+        'p50': float(np.percentile(latencies, 50)),
+        'p90': float(np.percentile(latencies, 90)),
+        'p99': float(np.percentile(latencies, 99)),
+        'max': float(latencies.max())
+    }
+    return stats
+
+def run_benchmark(cases: Iterable[BenchmarkCase], decode_fn: Callable = decode_frame,
+                  warmup: int = 3, failures_limit: int = 20) -> dict:
+    """Decode every case and collect decode rate, false reads and latency.
+
+    A labeled frame is correct when one of its detections matches the expected
+    code; every detection with other data is a false read. Unlabeled frames
+    only count towards latency. The first `warmup` frames are decoded once
+    beforehand so library initialization does not skew the latencies.
+    """
+    cases = list(cases)
+    for case in cases[:warmup]:
+        decode_fn(case.frame)
+
+    totals, groups, failures = _new_stats(), {}, []
+    for case in cases:
+        started = time.perf_counter()
+        detections = decode_fn(case.frame)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        for stats in (totals, groups.setdefault(case.group, _new_stats())):
+            stats['frames'] += 1
+            stats['latencies_ms'].append(elapsed_ms)
+            if case.expected is None:
+                continue
+            found = {detection.data for detection in detections}
+            stats['with_code'] += bool(case.expected)
+            stats['correct'] += case.expected in found
+            stats['false_reads'] += len(found - {case.expected})
+
+        if case.expected is not None and len(failures) < failures_limit:
+            found = [detection.data for detection in detections]
+            missed = case.expected and case.expected not in found
+            if missed or any(data != case.expected for data in found):
+                failures.append({'case': case.name, 'expected': case.expected, 'found': found})
+
+    result = _summarize(totals)
+    result['groups'] = {group: _summarize(stats) for group, stats in sorted(groups.items())}
+    result['failures'] = failures
+    return result
+
+def format_report(result: dict) -> str:
+    def _line(label, stats):
+        rate = f"{stats['decode_rate']:.1%}" if stats['decode_rate'] is not None else 'n/a'
+        latency = stats['latency_ms']
+        return (f"{label:<10} {stats['frames']:>6} {rate:>8} {stats['false_reads']:>6} "
+                f"{latency['p50']:>8.1f} {latency['p90']:>8.1f} {latency['p99']:>8.1f} {latency['max']:>8.1f}")
+
+    lines = [f"{'group':<10} {'frames':>6} {'decoded':>8} {'false':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    lines.extend(_line(group, stats) for group, stats in result['groups'].items())
+    lines.append(_line('total', result))
+    if result['failures']:
+        lines.append('')
+        lines.append('First failures:')
+        lines.extend(f"  {f['case']}: expected {f['expected'] or '(no code)'}, found {f['found'] or 'nothing'}"
+                     for f in result['failures'])
+    return '\n'.join(lines)
@@ -0,0 +1,60 @@
+"""Barcode preprocessing, decoding and overlay drawing shared by the scan paths.
+
+Everything here is a pure function of the frame, so it can run on the video
+callback thread, in the decode worker pool or offline.
+"""
+from typing import List, NamedTuple, Tuple
+import cv2
+import numpy as np
+from pyzbar.pyzbar import decode
+
+class Detection(NamedTuple):
+    data: str
+    symbology: str
+    polygon: Tuple[Tuple[int, int], ...]
+    rect: Tuple[int, int, int, int]  # left, top, width, height
+
+def preprocess(img: np.ndarray) -> np.ndarray:
+    """Grayscale, blur and adaptive threshold a BGR (or already gray) frame"""
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY) if img.ndim == 3 else img
+    gray = cv2.GaussianBlur(gray, (5, 5), 0)
+    return cv2.adaptiveThreshold(
+        gray, 255,
+        cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+        cv2.THRESH_BINARY,
+        11, 2
+    )
+
+def decode_image(gray: np.ndarray) -> List[Detection]:
+    """Decode every barcode/QR code in a single-channel image"""
+    detections = []
+    for barcode in decode(gray):
+        try:
+            data = barcode.data.decode('utf-8')
+        except UnicodeDecodeError:
+            continue
+        detections.append(Detection(
+            data=data,
+            symbology=barcode.type,
+            polygon=tuple((point.x, point.y) for point in barcode.polygon),
+            rect=(barcode.rect.left, barcode.rect.top, barcode.rect.width, barcode.rect.height)
+        ))
+    return detections
+
+def decode_frame(img: np.ndarray) -> List[Detection]:
+    """Preprocess and decode a full BGR frame"""
+    return decode_image(preprocess(img))
+
+def draw_detections(img: np.ndarray, detections: List[Detection]) -> np.ndarray:
+    """Draw the polygon and data of each detection on `img` in place"""
+    for detection in detections:
+        if detection.polygon:
+            pts = np.array(detection.polygon, np.int32).reshape((-1, 1, 2))
+            cv2.polylines(img, [pts], True, (0, 255, 0), 2)
+
+        # Add text with better visibility
+        x, y = detection.rect[0], detection.rect[1]
+        cv2.rectangle(img, (x, y - 30), (x + 200, y), (0, 255, 0), -1)
+        cv2.putText(img, detection.data, (x, y - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 0), 2)
+    return img
@@ -0,0 +1,131 @@
+"""Buffer of the codes scanned during a camera session.
+
+Decode workers call add() for every detection; the page polls the buffer and
+redraws only when version() changed, so scans are neither dropped nor tied to
+Streamlit reruns. A code counts once per presentation: it counts again only
+after it has been out of view for longer than the dedupe window, however many
+frames it was decoded in. Codes are resolved to products in batches through
+ProductDB.get_products_by_codes.
+"""
+import os
+import time
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional
+from .decoder import Detection
+
+def default_dedupe_window() -> float:
+    """WMS_SCAN_DEDUPE_WINDOW seconds, 1.0 by default"""
+    return float(os.getenv('WMS_SCAN_DEDUPE_WINDOW', '1.0'))
+
+class ScanSessionBuffer:
+    def __init__(self, dedupe_window: Optional[float] = None):
+        self.dedupe_window = default_dedupe_window() if dedupe_window is None else dedupe_window
+        self._lock = Lock()
+        self._last_seen: Dict[str, float] = {}
+        self._counts: Dict[str, int] = {}
+        self._products: Dict[str, Optional[dict]] = {}
+        self._version = 0
+        self._scans = 0
+        self._duplicates = 0
+
+    def add(self, code: str, timestamp: Optional[float] = None) -> bool:
+        """Record a decoded code; returns True if it counted as a new scan"""
+        now = time.monotonic() if timestamp is None else timestamp
+        with self._lock:
+            last_seen = self._last_seen.get(code)
+            self._last_seen[code] = now
+            if last_seen is not None and now - last_seen <= self.dedupe_window:
+                self._duplicates += 1
+                return False
+            self._counts[code] = self._counts.get(code, 0) + 1
+            self._scans += 1
+            self._version += 1
+            return True
+
+    def add_detections(self, detections: Iterable[Detection]) -> int:
+        """add() every detection of a frame; returns how many counted"""
+        now = time.monotonic()
+        return sum(self.add(detection.data, now) for detection in detections)
+
+    def pending(self) -> List[str]:
+        """Codes not yet resolved to a product"""
+        with self._lock:
+            return [code for code in self._counts if code not in self._products]
+
+    def resolve(self, lookup: Optional[Callable[[List[str]], Dict[str, dict]]] = None) -> Dict[str, Optional[dict]]:
+        """Resolve every pending code with one batch lookup.
+
+        `lookup` maps a list of codes to {code: product} and defaults to
+        ProductDB.get_products_by_codes. Returns {code: product or None} for the
+        codes resolved by this call.
+        """
+        codes = self.pending()
+        if not codes:
+            return {}
+        if lookup is None:
+            from database.db_utils import ProductDB
+            lookup = ProductDB.get_products_by_codes
+        found = lookup(codes)
+        resolved = {code: found.get(code) for code in codes}
+        with self._lock:
+            # Codes removed while the lookup ran are not brought back
+            self._products.update({code: product for code, product in resolved.items() if code in self._counts})
+            self._version += 1
+        return resolved
+
+    def version(self) -> int:
+        """Incremented on every change; compare to skip redrawing an unchanged buffer"""
+        with self._lock:
+            return self._version
+
+    def items(self) -> List[dict]:
+        """One row per product with the units scanned, then one per unknown or pending code.
+
+        Codes of the same product (its SKU and its code) are added together.
+        """
+        with self._lock:
+            counts = dict(self._counts)
+            products = dict(self._products)
+        rows, by_product = [], {}
+        for code, count in counts.items():
+            product = products.get(code)
+            if product is None:
+                rows.append({
+                    'codes': [code], 'product': None, 'count': count,
+                    'status': 'unknown' if code in products else 'pending'
+                })
+                continue
+            row = by_product.get(product['product_id'])
+            if row is None:
+                row = by_product[product['product_id']] = {
+                    'codes': [], 'product': product, 'count': 0, 'status': 'matched'
+                }
+            row['codes'].append(code)
+            row['count'] += count
+        return list(by_product.values()) + rows
+
+    def remove(self, codes: Iterable[str]) -> None:
+        """Forget codes, e.g. once their units have been put away"""
+        with self._lock:
+            for code in codes:
+                self._counts.pop(code, None)
+                self._products.pop(code, None)
+            self._version += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._last_seen.clear()
+            self._counts.clear()
+            self._products.clear()
+            self._scans = 0
+            self._duplicates = 0
+            self._version += 1
+
+    def metrics(self) -> dict:
+        with self._lock:
+            return {
+                'scans': self._scans,
+                'duplicates': self._duplicates,
+                'codes': len(self._counts),
+                'pending': sum(1 for code in self._counts if code not in self._products)
+            }
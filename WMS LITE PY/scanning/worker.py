@@ -0,0 +1,130 @@
+"""Off-thread decoding for live video.
+
+The video callback hands every frame to DecodeWorkerPool.submit() and draws
+the overlay from latest(); neither call waits for a decode. The pool keeps a
+single pending slot (latest frame wins), so when decoding is slower than the
+camera the frames in between are dropped instead of queueing up. OpenCV and
+the zbar library release the GIL while they work, so worker threads run on
+spare cores.
+"""
+import os
+import time
+from threading import Condition, Thread
+from typing import Callable, List, Optional
+from .decoder import Detection, decode_frame
+
+def default_worker_count() -> int:
+    """WMS_SCAN_WORKERS, or one core less than available (at most 2)"""
+    configured = os.getenv('WMS_SCAN_WORKERS')
+    if configured:
+        return max(1, int(configured))
+    return max(1, min(2, (os.cpu_count() or 2) - 1))
+
+class DecodeWorkerPool:
+    def __init__(self, decode_fn: Callable = decode_frame, workers: Optional[int] = None,
+                 on_result: Optional[Callable[[List[Detection]], None]] = None, result_ttl: float = 0.5):
+        """
+        Args:
+            decode_fn: frame -> list of Detection
+            workers: number of decode threads (default_worker_count() if None)
+            on_result: called from a worker thread with the non-empty detections of each decoded frame
+            result_ttl: seconds after which latest() stops returning a result, so the
+                overlay disappears once the code leaves the frame
+        """
+        self._decode_fn = decode_fn
+        self._on_result = on_result
+        self._result_ttl = result_ttl
+        self._condition = Condition()
+        self._pending = None
+        self._sequence = 0
+        self._result_sequence = 0
+        self._result = []
+        self._result_time = 0.0
+        self._running = True
+        self._metrics = {
+            'submitted': 0,
+            'decoded': 0,
+            'dropped': 0,
+            'stale_results': 0,
+            'errors': 0,
+            'total_decode_ms': 0.0,
+            'max_decode_ms': 0.0,
+        }
+        self._threads = [
+            Thread(target=self._run, name=f'wms-scan-decoder-{index}', daemon=True)
+            for index in range(workers or default_worker_count())
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, frame) -> None:
+        """Offer a frame for decoding, replacing any frame still waiting"""
+        with self._condition:
+            if not self._running:
+                return
+            self._sequence += 1
+            if self._pending is not None:
+                self._metrics['dropped'] += 1
+            self._pending = (self._sequence, frame)
+            self._metrics['submitted'] += 1
+            self._condition.notify()
+
+    def latest(self) -> List[Detection]:
+        """Detections of the most recently decoded frame, or [] once they are older than result_ttl"""
+        with self._condition:
+            if time.monotonic() - self._result_time > self._result_ttl:
+                return []
+            return self._result
+
+    def metrics(self) -> dict:
+        with self._condition:
+            metrics = dict(self._metrics)
+        total_decode_ms = metrics.pop('total_decode_ms')
+        metrics['avg_decode_ms'] = total_decode_ms / metrics['decoded'] if metrics['decoded'] else 0.0
+        return metrics
+
+    def stop(self, timeout: float = 1) -> None:
+        with self._condition:
+            self._running = False
+            self._pending = None
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or not self._running)
+                if not self._running:
+                    return
+                sequence, frame = self._pending
+                self._pending = None
+
+            started = time.perf_counter()
+            try:
+                detections = self._decode_fn(frame)
+            except Exception:
+                with self._condition:
+                    self._metrics['errors'] += 1
+                continue
+            elapsed_ms = (time.perf_counter() - started) * 1000
+
+            with self._condition:
+                self._metrics['decoded'] += 1
+                self._metrics['total_decode_ms'] += elapsed_ms
+                self._metrics['max_decode_ms'] = max(self._metrics['max_decode_ms'], elapsed_ms)
+                # With several workers a slow decode can finish after a newer frame's
+                if sequence < self._result_sequence:
+                    self._metrics['stale_results'] += 1
+                    continue
+                self._result_sequence = sequence
+                self._result = detections
+                self._result_time = time.monotonic()
+
+            if detections and self._on_result is not None:
+                # A failing callback must not end the worker thread and stop decoding
+                try:
+                    self._on_result(detections)
+                except Exception:
+                    with self._condition:
+                        self._metrics['errors'] += 1
@@ -0,0 +1,31 @@
+import pytest
+
+def _reset_database_state():
+    """Stop the writer, audit logger and read pool so the next use opens the current WMS_DB_PATH"""
+    from database import db_utils
+    if db_utils.AuditLogger._instance is not None:
+        db_utils.AuditLogger._instance.shutdown()
+        db_utils.AuditLogger._instance = None
+    if db_utils.DatabaseWriter._instance is not None:
+        db_utils.DatabaseWriter._instance.shutdown()
+        db_utils.DatabaseWriter._instance = None
+    pool = db_utils.ReadOnlyConnectionPool._instance
+    if pool is not None:
+        while not pool._pool.empty():
+            pool._pool.get_nowait()[0].close()
+        db_utils.ReadOnlyConnectionPool._instance = None
+    db_utils._database_initialized = False
+    db_utils.reference_cache.invalidate_all()
+    db_utils.product_lookup_cache.clear()
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A freshly migrated database in tmp_path; returns its path"""
+    db_path = tmp_path / 'wms.db'
+    monkeypatch.setenv('WMS_DB_PATH', str(db_path))
+    monkeypatch.setenv('WMS_HISTORY_ARCHIVE_DIR', str(tmp_path / 'archive'))
+    _reset_database_state()
+    from database.db_utils import init_database
+    init_database()
+    yield db_path
+    _reset_database_state()
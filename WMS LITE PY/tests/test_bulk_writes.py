@@ -0,0 +1,73 @@
+import pytest
+from database.db_utils import ProductDB, execute_write, get_db_read_connection, insert_rows, submit_write
+
+def _product(sku, code, **fields):
+    return {'sku': sku, 'code': code, 'name': f'Producto {sku}', **fields}
+
+def _skus():
+    with get_db_read_connection() as conn:
+        return [row['sku'] for row in conn.execute('SELECT sku FROM products ORDER BY product_id')]
+
+def test_group_commit_rolls_back_only_the_failing_job(database, monkeypatch):
+    # A wide window so the three jobs are committed as one batch
+    monkeypatch.setenv('WMS_DB_GROUP_COMMIT_MS', '200')
+
+    def _insert(conn, sku):
+        conn.execute('INSERT INTO products (sku, code, name) VALUES (?, ?, ?)', (sku, f'C-{sku}', sku))
+
+    def _insert_then_fail(conn):
+        _insert(conn, 'B')
+        raise ValueError('job failed')
+
+    futures = [submit_write(_insert, 'A'), submit_write(_insert_then_fail), submit_write(_insert, 'C')]
+
+    assert futures[0].result() is None
+    with pytest.raises(ValueError, match='job failed'):
+        futures[1].result()
+    assert futures[2].result() is None
+    assert _skus() == ['A', 'C']
+
+def test_insert_rows_replays_a_conflicting_chunk_row_by_row(database):
+    rows = [('A', 'C-1', 'a'), ('B', 'C-2', 'b'), ('C', 'C-1', 'c'), ('D', 'C-4', 'd')]
+
+    inserted, conflicts = execute_write(
+        lambda conn: insert_rows(conn, 'INSERT INTO products (sku, code, name) VALUES (?, ?, ?)', rows, chunk_size=3)
+    )
+
+    assert inserted == 3
+    assert [(conflict['index'], conflict['row']) for conflict in conflicts] == [(2, ('C', 'C-1', 'c'))]
+    assert isinstance(conflicts[0]['error'], str)
+    assert _skus() == ['A', 'B', 'D']
+
+def test_add_products_bulk_flags_duplicate_skus(database):
+    ProductDB.add_product('EXIST', 'C-0', 'Existente', '', None)
+
+    result = ProductDB.add_products_bulk([
+        _product('EXIST', 'C-1'),
+        _product('NEW', 'C-2'),
+        _product('NEW', 'C-3'),
+        _product('OTHER', 'C-4'),
+    ], chunk_size=2)
+
+    assert result['inserted'] == 4
+    assert result['conflicts'] == []
+    assert [(d['index'], d['sku']) for d in result['duplicates']] == [(0, 'EXIST'), (2, 'NEW')]
+    with get_db_read_connection() as conn:
+        flags = [tuple(row) for row in conn.execute('SELECT sku, code, is_duplicate FROM products ORDER BY product_id')]
+    assert flags == [('EXIST', 'C-0', 0), ('EXIST', 'C-1', 1), ('NEW', 'C-2', 0), ('NEW', 'C-3', 1), ('OTHER', 'C-4', 0)]
+
+def test_add_products_bulk_skipped_row_does_not_make_its_sku_a_duplicate(database):
+    ProductDB.add_product('EXIST', 'C-0', 'Existente', '', None)
+
+    result = ProductDB.add_products_bulk([
+        _product('NEW', 'C-0'),  # code conflict: skipped
+        _product('NEW', 'C-1'),
+    ])
+
+    assert result['inserted'] == 1
+    assert [conflict['index'] for conflict in result['conflicts']] == [0]
+    assert result['duplicates'] == []
+    assert ProductDB.get_product_by_code('C-1')['is_duplicate'] == 0
+
+def test_add_products_bulk_reports_nothing_for_an_empty_batch(database):
+    assert ProductDB.add_products_bulk([]) == {'inserted': 0, 'duplicates': [], 'conflicts': []}
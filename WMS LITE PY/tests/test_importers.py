@@ -0,0 +1,26 @@
+import io
+import pytest
+from database.importers import _integer, import_products
+
+@pytest.mark.parametrize('value, expected', [('3', 3), ('2.0', 2), ('1e3', 1000), ('-4', -4), ('', None)])
+def test_integer_accepts_whole_numbers(value, expected):
+    assert _integer({'stock': value}, 'stock') == expected
+
+@pytest.mark.parametrize('value', ['2.7', '-0.5', 'abc', 'inf', 'nan', '1e400', str(2 ** 63)])
+def test_integer_rejects_fractions_and_out_of_range_values(value):
+    with pytest.raises(ValueError):
+        _integer({'stock': value}, 'stock')
+
+def test_import_products_reports_invalid_numbers_per_line(database):
+    source = io.StringIO(
+        'sku,code,name,stock\n'
+        'A-1,C-1,Uno,5\n'
+        'A-2,C-2,Dos,2.7\n'
+        'A-3,C-3,Tres,1e400\n'
+    )
+    report = import_products(source, fmt='csv')
+
+    assert report.inserted == 1
+    assert report.errors == 2
+    assert [issue['line'] for issue in report.issues] == [3, 4]
+    assert 'whole number' in report.issues[0]['message']
@@ -0,0 +1,50 @@
+import sqlite3
+import pytest
+from database.migrator import MIGRATIONS_DIR, discover_migrations, get_latest_version, get_schema_version, run_migrations
+
+def _script(version):
+    path = next(path for number, _, path in discover_migrations() if number == version)
+    with open(path, 'r', encoding='utf-8') as migration_file:
+        return migration_file.read()
+
+def _schema(conn):
+    return {(row[0], row[1]) for row in conn.execute("SELECT type, name FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'")}
+
+def _fresh_schema(tmp_path):
+    fresh = sqlite3.connect(tmp_path / 'fresh.db', isolation_level=None)
+    try:
+        run_migrations(fresh)
+        return _schema(fresh)
+    finally:
+        fresh.close()
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(tmp_path / 'wms.db', isolation_level=None)
+    yield conn
+    conn.close()
+
+def test_new_database_reaches_latest_version(conn):
+    applied = run_migrations(conn)
+    assert applied == [version for version, _, _ in discover_migrations(MIGRATIONS_DIR)]
+    assert get_schema_version(conn) == get_latest_version()
+    assert run_migrations(conn) == []
+
+def test_unversioned_database_is_upgraded(conn, tmp_path):
+    # Databases created by executescript(schema.sql) before the runner existed
+    conn.executescript(_script(1))
+    run_migrations(conn)
+    assert get_schema_version(conn) == get_latest_version()
+    assert _schema(conn) == _fresh_schema(tmp_path)
+
+def test_database_indexed_by_the_pre_runner_step_is_upgraded(conn, tmp_path):
+    # apply_index_migration left the schema, the index set and user_version = 1
+    conn.executescript(_script(1))
+    conn.executescript(_script(2))
+    conn.execute('PRAGMA user_version = 1')
+
+    applied = run_migrations(conn)
+
+    assert applied[0] == 2
+    assert get_schema_version(conn) == get_latest_version()
+    assert _schema(conn) == _fresh_schema(tmp_path)
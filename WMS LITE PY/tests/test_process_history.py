@@ -0,0 +1,52 @@
+from database.db_utils import AuditLogger, ProcessHistoryDB
+from database.history_archive import HistoryArchiver
+
+def _log_months(months, per_month=3):
+    ProcessHistoryDB.log_processes([
+        ('Recepción', f'Paso {index}', 'Completado', f'{month}-1{index} 10:00:00', None, None)
+        for month in months for index in range(per_month)
+    ])
+
+def test_history_pages_continue_into_the_archives(database):
+    _log_months(['2020-01', '2020-02'])
+    ProcessHistoryDB.log_process('Recepción', 'Actual', 'Completado', buffered=False)
+    all_ids = [record['process_id'] for record in ProcessHistoryDB.get_process_history()]
+
+    assert HistoryArchiver(retention_days=30).run(pause=0) == 6
+    assert HistoryArchiver().archived_months() == ['2020-01', '2020-02']
+
+    ids, cursor = [], None
+    while True:
+        records, cursor = ProcessHistoryDB.get_process_history_page(2, before_id=cursor)
+        ids.extend(record['process_id'] for record in records)
+        if cursor is None:
+            break
+    assert ids == all_ids
+    assert sorted(record['process_id'] for record in ProcessHistoryDB.iter_process_history(chunk_size=2)) == sorted(all_ids)
+
+def test_archived_history_is_filtered_by_date(database):
+    _log_months(['2020-01', '2020-02'])
+    HistoryArchiver(retention_days=30).run(pause=0)
+
+    records = ProcessHistoryDB.get_process_history(date_from='2020-02-01', date_to='2020-02-28')
+
+    assert len(records) == 3
+    assert all(record['timestamp'].startswith('2020-02') for record in records)
+
+def test_audit_logger_rejects_only_the_entries_that_cannot_be_written(database, monkeypatch):
+    monkeypatch.setenv('WMS_AUDIT_FLUSH_MS', '10')
+    monkeypatch.setenv('WMS_AUDIT_MAX_RETRIES', '1')
+    logger = AuditLogger()
+
+    logger.log('Recepción', 'Detalles no textuales', 'Completado', {'lineas': 3})
+    with logger._condition:
+        # An entry that bypassed log() and cannot be bound to the insert
+        logger._buffer.append(('Recepción',))
+    logger.log('Recepción', 'Posterior', 'Completado')
+
+    assert logger.flush(timeout=5)
+    metrics = logger.metrics()
+    assert metrics['flushed'] == 2
+    assert metrics['rejected'] == 1
+    details = {record['sub_operation']: record['details'] for record in ProcessHistoryDB.get_process_history()}
+    assert details == {'Detalles no textuales': "{'lineas': 3}", 'Posterior': None}
@@ -0,0 +1,156 @@
+"""EXPLAIN QUERY PLAN check for the hot lookup queries.
+
+Each hot query is exercised through the method that runs it in the app. The
+SQL it executes (with its bound values) is captured with a trace callback on
+the read pool and writer connections, so the check follows the real queries
+instead of copies of them. A query regresses when a table it must search
+through an index is scanned, or when SQLite builds an automatic index or a
+temporary b-tree for sorting.
+"""
+from contextlib import contextmanager
+from typing import Callable, List, Tuple
+import pytest
+from database.db_utils import (
+    ReadOnlyConnectionPool,
+    execute_write,
+    get_db_read_connection,
+    product_lookup_cache,
+    DashboardDB,
+    InventoryDB,
+    OrderDB,
+    ProcessHistoryDB,
+    ProductDB,
+    StockMovementDB
+)
+
+def _get_locations_by_zone():
+    # location_manager imports streamlit; only load it when this query is checked
+    from database.location_manager import LocationManager
+    return LocationManager.get_locations_by_zone('Recepción')
+
+# (name, call that runs the query, aliases that must be searched through an index)
+HOT_QUERIES: List[Tuple[str, Callable, List[str]]] = [
+    (
+        'ProductDB.get_product_by_sku',
+        lambda: ProductDB.get_product_by_sku('PLAN-SKU'),
+        ['p', 'c'],
+    ),
+    (
+        'ProductDB.get_product_by_code',
+        lambda: ProductDB.get_product_by_code('PLAN-CODE'),
+        ['p', 'c'],
+    ),
+    (
+        'ProductDB.get_products_by_codes',
+        lambda: ProductDB.get_products_by_codes(['PLAN-SKU', 'PLAN-CODE']),
+        ['p', 'c'],
+    ),
+    (
+        'ProductDB.add_product (duplicate SKU check)',
+        lambda: ProductDB.add_product('PLAN-SKU', 'PLAN-CODE', 'Plan check', '', None),
+        ['products'],
+    ),
+    (
+        'LocationManager.get_locations_by_zone',
+        _get_locations_by_zone,
+        ['locations'],
+    ),
+    (
+        'OrderDB.get_order_items',
+        lambda: OrderDB.get_order_items(1),
+        ['oi', 'p'],
+    ),
+    (
+        'OrderDB.get_all_orders',
+        OrderDB.get_all_orders,
+        ['ot', 'sl', 'dl', 'oi'],
+    ),
+    (
+        'ProcessHistoryDB.get_process_history_page',
+        lambda: ProcessHistoryDB.get_process_history_page(50, before_id=1000),
+        ['process_history'],
+    ),
+    (
+        'ProcessHistoryDB.get_process_history_page (by operation type)',
+        lambda: ProcessHistoryDB.get_process_history_page(50, before_id=1000, operation_type='Recepción'),
+        ['process_history'],
+    ),
+    (
+        'ProcessHistoryDB.get_process_history_page (by user)',
+        lambda: ProcessHistoryDB.get_process_history_page(50, user_id='operador'),
+        ['process_history'],
+    ),
+    (
+        'InventoryDB.get_product_on_hand',
+        lambda: InventoryDB.get_product_on_hand(1),
+        ['product_on_hand'],
+    ),
+    (
+        'StockMovementDB.get_on_hand',
+        lambda: StockMovementDB.get_on_hand(1, 1),
+        ['stock_movements'],
+    ),
+    (
+        'DashboardDB.get_dashboard_stats (pending orders)',
+        DashboardDB.get_dashboard_stats,
+        ['orders'],
+    ),
+]
+
+@contextmanager
+def capture_statements():
+    """Collect the SQL run on read pool and writer connections inside the block"""
+    statements = []
+    traced = []
+    pool = ReadOnlyConnectionPool()
+    checkout = pool.get_connection
+
+    def _get_connection():
+        conn = checkout()
+        conn.set_trace_callback(statements.append)
+        traced.append(conn)
+        return conn
+
+    execute_write(lambda conn: conn.set_trace_callback(statements.append))
+    try:
+        with pytest.MonkeyPatch.context() as patch:
+            patch.setattr(pool, 'get_connection', _get_connection)
+            yield statements
+    finally:
+        execute_write(lambda conn: conn.set_trace_callback(None))
+        for conn in traced:
+            conn.set_trace_callback(None)
+
+def explain(conn, sql: str, params=()) -> List[str]:
+    """Return the detail column of EXPLAIN QUERY PLAN for a query"""
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()]
+
+def plan_regressions(conn, sql: str, indexed_aliases: List[str]) -> List[str]:
+    """Plan steps of `sql` that scan one of `indexed_aliases` or sort/index on the fly"""
+    regressions = []
+    for detail in explain(conn, sql):
+        if 'TEMP B-TREE FOR ORDER BY' in detail or 'AUTOMATIC' in detail:
+            regressions.append(detail)
+            continue
+        words = detail.split()
+        if len(words) >= 2 and words[0] == 'SCAN' and 'USING' not in words and words[1] in indexed_aliases:
+            regressions.append(detail)
+    return regressions
+
+@pytest.mark.parametrize('name, call, indexed_aliases', HOT_QUERIES, ids=[q[0] for q in HOT_QUERIES])
+def test_hot_query_uses_indexes(database, name, call, indexed_aliases):
+    assert indexed_aliases, f"{name} must name the tables it searches through an index"
+    product_lookup_cache.clear()
+    try:
+        with capture_statements() as statements:
+            call()
+    except ModuleNotFoundError as e:
+        pytest.skip(f"{name} needs {e.name}")
+    selects = [sql for sql in statements if sql.lstrip().upper().startswith(('SELECT', 'WITH'))]
+    assert selects, f"{name} ran no SELECT statement"
+    with get_db_read_connection() as conn:
+        regressions = [
+            f'{detail} in: {" ".join(sql.split())}'
+            for sql in selects for detail in plan_regressions(conn, sql, indexed_aliases)
+        ]
+    assert not regressions, f"{name} regressed: {regressions}"
@@ -0,0 +1,51 @@
+import pytest
+
+# scanning imports the OpenCV/zbar decoder
+pytest.importorskip('cv2')
+pytest.importorskip('pyzbar.pyzbar')
+
+from scanning.session import ScanSessionBuffer
+
+PRODUCT = {'product_id': 1, 'sku': 'SKU-1', 'name': 'Producto'}
+
+def test_a_code_counts_once_per_presentation():
+    buffer = ScanSessionBuffer(dedupe_window=1.0)
+
+    assert buffer.add('SKU-1', timestamp=0.0)
+    assert not buffer.add('SKU-1', timestamp=0.5)
+    # Still in view: every frame extends the presentation
+    assert not buffer.add('SKU-1', timestamp=1.4)
+    assert buffer.add('SKU-1', timestamp=3.0)
+
+    assert buffer.metrics() == {'scans': 2, 'duplicates': 2, 'codes': 1, 'pending': 1}
+
+def test_resolve_batches_pending_codes_and_sums_codes_of_one_product():
+    buffer = ScanSessionBuffer(dedupe_window=0)
+    for code in ('SKU-1', 'CODE-1', 'CODE-1', 'UNKNOWN'):
+        buffer.add(code)
+    lookups = []
+
+    def _lookup(codes):
+        lookups.append(sorted(codes))
+        return {'SKU-1': PRODUCT, 'CODE-1': PRODUCT}
+
+    assert buffer.resolve(_lookup) == {'SKU-1': PRODUCT, 'CODE-1': PRODUCT, 'UNKNOWN': None}
+    assert buffer.resolve(_lookup) == {}
+    assert lookups == [['CODE-1', 'SKU-1', 'UNKNOWN']]
+
+    items = buffer.items()
+    assert [(item['status'], item['count']) for item in items] == [('matched', 3), ('unknown', 1)]
+    assert sorted(items[0]['codes']) == ['CODE-1', 'SKU-1']
+
+def test_version_changes_on_every_update():
+    buffer = ScanSessionBuffer(dedupe_window=0)
+    versions = [buffer.version()]
+    buffer.add('SKU-1')
+    versions.append(buffer.version())
+    buffer.resolve(lambda codes: {})
+    versions.append(buffer.version())
+    buffer.remove(['SKU-1'])
+    versions.append(buffer.version())
+
+    assert len(set(versions)) == 4
+    assert buffer.items() == []
@@ -0,0 +1,140 @@
+import pytest
+from database.db_utils import (
+    DashboardDB,
+    InventoryDB,
+    LocationDB,
+    OrderDB,
+    ProductDB,
+    StockMovementDB,
+    get_db_read_connection
+)
+from database.reception_service import finalize_reception
+from database.reconciliation import DiscrepancyDB, StockReconciler
+
+@pytest.fixture
+def warehouse(database):
+    """One product with 5 units of stock, a reception slot R-1-1 and a storage slot A-1-1"""
+    OrderDB.add_order_type('INBOUND', 'Entrada', 'Recepción de proveedores')
+    ProductDB.add_product('SKU-1', 'CODE-1', 'Producto', '', None, stock=5)
+    LocationDB.add_location('Recepción', 'R', '1', '1')
+    LocationDB.add_location('Almacén', 'A', '1', '1')
+    locations = {location['zone']: location['location_id'] for location in LocationDB.get_all_locations()}
+    return {
+        'product_id': ProductDB.get_product_by_sku('SKU-1')['product_id'],
+        'reception': locations['Recepción'],
+        'storage': locations['Almacén'],
+    }
+
+def _stock(product_id):
+    with get_db_read_connection() as conn:
+        return conn.execute('SELECT stock FROM products WHERE product_id = ?', (product_id,)).fetchone()['stock']
+
+def _slots(product_id):
+    return {row['location_id']: row['quantity'] for row in InventoryDB.get_product_inventory(product_id)}
+
+def _assert_ledger_matches(product_id):
+    assert StockMovementDB.get_on_hand(product_id, ledger='stock') == _stock(product_id)
+    assert StockMovementDB.get_on_hand(product_id) == InventoryDB.get_product_on_hand(product_id)
+
+def test_reception_adds_stock_and_reception_inventory(warehouse):
+    result = finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'}])
+
+    assert result['created']
+    assert _stock(warehouse['product_id']) == 15
+    assert _slots(warehouse['product_id']) == {warehouse['reception']: 10}
+    assert [item['quantity'] for item in OrderDB.get_order_items(result['order_id'])] == [10]
+    _assert_ledger_matches(warehouse['product_id'])
+
+def test_overwriting_a_reception_applies_only_the_difference(warehouse):
+    items = [{'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'}]
+    first = finalize_reception('PO-1', items)
+    second = finalize_reception('PO-1', items)
+
+    assert second['order_id'] == first['order_id'] and not second['created']
+    assert _stock(warehouse['product_id']) == 15
+    assert _slots(warehouse['product_id']) == {warehouse['reception']: 10}
+
+    finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 4, 'location': 'R-1-1'}])
+    assert _stock(warehouse['product_id']) == 9
+    assert _slots(warehouse['product_id']) == {warehouse['reception']: 4}
+    assert [item['quantity'] for item in OrderDB.get_order_items(first['order_id'])] == [4]
+    _assert_ledger_matches(warehouse['product_id'])
+
+def test_overwrite_fails_when_received_units_were_put_away(warehouse):
+    finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'}])
+    InventoryDB.transfer_inventory(warehouse['product_id'], warehouse['reception'], warehouse['storage'], 10)
+
+    with pytest.raises(ValueError):
+        finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 3, 'location': 'R-1-1'}])
+
+    assert _stock(warehouse['product_id']) == 15
+    assert _slots(warehouse['product_id']) == {warehouse['storage']: 10}
+
+def test_reception_with_unknown_sku_writes_nothing(warehouse):
+    with pytest.raises(ValueError, match='NOPE'):
+        finalize_reception('PO-1', [
+            {'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'},
+            {'sku': 'NOPE', 'quantity': 1},
+        ])
+
+    assert _stock(warehouse['product_id']) == 5
+    assert _slots(warehouse['product_id']) == {}
+    assert OrderDB.get_all_orders() == []
+
+def test_transfer_moves_units_without_changing_totals(warehouse):
+    product_id = warehouse['product_id']
+    finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'}])
+
+    InventoryDB.transfer_inventory(product_id, warehouse['reception'], warehouse['storage'], 7, reason='putaway')
+
+    assert _slots(product_id) == {warehouse['reception']: 3, warehouse['storage']: 7}
+    assert InventoryDB.get_product_on_hand(product_id) == 10
+    assert _stock(product_id) == 15
+    putaway = [m['delta'] for m in StockMovementDB.get_movements(product_id=product_id, reason='putaway')]
+    assert sorted(putaway) == [-7, 7]
+    _assert_ledger_matches(product_id)
+
+def test_full_putaway_removes_the_empty_receiving_slot(warehouse):
+    product_id = warehouse['product_id']
+    finalize_reception('PO-1', [{'sku': 'SKU-1', 'quantity': 10, 'location': 'R-1-1'}])
+
+    InventoryDB.transfer_inventory(product_id, warehouse['reception'], warehouse['storage'], 10, min_quantity=2)
+
+    assert _slots(product_id) == {warehouse['storage']: 10}
+    assert DashboardDB.get_dashboard_stats()['low_stock'] == 0
+    assert InventoryDB.get_low_stock_items() == []
+
+def test_transfer_rejects_more_than_the_source_holds(warehouse):
+    product_id = warehouse['product_id']
+    InventoryDB.add_inventory(product_id, warehouse['reception'], 3)
+
+    with pytest.raises(ValueError):
+        InventoryDB.transfer_inventory(product_id, warehouse['reception'], warehouse['storage'], 4)
+    with pytest.raises(ValueError):
+        InventoryDB.transfer_inventory(product_id, warehouse['reception'], warehouse['reception'], 1)
+
+    assert _slots(product_id) == {warehouse['reception']: 3}
+
+def test_reconciliation_detects_and_adjusts_a_discrepancy(warehouse):
+    product_id = warehouse['product_id']
+    InventoryDB.add_inventory(product_id, warehouse['storage'], 8)
+
+    run = StockReconciler().run(incremental=False)
+    assert run['mode'] == 'full'
+    assert [(d['product_id'], d['difference']) for d in DiscrepancyDB.get_discrepancies()] == [(product_id, -3)]
+
+    assert DiscrepancyDB.adjust_stock_to_inventory(product_id) == 3
+    assert _stock(product_id) == 8
+    assert DiscrepancyDB.get_discrepancies() == []
+
+def test_incremental_reconciliation_only_checks_moved_products(warehouse):
+    product_id = warehouse['product_id']
+    ProductDB.add_product('SKU-2', 'CODE-2', 'Otro', '', None)
+    StockReconciler().run(incremental=False)
+
+    ProductDB.update_stock(product_id, 2)
+    run = StockReconciler().run()
+
+    assert run['mode'] == 'incremental'
+    assert run['products_checked'] == 1
+    assert [d['product_id'] for d in DiscrepancyDB.get_discrepancies()] == [product_id]